@@ -1,99 +1,42 @@
 import streamlit as st
 import os
 import pandas as pd
-from io import BytesIO
-import sqlite3
-import json
-DB_PATH = os.path.join(os.path.dirname(__file__), "app_data.db")
+from modules import profiling
+from modules.storage import transaction, read
+from modules.migrations import migrate
+from modules.cache import standings_cache
+from modules.standings_store import load_standings, check_consistency, rebuild
+from modules.ingest import import_frame, ingest_csv, missing_columns, read_header
+from modules.sensitivity import build_whatif
+from modules.simulation import SCORE_MODELS, simulate_season
+from modules.export import XLSX_MIME, dataset_sheet, export_workbook
+from modules import datasets as dataset_access
+from modules.comparison import compare_scenarios, comparison_table
+from modules.scenarios import StoredScenario, load_scenarios as stored_scenarios, save_scenario as store_scenario
+from modules.retention import KEEP_VERSIONS, background_status, start_background
+
+# Perfilado del rerun: con PROFILING=true o con el panel activado en la barra lateral
+if profiling.PROFILING_ENABLED or st.session_state.get("profiling_panel"):
+    profiling.begin_run(st.session_state.get("username", ""))
+profiling.section("inicio")
 
 def ensure_tables():
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        
-        # Tablas existentes
-        cur.execute('''CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )''')
-        cur.execute('''CREATE TABLE IF NOT EXISTS scenarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            sport TEXT,
-            label TEXT,
-            payload_json TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )''')
-        cur.execute('''CREATE TABLE IF NOT EXISTS entitlements (
-            username TEXT PRIMARY KEY,
-            is_premium INTEGER DEFAULT 0,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )''')
-        
-        # Nuevas tablas para datos deportivos
-        cur.execute('''CREATE TABLE IF NOT EXISTS datasets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            sport TEXT,
-            name TEXT,
-            is_projection INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )''')
-        
-        # Tabla para partidos de fútbol (La Liga, NFL)
-        cur.execute('''CREATE TABLE IF NOT EXISTS matches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dataset_id INTEGER,
-            local TEXT,
-            visitante TEXT,
-            goles_local INTEGER DEFAULT 0,
-            goles_visitante INTEGER DEFAULT 0,
-            puntos_local INTEGER DEFAULT 0,
-            puntos_visitante INTEGER DEFAULT 0,
-            FOREIGN KEY (dataset_id) REFERENCES datasets (id)
-        )''')
-        
-        # Tabla para carreras de F1
-        cur.execute('''CREATE TABLE IF NOT EXISTS f1_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dataset_id INTEGER,
-            piloto TEXT,
-            equipo TEXT,
-            puntos INTEGER DEFAULT 0,
-            carrera TEXT DEFAULT '',
-            FOREIGN KEY (dataset_id) REFERENCES datasets (id)
-        )''')
-        
-        # Tabla para juegos de MLB
-        cur.execute('''CREATE TABLE IF NOT EXISTS mlb_games (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dataset_id INTEGER,
-            equipo_local TEXT,
-            equipo_visitante TEXT,
-            hr_local INTEGER DEFAULT 0,
-            hr_visitante INTEGER DEFAULT 0,
-            runs_local INTEGER DEFAULT 0,
-            runs_visitante INTEGER DEFAULT 0,
-            FOREIGN KEY (dataset_id) REFERENCES datasets (id)
-        )''')
-        
-        con.commit()
-        con.close()
+        migrate()
     except Exception as e:
         st.error(f"Error al inicializar la base de datos: {str(e)}")
 
 # Crear tablas al inicio de la app
 ensure_tables()
+# Retención de escenarios en segundo plano (como mucho una vez por intervalo, no bloquea)
+start_background()
 
 def ensure_user(username: str):
     if not username:
         return
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("INSERT OR IGNORE INTO users(username) VALUES(?)", (username,))
-        con.commit()
-        con.close()
+        with transaction() as con:
+            con.execute("INSERT OR IGNORE INTO users(username) VALUES(?)", (username,))
     except Exception as e:
         st.error(f"Error al registrar usuario: {str(e)}")
 
@@ -101,66 +44,35 @@ def save_scenario(username: str, sport: str, label: str, resumen_df):
     if not username:
         return False
     try:
-        payload = resumen_df.to_json(orient="records", force_ascii=False)
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("""INSERT INTO scenarios(username, sport, label, payload_json)
-                       VALUES(?,?,?,?)""", (username, sport, label, payload))
-        con.commit()
-        con.close()
+        store_scenario(username, sport, label, resumen_df)
         return True
     except Exception as e:
         st.error(f"Error al guardar escenario: {str(e)}")
         return False
 
 def load_scenarios(username: str, sport: str):
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT label, payload_json, created_at FROM scenarios WHERE username=? AND sport=? ORDER BY created_at DESC", (username, sport))
-    rows = cur.fetchall()
-    con.close()
-    # return dict label -> DataFrame (latest per label)
-    out = {}
-    for label, payload, created_at in rows:
-        try:
-            df = pd.read_json(payload)
-            out.setdefault(label, df)  # keep first occurrence (latest due to ORDER BY DESC)
-        except Exception:
-            continue
-    return out
+    """{etiqueta: StoredScenario} (última versión por etiqueta; el DataFrame se decodifica con .frame)"""
+    return stored_scenarios(username, sport)
 
 
 def set_premium(username: str, flag: bool):
     if not username:
         return
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("INSERT INTO entitlements(username, is_premium) VALUES(?, ?) ON CONFLICT(username) DO UPDATE SET is_premium=excluded.is_premium, updated_at=CURRENT_TIMESTAMP", (username, 1 if flag else 0))
-    con.commit()
-    con.close()
+    with transaction() as con:
+        con.execute("INSERT INTO entitlements(username, is_premium) VALUES(?, ?) ON CONFLICT(username) DO UPDATE SET is_premium=excluded.is_premium, updated_at=CURRENT_TIMESTAMP", (username, 1 if flag else 0))
 
 def is_premium(username: str) -> bool:
     if not username:
         return False
-    con = sqlite3.connect(DB_PATH)
-    cur = con.cursor()
-    cur.execute("SELECT is_premium FROM entitlements WHERE username=?", (username,))
-    row = cur.fetchone()
-    con.close()
+    with read() as con:
+        row = con.execute("SELECT is_premium FROM entitlements WHERE username=?", (username,)).fetchone()
     return bool(row[0]) if row else False
 
-# Funciones para gestión de datasets deportivos
+# Funciones para gestión de datasets deportivos (lógica en modules.datasets; aquí solo se muestran los errores)
 def create_dataset(username: str, sport: str, name: str, is_projection: bool = False) -> int:
     """Crea un nuevo dataset y retorna su ID"""
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("INSERT INTO datasets (username, sport, name, is_projection) VALUES (?, ?, ?, ?)",
-                   (username, sport, name, 1 if is_projection else 0))
-        dataset_id = cur.lastrowid
-        con.commit()
-        con.close()
-        return dataset_id
+        return dataset_access.create_dataset(username, sport, name, is_projection)
     except Exception as e:
         st.error(f"Error al crear dataset: {str(e)}")
         return None
@@ -168,17 +80,7 @@ def create_dataset(username: str, sport: str, name: str, is_projection: bool = F
 def get_datasets(username: str, sport: str = None):
     """Obtiene los datasets del usuario"""
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        if sport:
-            cur.execute("SELECT id, sport, name, is_projection, created_at FROM datasets WHERE username=? AND sport=? ORDER BY created_at DESC", 
-                       (username, sport))
-        else:
-            cur.execute("SELECT id, sport, name, is_projection, created_at FROM datasets WHERE username=? ORDER BY created_at DESC", 
-                       (username,))
-        datasets = cur.fetchall()
-        con.close()
-        return datasets
+        return dataset_access.list_datasets(username, sport)
     except Exception as e:
         st.error(f"Error al obtener datasets: {str(e)}")
         return []
@@ -186,95 +88,84 @@ def get_datasets(username: str, sport: str = None):
 def delete_dataset(dataset_id: int):
     """Elimina un dataset y todos sus datos relacionados"""
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        cur.execute("DELETE FROM matches WHERE dataset_id=?", (dataset_id,))
-        cur.execute("DELETE FROM f1_results WHERE dataset_id=?", (dataset_id,))
-        cur.execute("DELETE FROM mlb_games WHERE dataset_id=?", (dataset_id,))
-        cur.execute("DELETE FROM datasets WHERE id=?", (dataset_id,))
-        con.commit()
-        con.close()
+        dataset_access.delete_dataset(dataset_id)
         return True
     except Exception as e:
         st.error(f"Error al eliminar dataset: {str(e)}")
         return False
 
-def import_csv_to_dataset(df, dataset_id: int, sport: str):
-    """Importa datos de un DataFrame CSV a las tablas SQLite"""
+def import_csv_to_dataset(df, dataset_id: int, sport: str, progress=None, chunk_size=None):
+    """Importa datos de un DataFrame CSV a las tablas SQLite (executemany por lotes, una transacción)"""
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.cursor()
-        
-        if sport == "La Liga":
-            for _, row in df.iterrows():
-                cur.execute("""INSERT INTO matches (dataset_id, local, visitante, goles_local, goles_visitante) 
-                              VALUES (?, ?, ?, ?, ?)""", 
-                           (dataset_id, row['Local'], row['Visitante'], 
-                            row['Goles_Local'], row['Goles_Visitante']))
-        
-        elif sport == "F1":
-            for _, row in df.iterrows():
-                cur.execute("""INSERT INTO f1_results (dataset_id, piloto, equipo, puntos) 
-                              VALUES (?, ?, ?, ?)""", 
-                           (dataset_id, row['Piloto'], row['Equipo'], row['Puntos']))
-        
-        elif sport == "MLB":
-            for _, row in df.iterrows():
-                cur.execute("""INSERT INTO mlb_games (dataset_id, equipo_local, equipo_visitante, hr_local, hr_visitante) 
-                              VALUES (?, ?, ?, ?, ?)""", 
-                           (dataset_id, row['Equipo_Local'], row['Equipo_Visitante'], 
-                            row['HR_Local'], row['HR_Visitante']))
-        
-        elif sport == "NFL":
-            for _, row in df.iterrows():
-                cur.execute("""INSERT INTO matches (dataset_id, local, visitante, puntos_local, puntos_visitante) 
-                              VALUES (?, ?, ?, ?, ?)""", 
-                           (dataset_id, row['Local'], row['Visitante'], 
-                            row['Puntos_Local'], row['Puntos_Visitante']))
-        
-        con.commit()
-        con.close()
+        import_frame(df, dataset_id, sport, progress=progress, chunk_size=chunk_size)
         return True
     except Exception as e:
         st.error(f"Error al importar datos: {str(e)}")
         return False
 
+def get_dataset_version(dataset_id: int):
+    """Versión de contenido del dataset (None si no existe)"""
+    return dataset_access.dataset_version(dataset_id)
+
 def get_dataset_data(dataset_id: int, sport: str):
-    """Obtiene los datos de un dataset como DataFrame"""
+    """Obtiene los datos de un dataset como DataFrame (cacheado; no modificar in situ)"""
     try:
-        con = sqlite3.connect(DB_PATH)
-        
-        if sport == "La Liga":
-            df = pd.read_sql_query("""SELECT local AS Local, visitante AS Visitante, 
-                                     goles_local AS Goles_Local, goles_visitante AS Goles_Visitante 
-                                     FROM matches WHERE dataset_id=?""", con, params=(dataset_id,))
-        elif sport == "F1":
-            df = pd.read_sql_query("""SELECT piloto AS Piloto, equipo AS Equipo, puntos AS Puntos 
-                                     FROM f1_results WHERE dataset_id=?""", con, params=(dataset_id,))
-        elif sport == "MLB":
-            df = pd.read_sql_query("""SELECT equipo_local AS Equipo_Local, equipo_visitante AS Equipo_Visitante,
-                                     hr_local AS HR_Local, hr_visitante AS HR_Visitante 
-                                     FROM mlb_games WHERE dataset_id=?""", con, params=(dataset_id,))
-        elif sport == "NFL":
-            df = pd.read_sql_query("""SELECT local AS Local, visitante AS Visitante,
-                                     puntos_local AS Puntos_Local, puntos_visitante AS Puntos_Visitante 
-                                     FROM matches WHERE dataset_id=?""", con, params=(dataset_id,))
-        else:
-            df = pd.DataFrame()
-        
-        con.close()
-        return df
+        return dataset_access.dataset_data(dataset_id, sport)
     except Exception as e:
         st.error(f"Error al obtener datos del dataset: {str(e)}")
         return pd.DataFrame()
 
-from modules.utils import FREE_SCHEMAS, validate_schema, compute_standings_laliga, compute_f1_points, compute_mlb_summary, compute_nfl_table, merge_laliga_with_projections, merge_concat
+from modules import sports
+from modules.utils import FREE_SCHEMAS, OPTIONAL_SCHEMAS, STANDINGS_FUNCTIONS, validate_schema, round_column, compute_round_standings, merge_concat
+
+def compute_cached(fn, sport, *dataset_ids):
+    """Resultado de ``fn`` sobre uno o varios datasets concatenados (base + proyección).
+
+    Se cachea por (ids, deporte, versiones de contenido, función); importar o
+    eliminar cualquiera de los datasets invalida la entrada.
+    """
+    versions = tuple(get_dataset_version(i) for i in dataset_ids)
+    key = (tuple(dataset_ids), sport, versions, fn.__name__)
+    def _compute():
+        frames = [get_dataset_data(i, sport) for i in dataset_ids]
+        df = frames[0]
+        for extra in frames[1:]:
+            df = merge_concat(df, extra)
+        return fn(df)
+    return standings_cache.get_or_compute(key, _compute)
+
+def whatif_engine(sport, dataset_id):
+    """Motor de sensibilidad del dataset, cacheado junto a las tablas calculadas"""
+    key = ((dataset_id,), sport, (get_dataset_version(dataset_id),), "whatif")
+    return standings_cache.get_or_compute(key, lambda: build_whatif(get_dataset_data(dataset_id, sport), sport))
+
+def round_standings_cached(sport, dataset_id):
+    """Tabla después de cada jornada o carrera (None si el deporte o el dataset no traen
+    Jornada/Fecha o Carrera); en F1, (pilotos, constructores)"""
+    if sport not in OPTIONAL_SCHEMAS:
+        return None
+    key = ((dataset_id,), sport, (get_dataset_version(dataset_id),), "jornadas")
+    def _compute():
+        df = get_dataset_data(dataset_id, sport)
+        return compute_round_standings(df, sport) if round_column(df, sport) else None
+    return standings_cache.get_or_compute(key, _compute)
+
+def montecarlo_cached(sport, n_sims, base_id, fixtures_id=None, seed=None):
+    """Simulación Monte Carlo del dataset base; los partidos pendientes salen de
+    ``fixtures_id`` (dataset de proyección) o del calendario restante si es None"""
+    ids = (base_id,) if fixtures_id is None else (base_id, fixtures_id)
+    key = (ids, sport, tuple(get_dataset_version(i) for i in ids), "montecarlo", n_sims, seed)
+    def _compute():
+        fixtures = get_dataset_data(fixtures_id, sport) if fixtures_id is not None else None
+        return simulate_season(get_dataset_data(base_id, sport), sport, fixtures=fixtures, n_sims=n_sims, seed=seed)
+    return standings_cache.get_or_compute(key, _compute)
 
 st.set_page_config(page_title="Sports Templates Freemium", page_icon="🏟️", layout="wide")
 
 st.title("🏟️ Sports Templates Freemium — Excel Digestor")
 st.caption("Carga datos *ficticios o propios* con **esquemas reales**, genera Excel y **simula con tus proyecciones**.")
 
+profiling.section("barra lateral")
 # ---- Simple login (username-only) ----
 if "username" not in st.session_state:
     st.session_state["username"] = ""
@@ -324,33 +215,38 @@ with st.sidebar:
     st.divider()
     st.caption("Tip: Descarga los CSV de ejemplo en la pestaña 'Demo & Datos'.")
 
-tabs = st.tabs([
-    "🏟️ Demo & Datos",
-    "📈 Visualización básica", 
-    "🧪 Proyecciones (simula)",
-    "📥 Generar Excel",
-    "🔒 Zona Premium",
-    "🗂️ Administrar Templates",
-    "🗄️ Gestión Datasets"
-])
+def sync_selected_dataset(username: str, sport: str):
+    """Mantiene selected_dataset_id dentro de los datasets del usuario y deporte actuales.
+
+    El selector vive en 'Demo & Datos', que ya no se ejecuta en cada rerun: si se cambia
+    de deporte desde otra pestaña se toma el dataset más reciente del nuevo deporte.
+    """
+    ids = [d[0] for d in get_datasets(username, sport)]
+    if st.session_state.get("selected_dataset_id") not in ids:
+        st.session_state["selected_dataset_id"] = ids[0] if ids else None
 
 def _demo_paths():
-    return {
-        "La Liga":"data/la_liga_demo.csv",
-        "F1":"data/f1_demo.csv",
-        "MLB":"data/mlb_demo.csv",
-        "NFL":"data/nfl_demo.csv",
-    }
+    return {name: f"data/{sports.get(name).slug}_demo.csv" for name in sports.names()}
 
 def _proj_template_paths():
-    return {
-        "La Liga":"data/plantilla_proyecciones_la_liga.csv",
-        "F1":"data/plantilla_proyecciones_f1.csv",
-        "MLB":"data/plantilla_proyecciones_mlb.csv",
-        "NFL":"data/plantilla_proyecciones_nfl.csv",
-    }
-
-with tabs[0]:
+    return {name: f"data/plantilla_proyecciones_{sports.get(name).slug}.csv" for name in sports.names()}
+
+def _file_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def show_tables(spec, result, titles=True):
+    """Muestra cada tabla del resultado (tabla + gráfico de barras); varias tablas van en columnas"""
+    frames = spec.frames(result)
+    cols = st.columns(len(frames)) if len(frames) > 1 else [st.container()]
+    for col, table, df in zip(cols, spec.tables, frames):
+        with col:
+            if titles:
+                st.markdown(f"**{table.title}:**")
+            st.dataframe(df, use_container_width=True)
+            st.bar_chart(df.set_index(table.index)[table.value])
+
+def page_demo():
     st.subheader("Demo & Datos")
     demo_paths = _demo_paths()
     st.markdown("Descarga un **CSV de ejemplo** con datos ficticios:")
@@ -358,7 +254,7 @@ with tabs[0]:
     if demo_file_path and os.path.exists(demo_file_path):
         st.download_button(
             "Descargar CSV demo "+sport,
-            open(demo_file_path,"rb"),
+            _file_bytes(demo_file_path),
             file_name=f"{sport.lower().replace(' ','_')}_demo.csv"
         )
     else:
@@ -376,7 +272,10 @@ with tabs[0]:
         if datasets:
             dataset_options = {f"{d[2]} ({'Proyección' if d[3] else 'Base'}) - {d[4][:10]}": d[0] 
                              for d in datasets}
-            selected_dataset_name = st.selectbox("Dataset activo", list(dataset_options.keys()))
+            ids = list(dataset_options.values())
+            activo = st.session_state.get("selected_dataset_id")
+            selected_dataset_name = st.selectbox("Dataset activo", list(dataset_options.keys()),
+                                                 index=ids.index(activo) if activo in ids else 0)
             selected_dataset_id = dataset_options.get(selected_dataset_name)
             st.session_state["selected_dataset_id"] = selected_dataset_id
         else:
@@ -395,18 +294,31 @@ with tabs[0]:
     is_projection = st.checkbox("Es una proyección (datos futuros)")
     file = st.file_uploader("Sube CSV", type=["csv"], key="uploader_data")
     
-    if file and dataset_name:
+    # file_id evita reimportar el mismo archivo en el rerun posterior
+    file_key = getattr(file, "file_id", None) or (file.name if file else None)
+    if file and dataset_name and st.session_state.get("ingested_file") != file_key:
         try:
-            df = pd.read_csv(file)
-            # Validar esquema
-            expected_cols = FREE_SCHEMAS.get(sport) or FREE_SCHEMAS.get(sport.replace(' ',''))
-            if expected_cols and not set(expected_cols).issubset(df.columns):
-                st.error(f"El archivo no tiene el esquema correcto. Se esperaban las columnas: {', '.join(expected_cols)}. Columnas encontradas: {', '.join(df.columns)}")
+            # Validar esquema leyendo solo la cabecera (con las columnas derivables, como
+            # ingest_csv); los datos se leen por bloques
+            columns = read_header(file)
+            missing = missing_columns(sport, columns) if sport in FREE_SCHEMAS else []
+            if missing:
+                st.error(f"El archivo no tiene el esquema correcto. Faltan las columnas: {', '.join(missing)}. Columnas encontradas: {', '.join(columns)}")
             else:
                 # Crear dataset y guardar datos
                 dataset_id = create_dataset(username, sport, dataset_name, is_projection)
-                if dataset_id and import_csv_to_dataset(df, dataset_id, sport):
-                    st.success(f"Dataset '{dataset_name}' creado con {len(df)} filas.")
+                if dataset_id:
+                    barra = st.progress(0.0, text="Importando filas...")
+                    size = getattr(file, "size", 0)
+                    def _avance(hechas, total):
+                        barra.progress(min(file.tell() / size, 1.0) if size else 1.0, text=f"Importando filas... {hechas}")
+                    try:
+                        filas = ingest_csv(file, dataset_id, sport, progress=_avance)
+                    except Exception:
+                        delete_dataset(dataset_id)
+                        raise
+                    st.session_state["ingested_file"] = file_key
+                    st.success(f"Dataset '{dataset_name}' creado con {filas} filas.")
                     st.session_state["selected_dataset_id"] = dataset_id
                     st.rerun()
         except Exception as e:
@@ -437,49 +349,50 @@ with tabs[0]:
         else:
             st.info(f"No hay template base disponible para {key}.")
 
-with tabs[1]:
+def page_visualizacion():
     st.subheader("Visualización básica")
     dataset_id = st.session_state.get("selected_dataset_id")
     
     if not dataset_id:
         st.info("Selecciona un dataset en la pestaña 'Demo & Datos'.")
     else:
-        df = get_dataset_data(dataset_id, sport)
-        if df.empty:
+        # Lectura directa de la tabla materializada (SELECT por dataset_id)
+        spec = sports.get(sport)
+        standings = load_standings(dataset_id, sport)
+        if spec.frames(standings)[0].empty:
             st.warning("El dataset seleccionado no tiene datos.")
         else:
-            missing, extra, expected = validate_schema(df, sport)
-            if missing:
-                st.error(f"Columnas faltantes: {missing}")
-            else:
-                if sport=="La Liga":
-                    table = compute_standings_laliga(df)
-                    st.markdown("**Tabla de posiciones (regla 3-1-0):**")
-                    st.dataframe(table, use_container_width=True)
-                    st.bar_chart(table.set_index("Equipo")["PTS"])
-                elif sport=="F1":
-                    drv, cons = compute_f1_points(df)
-                    col1,col2 = st.columns(2)
-                    with col1:
-                        st.markdown("**Pilotos:**")
-                        st.dataframe(drv, use_container_width=True)
-                        st.bar_chart(drv.set_index("Piloto")["Puntos"])
-                    with col2:
-                        st.markdown("**Constructores:**")
-                        st.dataframe(cons, use_container_width=True)
-                        st.bar_chart(cons.set_index("Equipo")["Puntos"])
-                elif sport=="MLB":
-                    summ = compute_mlb_summary(df)
-                    st.markdown("**Resumen por equipo (ficticio):**")
-                    st.dataframe(summ, use_container_width=True)
-                    st.bar_chart(summ.set_index("Equipo")["R"])
-                elif sport=="NFL":
-                    tbl = compute_nfl_table(df)
-                    st.markdown("**Tabla NFL (ficticia):**")
-                    st.dataframe(tbl, use_container_width=True)
-                    st.bar_chart(tbl.set_index("Equipo")["W"])
-
-with tabs[2]:
+            show_tables(spec, standings)
+
+            timeline = round_standings_cached(sport, dataset_id)
+            if timeline is not None:
+                render_timeline(spec.frames(timeline)[0])
+
+def render_timeline(timeline):
+    """Evolución de la tabla jornada a jornada (Jornada, Fecha o Carrera del dataset)"""
+    round_col, entity = timeline.columns[0], timeline.columns[2]
+    with st.expander(f"📈 Posición por {round_col.lower()}"):
+        rondas = timeline[round_col].unique()
+        ultima = timeline[timeline[round_col] == rondas[-1]]
+        elegidos = st.multiselect(f"{entity}s", sorted(ultima[entity]), default=list(ultima[entity].head(5)),
+                                  key="timeline_equipos")
+        if elegidos:
+            posiciones = timeline[timeline[entity].isin(elegidos)].pivot(index=round_col, columns=entity, values="Pos")
+            posiciones = posiciones.reindex(rondas)
+            if pd.api.types.is_string_dtype(posiciones.index) or posiciones.index.dtype == object:
+                # Nombres de carrera: se numeran para que el eje conserve el orden del calendario
+                posiciones.index = [f"{i:02d}. {r}" for i, r in enumerate(posiciones.index, start=1)]
+            st.line_chart(posiciones)
+            st.caption(f"Posición en la tabla (1 = primero) después de cada {round_col.lower()}.")
+        if len(rondas) > 1:
+            ronda = st.select_slider(f"Tabla después de la {round_col.lower()}", options=list(rondas),
+                                     value=rondas[-1], key="timeline_ronda")
+        else:
+            ronda = rondas[-1]
+        st.dataframe(timeline[timeline[round_col] == ronda].drop(columns=round_col),
+                     use_container_width=True, hide_index=True)
+
+def page_proyecciones():
     st.subheader("Proyecciones (simula con datasets combinados)")
     st.markdown("1) **Selecciona un dataset base** (datos reales)\n\n2) **Selecciona un dataset de proyección** (escenarios futuros)\n\n3) **Combína ambos** para ver resultados simulados")
     
@@ -514,10 +427,14 @@ with tabs[2]:
     # Descargar plantilla de proyección
     proj_paths = _proj_template_paths()
     if sport in proj_paths:
+        # Sin el archivo de plantilla se generan solo los encabezados (mismo esquema que la base)
+        proj_path = proj_paths[sport]
         st.download_button(
             "📥 Descargar plantilla de proyección " + sport,
-            open(proj_paths[sport],"rb"),
-            file_name=f"plantilla_proyecciones_{sport.lower().replace(' ','_')}.csv"
+            data=(lambda: _file_bytes(proj_path)) if os.path.exists(proj_path)
+                 else (lambda: pd.DataFrame(columns=FREE_SCHEMAS[sport]).to_csv(index=False)),
+            file_name=f"plantilla_proyecciones_{sport.lower().replace(' ','_')}.csv",
+            mime="text/csv"
         )
     
     # Procesar simulación si ambos datasets están seleccionados
@@ -538,110 +455,100 @@ with tabs[2]:
                 st.error(f"Dataset proyección inválido. Faltan columnas: {miss_proj}")
             else:
                 # Combinar datos y calcular resultados
-                if sport=="La Liga":
-                    sim_df = merge_laliga_with_projections(df_base, df_proj)
-                    table = compute_standings_laliga(sim_df)
-                    st.success("✅ Simulación aplicada: resultados actualizados con proyecciones.")
-                    st.dataframe(table, use_container_width=True)
-                    st.bar_chart(table.set_index('Equipo')["PTS"])
-                elif sport=="F1":
-                    sim_df = merge_concat(df_base, df_proj)
-                    drv, cons = compute_f1_points(sim_df)
-                    st.success("✅ Simulación aplicada a pilotos y constructores.")
-                    col1,col2 = st.columns(2)
-                    with col1:
-                        st.dataframe(drv, use_container_width=True)
-                        st.bar_chart(drv.set_index("Piloto")["Puntos"])
-                    with col2:
-                        st.dataframe(cons, use_container_width=True)
-                        st.bar_chart(cons.set_index("Equipo")["Puntos"])
-                elif sport=="MLB":
-                    sim_df = merge_concat(df_base, df_proj)
-                    summ = compute_mlb_summary(sim_df)
-                    st.success("✅ Simulación aplicada.")
-                    st.dataframe(summ, use_container_width=True)
-                    st.bar_chart(summ.set_index("Equipo")["R"])
-                elif sport=="NFL":
-                    sim_df = merge_concat(df_base, df_proj)
-                    tbl = compute_nfl_table(sim_df)
-                    st.success("✅ Simulación aplicada.")
-                    st.dataframe(tbl, use_container_width=True)
-                    st.bar_chart(tbl.set_index("Equipo")["W"])
-
-                # Opción para descargar Excel simulador
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    df_base.to_excel(writer, index=False, sheet_name="DATA_BASE")
-                    df_proj.to_excel(writer, index=False, sheet_name="PROYECCIONES")
-                    # Resúmenes
-                    if sport=="La Liga":
-                        compute_standings_laliga(sim_df).to_excel(writer, index=False, sheet_name="TABLA_SIM")
-                    elif sport=="F1":
-                        d,c = compute_f1_points(sim_df)
-                        d.to_excel(writer, index=False, sheet_name="PILOTOS_SIM")
-                        c.to_excel(writer, index=False, sheet_name="CONSTRUCTORES_SIM")
-                    elif sport=="MLB":
-                        compute_mlb_summary(sim_df).to_excel(writer, index=False, sheet_name="RESUMEN_SIM")
-                    elif sport=="NFL":
-                        compute_nfl_table(sim_df).to_excel(writer, index=False, sheet_name="RESUMEN_SIM")
-                
+                spec = sports.get(sport)
+                result = compute_cached(STANDINGS_FUNCTIONS[sport], sport, base_dataset_id, proj_dataset_id)
+                st.success("✅ Simulación aplicada: resultados actualizados con proyecciones.")
+                show_tables(spec, result, titles=len(spec.tables) > 1)
+
+                # Opción para descargar Excel simulador (se genera al pulsar el botón)
+                sim_sheets = [("DATA_BASE", dataset_sheet(base_dataset_id, sport)),
+                              ("PROYECCIONES", dataset_sheet(proj_dataset_id, sport))]
+                # Resúmenes (ya calculados arriba)
+                sim_sheets += [(table.sheet + "_SIM", df) for table, df in zip(spec.tables, spec.frames(result))]
+
                 st.download_button(
                     "⬇️ Descargar Excel Simulador (BASE + PROYECCIONES + RESUMEN)",
-                    data=buffer.getvalue(),
+                    data=lambda: export_workbook(sim_sheets),
                     file_name=f"simulador_{sport.lower().replace(' ','_')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    mime=XLSX_MIME,
                     use_container_width=True
                 )
     else:
         st.info("Selecciona ambos datasets (base y proyección) para ver la simulación.")
         st.markdown("💡 **Tip:** Crea datasets de proyección marcando la casilla 'Es una proyección' al subir un CSV.")
 
-with tabs[3]:
+    st.divider()
+    st.markdown("### 🎲 Simulación Monte Carlo de la temporada")
+    if sport not in SCORE_MODELS:
+        st.info("La simulación Monte Carlo está disponible para " + ", ".join(SCORE_MODELS) + ".")
+    elif not base_dataset_id:
+        st.info("Selecciona un dataset base para estimar la fuerza de los equipos.")
+    else:
+        st.caption("Se estima ataque/defensa de cada equipo con el dataset base y se simulan los partidos pendientes.")
+        mc1, mc2 = st.columns(2)
+        with mc1:
+            fuentes = ["Calendario restante (ida y vuelta)"]
+            if proj_dataset_id:
+                fuentes.append("Partidos del dataset de proyección")
+            fuente = st.radio("Partidos a simular", fuentes, key="mc_fuente")
+        with mc2:
+            n_sims = st.selectbox("Temporadas simuladas", [10_000, 100_000, 1_000_000],
+                                  format_func=lambda n: f"{n:,}", key="mc_n")
+        fixtures_id = proj_dataset_id if fuente.startswith("Partidos") else None
+        mc_key = (sport, base_dataset_id, fixtures_id, n_sims)
+        if st.button("🎲 Simular temporada", key="mc_run"):
+            with st.spinner(f"Simulando {n_sims:,} temporadas..."):
+                try:
+                    st.session_state["montecarlo"] = (mc_key, montecarlo_cached(sport, n_sims, base_dataset_id, fixtures_id))
+                except ValueError as e:
+                    st.error(f"No se pudo simular: {e}")
+        saved = st.session_state.get("montecarlo")
+        if saved and saved[0] == mc_key:
+            probs = saved[1]
+            st.dataframe(probs.style.format({c: "{:.1%}" for c in probs.columns if c.startswith("P_")}),
+                         use_container_width=True)
+            st.bar_chart(probs.set_index("Equipo")["P_Campeon"])
+
+def page_excel():
     st.subheader("Generar Excel (Plantilla Freemium)")
     dataset_id = st.session_state.get("selected_dataset_id")
     
     if not dataset_id:
         st.info("Selecciona un dataset en la pestaña 'Demo & Datos'.")
     else:
-        df = get_dataset_data(dataset_id, sport)
-        if df.empty:
+        # Los resúmenes salen de la tabla materializada; los datos crudos no se cargan en memoria
+        standings = load_standings(dataset_id, sport)
+        if sports.get(sport).frames(standings)[0].empty:
             st.warning("El dataset seleccionado no tiene datos.")
         else:
-            missing, extra, expected = validate_schema(df, sport)
-            if missing:
-                st.error(f"Columnas faltantes: {missing}")
-            else:
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                    df.to_excel(writer, index=False, sheet_name="DATA")
-                    if sport=="La Liga":
-                        compute_standings_laliga(df).to_excel(writer, index=False, sheet_name="TABLA")
-                    elif sport=="F1":
-                        drv, cons = compute_f1_points(df)
-                        drv.to_excel(writer, index=False, sheet_name="PILOTOS")
-                        cons.to_excel(writer, index=False, sheet_name="CONSTRUCTORES")
-                    elif sport=="MLB":
-                        compute_mlb_summary(df).to_excel(writer, index=False, sheet_name="RESUMEN")
-                    elif sport=="NFL":
-                        compute_nfl_table(df).to_excel(writer, index=False, sheet_name="RESUMEN")
-                    notes = pd.DataFrame({"Nota":[
-                        "Esta plantilla Freemium usa datos almacenados en SQLite.",
-                        "Los datos se gestionan directamente en la aplicación.",
-                        "Para simulación, usa la pestaña 'Proyecciones' con datasets combinados.",
-                        "Desbloquea Premium para simuladores y dashboards enriquecidos."
-                    ]})
-                    notes.to_excel(writer, index=False, sheet_name="INSTRUCCIONES")
-                st.download_button(
-                    "⬇️ Descargar Excel Freemium",
-                    data=buffer.getvalue(),
-                    file_name=f"plantilla_{sport.lower().replace(' ','_')}_freemium.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
-                )
-                st.success("Plantilla Excel generada desde datos SQLite.")
-
-
-with tabs[4]:
+            sheets = [("DATA", dataset_sheet(dataset_id, sport))] + dataset_access.standings_sheets(standings, sport)
+            notes = pd.DataFrame({"Nota":[
+                "Esta plantilla Freemium usa datos almacenados en SQLite.",
+                "Los datos se gestionan directamente en la aplicación.",
+                "Para simulación, usa la pestaña 'Proyecciones' con datasets combinados.",
+                "Desbloquea Premium para simuladores y dashboards enriquecidos."
+            ]})
+            sheets.append(("INSTRUCCIONES", notes))
+
+            def _workbook():
+                # Tabla por jornada solo si el dataset trae Jornada/Fecha
+                timeline = round_standings_cached(sport, dataset_id)
+                extra = dataset_access.round_sheets(timeline, sport) if timeline is not None else []
+                return export_workbook(sheets[:-1] + extra + sheets[-1:])
+
+            # El libro se genera al pulsar el botón (las filas de DATA se leen de SQLite por lotes);
+            # la descarga envía los bytes completos
+            st.download_button(
+                "⬇️ Descargar Excel Freemium",
+                data=_workbook,
+                file_name=f"plantilla_{sport.lower().replace(' ','_')}_freemium.xlsx",
+                mime=XLSX_MIME,
+                use_container_width=True
+            )
+            st.success("Plantilla Excel generada desde datos SQLite.")
+
+
+def page_premium():
     st.subheader("Zona Premium (demo visual)")
     st.markdown("""
     Aquí aparecerán **simuladores**, **dashboards con slicers** y actualización automática.
@@ -656,11 +563,9 @@ with tabs[4]:
         st.info("Versión comercial: macros + auto-actualización + pagos.")
 
 # ---------- NEW PREMIUM TAB: Escenarios & Sensibilidad ----------
-premium_tabs = st.tabs(["🅿️ Premium: Escenarios A/B/C","🅿️ Premium: Sensibilidad"])
-
-with premium_tabs[0]:
-    st.subheader("Escenarios A/B/C — compara proyecciones")
-    st.markdown("Guarda hasta **3 escenarios** con tus proyecciones y compáralos lado a lado.")
+def page_escenarios():
+    st.subheader("Escenarios — compara proyecciones")
+    st.markdown("Guarda **escenarios con la etiqueta que quieras** (A, B, optimista…) y compara todos los que necesites lado a lado.")
     if "escenarios" not in st.session_state:
         st.session_state["escenarios"] = {}
 
@@ -668,15 +573,19 @@ with premium_tabs[0]:
     with col_sel:
         sport_s = st.selectbox("Deporte del escenario", list(FREE_SCHEMAS.keys()), key="esc_sport")
     with col_label:
-        label = st.selectbox("Etiqueta de escenario", ["A","B","C"], key="esc_label")
+        label = st.text_input("Etiqueta de escenario", value="A", key="esc_label").strip() or "A"
 
     base_df = st.session_state.get("dataframes",{}).get(sport_s)
+    esc_dataset_id = st.session_state.get("selected_dataset_id") if sport_s == sport else None
+    if base_df is None and esc_dataset_id:
+        # Base = dataset seleccionado en la barra lateral
+        base_df = get_dataset_data(esc_dataset_id, sport_s)
     proj_file = st.file_uploader("Sube CSV de PROYECCIONES para este escenario", type=["csv"], key=f"proj_{sport_s}_{label}")
     if base_df is None:
         st.info("Primero carga tu CSV base en 'Demo & Datos'.")
     else:
         if proj_file:
-            df_proj = pd.read_csv(proj_file)
+            df_proj = sports.get(sport_s).prepare_frame(pd.read_csv(proj_file))
             miss_base, _, _ = validate_schema(base_df, sport_s)
             miss_proj, _, _ = validate_schema(df_proj, sport_s)
             if miss_base:
@@ -684,20 +593,11 @@ with premium_tabs[0]:
             elif miss_proj:
                 st.error(f"Proyección inválida. Faltan columnas: {miss_proj}")
             else:
-                # build simulated df per sport
-                if sport_s=="La Liga":
-                    sim_df = merge_laliga_with_projections(base_df, df_proj)
-                    resumen = compute_standings_laliga(sim_df).rename(columns={"PTS":"PTS_"+label})
-                elif sport_s=="F1":
-                    sim_df = merge_concat(base_df, df_proj)
-                    resumen, cons = compute_f1_points(sim_df)
-                    resumen = resumen.rename(columns={"Puntos":"PTS_"+label})
-                elif sport_s=="MLB":
-                    sim_df = merge_concat(base_df, df_proj)
-                    resumen = compute_mlb_summary(sim_df).rename(columns={"R":"R_"+label})
-                elif sport_s=="NFL":
-                    sim_df = merge_concat(base_df, df_proj)
-                    resumen = compute_nfl_table(sim_df).rename(columns={"W":"W_"+label})
+                # Primera tabla del deporte, con la métrica renombrada a <prefijo>_<etiqueta>
+                spec = sports.get(sport_s)
+                sim_df = merge_concat(base_df, df_proj)
+                metric, prefix = spec.scenario
+                resumen = spec.frames(spec.compute(sim_df))[0].rename(columns={metric: f"{prefix}_{label}"})
 
                 # save scenario
                 ensure_user(st.session_state.get('username',''))
@@ -710,97 +610,58 @@ with premium_tabs[0]:
     persisted = load_scenarios(st.session_state.get('username',''), sport_s)
     st.session_state.setdefault('escenarios',{})
     st.session_state['escenarios'].setdefault(sport_s,{})
-    st.session_state['escenarios'][sport_s].update(persisted)
+    for lab, ref in persisted.items():
+        # Se conserva el objeto ya cargado (y su DataFrame decodificado) si es la misma versión
+        previo = st.session_state['escenarios'][sport_s].get(lab)
+        if not (isinstance(previo, StoredScenario) and previo.id == ref.id):
+            st.session_state['escenarios'][sport_s][lab] = ref
     esc = st.session_state.get("escenarios",{}).get(sport_s, {})
     if len(esc)>=2:
         st.markdown("### Comparativa")
-        # merge on entity column
-        if sport_s in ["La Liga","NFL","MLB"]:
-            # Ensure same "Equipo" key
-            combined = None
-            for lab,res in esc.items():
-                dfk = res.copy()
-                key = "Equipo" if "Equipo" in dfk.columns else ("Equipo" if sport_s!="F1" else "Piloto")
-                if combined is None:
-                    combined = dfk.set_index(key)
-                else:
-                    combined = combined.join(dfk.set_index(key)[[c for c in dfk.columns if c not in ["Pos"]]], how="outer")
-            st.dataframe(combined.fillna(0), use_container_width=True)
-            # Choose a metric to chart
-            metric = None
-            if sport_s=="La Liga":
-                metric = [c for c in combined.columns if c.startswith("PTS_")]
-            elif sport_s=="MLB":
-                metric = [c for c in combined.columns if c.startswith("R_")]
-            elif sport_s=="NFL":
-                metric = [c for c in combined.columns if c.startswith("W_")]
-            if metric:
-                st.bar_chart(combined[metric])
-        else:  # F1 (Pilotos)
-            combined = None
-            for lab,res in esc.items():
-                dfk = res.copy()  # columns Pos, Piloto, Equipo, PTS_label
-                dfk = dfk.set_index("Piloto")
-                if combined is None:
-                    combined = dfk
-                else:
-                    combined = combined.join(dfk[[c for c in dfk.columns if c.startswith("PTS_")]], how="outer")
-            st.dataframe(combined.fillna(0), use_container_width=True)
-            st.bar_chart(combined[[c for c in combined.columns if c.startswith("PTS_")]])
-
-with premium_tabs[1]:
+        etiquetas = list(esc)
+        elegidos = st.multiselect("Escenarios a comparar", etiquetas, default=etiquetas, key="esc_cmp")
+        if len(elegidos) < 2:
+            st.info("Elige al menos dos escenarios.")
+        else:
+            referencia = st.selectbox("Escenario de referencia (ΔPos)", elegidos, key="esc_ref")
+            # Los escenarios persistidos se decodifican recién aquí
+            frames = {lab: (esc[lab].frame if isinstance(esc[lab], StoredScenario) else esc[lab]) for lab in elegidos}
+            comparacion = compare_scenarios(frames, sport_s, reference=referencia)
+            st.dataframe(comparison_table(comparacion), use_container_width=True)
+            st.bar_chart(comparacion.values)
+            st.markdown("#### Dispersión entre escenarios")
+            st.dataframe(comparacion.stats, use_container_width=True)
+
+def page_sensibilidad():
     st.subheader("Análisis de Sensibilidad — ajusta y observa el impacto")
     st.markdown("Aplica un **ajuste incremental** y observa la variación en el ranking/resumen.")
 
     sport_x = st.selectbox("Deporte", list(FREE_SCHEMAS.keys()), key="sens_sport")
     base_df = st.session_state.get("dataframes",{}).get(sport_x)
-    if base_df is None:
+    sens_dataset_id = st.session_state.get("selected_dataset_id") if sport_x == sport else None
+    if base_df is None and not sens_dataset_id:
         st.info("Primero carga tu CSV base en 'Demo & Datos'.")
     else:
-        if sport_x=="La Liga":
-            equipo = st.text_input("Equipo a ajustar (exacto como aparece en DATA)", value="Real Madrid")
-            delta = st.slider("Goles a sumar por partido (hipotético)", -2, 2, 1)
-            sim = base_df.copy()
-            mask_home = sim["Local"]==equipo
-            mask_away = sim["Visitante"]==equipo
-            sim.loc[mask_home,"Goles_Local"] = sim.loc[mask_home,"Goles_Local"] + delta
-            sim.loc[mask_away,"Goles_Visitante"] = sim.loc[mask_away,"Goles_Visitante"] + delta
-            table = compute_standings_laliga(sim)
-            st.dataframe(table, use_container_width=True)
-            st.bar_chart(table.set_index("Equipo")["PTS"])
-        elif sport_x=="F1":
-            piloto = st.text_input("Piloto a ajustar", value="Max Perez")
-            delta = st.slider("Puntos a sumar por carrera", -5, 5, 2)
-            sim = base_df.copy()
-            sim.loc[sim["Piloto"]==piloto,"Puntos"] = sim.loc[sim["Piloto"]==piloto,"Puntos"] + delta
-            drv, cons = compute_f1_points(sim)
-            col1,col2 = st.columns(2)
-            with col1:
-                st.dataframe(drv, use_container_width=True)
-                st.bar_chart(drv.set_index("Piloto")["Puntos"])
-            with col2:
-                st.dataframe(cons, use_container_width=True)
-                st.bar_chart(cons.set_index("Equipo")["Puntos"])
-        elif sport_x=="MLB":
-            equipo = st.text_input("Equipo a ajustar", value="Yankees")
-            delta = st.slider("Home Runs a sumar por juego", -2, 2, 1)
-            sim = base_df.copy()
-            sim.loc[sim["Equipo_Local"]==equipo,"HR_Local"] = sim.loc[sim["Equipo_Local"]==equipo,"HR_Local"] + delta
-            sim.loc[sim["Equipo_Visitante"]==equipo,"HR_Visitante"] = sim.loc[sim["Equipo_Visitante"]==equipo,"HR_Visitante"] + delta
-            summ = compute_mlb_summary(sim)
-            st.dataframe(summ, use_container_width=True)
-            st.bar_chart(summ.set_index("Equipo")["HR"])
-        elif sport_x=="NFL":
-            equipo = st.text_input("Equipo a ajustar", value="Cowboys")
-            delta = st.slider("Puntos a sumar por juego", -7, 7, 3)
-            sim = base_df.copy()
-            sim.loc[sim["Local"]==equipo,"Puntos_Local"] = sim.loc[sim["Local"]==equipo,"Puntos_Local"] + delta
-            sim.loc[sim["Visitante"]==equipo,"Puntos_Visitante"] = sim.loc[sim["Visitante"]==equipo,"Puntos_Visitante"] + delta
-            tbl = compute_nfl_table(sim)
-            st.dataframe(tbl, use_container_width=True)
-            st.bar_chart(tbl.set_index("Equipo")["W"])
-
-with tabs[5]:
+        # Motor incremental: totales base cacheados, cada ajuste solo recalcula los partidos del equipo
+        engine = build_whatif(base_df, sport_x) if base_df is not None else whatif_engine(sport_x, sens_dataset_id)
+        spec = sports.get(sport_x)
+        knob = spec.knob
+        entidad = st.text_input(knob.entity_label, value=knob.default_entity)
+        rango = (knob.low, knob.high)
+        delta = st.slider(knob.delta_label, *rango, knob.default)
+        show_tables(spec, engine.standings(entidad, delta), titles=False)
+
+        # Barrido: todas las posiciones del rango del slider en un solo cálculo por equipo
+        with st.expander("📉 Barrido: posición vs. ajuste para todo el rango"):
+            opciones = engine.entities
+            elegidos = st.multiselect("Equipos/pilotos a comparar", opciones, default=opciones[:3], key="sens_sweep")
+            if elegidos:
+                posiciones = engine.sweep(elegidos, range(rango[0], rango[1] + 1))
+                st.dataframe(posiciones, use_container_width=True)
+                st.line_chart(posiciones)
+                st.caption("Posición en la tabla (1 = primero) para cada ajuste aplicado al propio equipo/piloto.")
+
+def page_templates():
     st.subheader("🗂️ Administrar Templates personalizados")
     st.markdown("Sube, descarga o elimina tus propios templates (CSV) para cada deporte.")
     sport_sel = st.selectbox("Deporte para template", list(FREE_SCHEMAS.keys()), key="template_sport")
@@ -843,7 +704,7 @@ with tabs[5]:
             mime="text/csv",
             key=f"dl_base_{sport_sel}"
         )
-with tabs[6]:
+def page_gestion():
     st.subheader("🗄️ Gestión Avanzada de Datasets")
     st.markdown("Visualiza y gestiona todos tus datasets almacenados en SQLite.")
     
@@ -893,6 +754,19 @@ with tabs[6]:
                         st.success("Dataset eliminado correctamente")
                         st.rerun()
             
+            if st.button("🧮 Verificar tabla materializada") and selected_id:
+                dataset_info = datasets_df[datasets_df["ID"] == selected_id].iloc[0]
+                dataset_data = get_dataset_data(selected_id, dataset_info["Deporte"])
+                diffs = check_consistency(selected_id, dataset_info["Deporte"], dataset_data)
+                if diffs.empty:
+                    st.success("La tabla materializada coincide con el cálculo completo.")
+                else:
+                    st.error(f"Se encontraron {len(diffs)} diferencias; se reconstruye la tabla.")
+                    st.dataframe(diffs, use_container_width=True)
+                    with transaction() as con:
+                        rebuild(con, selected_id, dataset_info["Deporte"], dataset_data)
+                    st.info("Tabla materializada reconstruida.")
+            
             # Estadísticas generales
             st.markdown("### Estadísticas")
             col1, col2, col3, col4 = st.columns(4)
@@ -907,4 +781,69 @@ with tabs[6]:
                 st.metric("Proyecciones", proj_count)
             with col4:
                 sports_count = len(set(d[1] for d in all_datasets))
-                st.metric("Deportes", sports_count)
\ No newline at end of file
+                st.metric("Deportes", sports_count)
+
+        # Retención de escenarios y compactación de la base
+        st.markdown("### Mantenimiento de la base")
+        running, report, error = background_status()
+        st.caption(f"Se conservan las últimas {KEEP_VERSIONS} versiones de cada escenario; "
+                   "las anteriores se eliminan y se compacta la base.")
+        if st.button("🧹 Ejecutar retención ahora", disabled=running):
+            start_background(force=True)
+            running = True
+        if running:
+            st.info("Retención en curso…")
+        elif error:
+            st.error(f"Error en la retención: {error}")
+        elif report:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Versiones eliminadas", report["eliminados"])
+            col2.metric("Espacio recuperado", f"{report['bytes_recuperados'] / 1e6:.2f} MB")
+            col3.metric("Tamaño actual", f"{report['bytes_despues'] / 1e6:.2f} MB")
+            st.caption(f"Última ejecución: {report['fecha']} ({report['segundos']} s)")
+            if not report.get("compactada"):
+                st.caption("La base no se compacta sola hasta activar auto_vacuum una vez: "
+                           "`python -m modules.retention --vacuum full`")
+
+# ---- Router: cada pestaña es una página y solo se ejecuta la abierta ----
+PAGES = {
+    "🏟️ Demo & Datos": page_demo,
+    "📈 Visualización básica": page_visualizacion,
+    "🧪 Proyecciones (simula)": page_proyecciones,
+    "📥 Generar Excel": page_excel,
+    "🔒 Zona Premium": page_premium,
+    "🗂️ Administrar Templates": page_templates,
+    "🗄️ Gestión Datasets": page_gestion,
+}
+PREMIUM_PAGES = {
+    "🅿️ Premium: Escenarios": page_escenarios,
+    "🅿️ Premium: Sensibilidad": page_sensibilidad,
+}
+
+def render_pages(pages, key):
+    """Pestañas con ejecución diferida: con on_change="rerun" cada pestaña sabe si está
+    abierta (tab.open) y solo esa ejecuta su página (lecturas, cálculos, gráficos)"""
+    tabs = st.tabs(list(pages), key=key, on_change="rerun")
+    for tab, (label, render) in zip(tabs, pages.items()):
+        if tab.open:
+            with tab:
+                profiling.section(label)
+                render()
+
+sync_selected_dataset(st.session_state.get("username", ""), sport)
+render_pages(PAGES, "pagina")
+render_pages(PREMIUM_PAGES, "pagina_premium")
+
+# ---- Perfilado (opt-in) ----
+profile = profiling.end_run()
+with st.sidebar:
+    st.divider()
+    st.toggle("⏱️ Perfilado del rerun", key="profiling_panel",
+              help=f"Tiempos por pestaña y función; cada rerun se agrega a {profiling.PROFILING_LOG}")
+    if profile is not None and st.session_state.get("profiling_panel"):
+        functions, sections = profiling.summarize(profile)
+        st.caption(f"Rerun {profile['id']}: {profile['total_ms']:.0f} ms")
+        st.markdown("**Por pestaña**")
+        st.dataframe(pd.DataFrame(sections), use_container_width=True, hide_index=True)
+        st.markdown("**Por función**")
+        st.dataframe(pd.DataFrame(functions), use_container_width=True, hide_index=True)
\ No newline at end of file
@@ -0,0 +1,85 @@
+# ingest.py - Benchmark de importación: INSERT por fila (iterrows) vs executemany por lotes
+#
+# Uso:
+#   python -m benchmarks.ingest
+#   python -m benchmarks.ingest --sizes 10000 200000 --chunk-size 20000
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from modules import storage
+from modules.ingest import import_frame
+from modules.migrations import migrate
+from benchmarks.standings import synthetic_matches
+
+DEFAULT_SIZES = [10_000, 50_000, 200_000]
+
+
+# Esquema anterior (nombres como TEXT en cada fila) para la ruta por fila
+_LEGACY_DDL = """CREATE TABLE matches_legacy (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, dataset_id INTEGER, local TEXT, visitante TEXT,
+    goles_local INTEGER DEFAULT 0, goles_visitante INTEGER DEFAULT 0)"""
+
+
+def per_row_import(db_path, df, dataset_id=1):
+    """Ruta anterior: una conexión, un INSERT por fila con iterrows()"""
+    con = sqlite3.connect(db_path)
+    cur = con.cursor()
+    for _, row in df.iterrows():
+        cur.execute("""INSERT INTO matches_legacy (dataset_id, local, visitante, goles_local, goles_visitante)
+                      VALUES (?, ?, ?, ?, ?)""",
+                    (dataset_id, row['Local'], row['Visitante'],
+                     row['Goles_Local'], row['Goles_Visitante']))
+    con.commit()
+    con.close()
+
+
+def bulk_import(db_path, df, dataset_id=1, chunk_size=None):
+    """Ruta nueva: import_frame (ids de teams + executemany por lotes en una transacción)"""
+    import_frame(df, dataset_id, "La Liga", chunk_size=chunk_size, db_path=db_path)
+
+
+def _fresh_db(directory, name):
+    path = os.path.join(directory, name)
+    migrate(path)
+    with storage.transaction(path) as con:
+        con.execute("INSERT INTO datasets (id, username, sport, name) VALUES (1, 'bench', 'La Liga', 'bench')")
+        con.execute(_LEGACY_DDL)
+    return path
+
+
+def run(sizes=DEFAULT_SIZES, chunk_size=None):
+    """Devuelve un DataFrame con los tiempos (segundos) de ambas rutas por tamaño"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            df = synthetic_matches(n)
+            path = _fresh_db(tmp, f"rows_{n}.db")
+            t0 = time.perf_counter()
+            per_row_import(path, df)
+            per_row = time.perf_counter() - t0
+
+            path = _fresh_db(tmp, f"bulk_{n}.db")
+            t0 = time.perf_counter()
+            bulk_import(path, df, chunk_size=chunk_size)
+            bulk = time.perf_counter() - t0
+            storage.close_all()
+            results.append({"filas": n, "por_fila_s": per_row, "bulk_s": bulk, "speedup": per_row / bulk})
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de import_csv_to_dataset (por fila vs bulk)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+    table = run(args.sizes, args.chunk_size)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# standings.py - Benchmark del motor de tablas (1k → 1M partidos)
+#
+# Uso:
+#   python -m benchmarks.standings
+#   python -m benchmarks.standings --sizes 1000 10000 100000 --teams 30
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.utils import compute_standings_laliga, compute_nfl_table, compute_mlb_summary
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# El cálculo por equipo (implementación anterior) es O(equipos × partidos);
+# solo se mide hasta este tamaño para no eternizar el benchmark.
+LEGACY_MAX_SIZE = 100_000
+
+
+def synthetic_matches(n, teams=20, seed=0, cols=("Local", "Visitante", "Goles_Local", "Goles_Visitante"), max_score=5):
+    """Genera n partidos ficticios con el esquema indicado"""
+    rng = np.random.default_rng(seed)
+    nombres = np.array([f"Equipo {i:02d}" for i in range(teams)], dtype=object)
+    local = rng.integers(0, teams, n)
+    visitante = (local + rng.integers(1, teams, n)) % teams
+    return pd.DataFrame({
+        cols[0]: nombres[local],
+        cols[1]: nombres[visitante],
+        cols[2]: rng.integers(0, max_score + 1, n),
+        cols[3]: rng.integers(0, max_score + 1, n),
+    })
+
+
+def legacy_standings_laliga(df):
+    """Implementación previa (dos máscaras por equipo), solo para comparar"""
+    rows = []
+    for equipo in set(df["Local"].tolist() + df["Visitante"].tolist()):
+        local_games = df[df["Local"] == equipo]
+        away_games = df[df["Visitante"] == equipo]
+        gf = local_games["Goles_Local"].sum() + away_games["Goles_Visitante"].sum()
+        gc = local_games["Goles_Visitante"].sum() + away_games["Goles_Local"].sum()
+        g = int((local_games["Goles_Local"] > local_games["Goles_Visitante"]).sum()
+                + (away_games["Goles_Visitante"] > away_games["Goles_Local"]).sum())
+        e = int((local_games["Goles_Local"] == local_games["Goles_Visitante"]).sum()
+                + (away_games["Goles_Visitante"] == away_games["Goles_Local"]).sum())
+        rows.append({"Equipo": equipo, "PTS": g * 3 + e, "DG": int(gf - gc), "GF": int(gf)})
+    return pd.DataFrame(rows).sort_values(["PTS", "DG", "GF"], ascending=False)
+
+
+def _best_of(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sizes=DEFAULT_SIZES, teams=20, repeat=3, legacy=True):
+    """Devuelve un DataFrame con los tiempos (segundos) por tamaño y función"""
+    results = []
+    for n in sizes:
+        liga = synthetic_matches(n, teams)
+        nfl = synthetic_matches(n, teams, cols=("Local", "Visitante", "Puntos_Local", "Puntos_Visitante"), max_score=45)
+        mlb = synthetic_matches(n, teams, cols=("Equipo_Local", "Equipo_Visitante", "R_Local", "R_Visitante"), max_score=10)
+        row = {
+            "partidos": n,
+            "laliga_s": _best_of(compute_standings_laliga, liga, repeat),
+            "nfl_s": _best_of(compute_nfl_table, nfl, repeat),
+            "mlb_s": _best_of(compute_mlb_summary, mlb, repeat),
+        }
+        if legacy and n <= LEGACY_MAX_SIZE:
+            row["laliga_legacy_s"] = _best_of(legacy_standings_laliga, liga, 1)
+            row["speedup"] = row["laliga_legacy_s"] / row["laliga_s"]
+        results.append(row)
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de compute_standings_laliga / compute_nfl_table / compute_mlb_summary")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-legacy", action="store_true", help="No medir la implementación anterior")
+    args = parser.parse_args(argv)
+    table = run(args.sizes, args.teams, args.repeat, legacy=not args.no_legacy)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# suite.py - Suite de benchmarks: cálculos de utils + rutas de E/S SQLite, con salida JSON
+#
+# Genera datasets sintéticos por deporte (columnas de FREE_SCHEMAS), mide el
+# mejor tiempo de N repeticiones y el pico de memoria (tracemalloc, en una
+# ejecución aparte para no alterar los tiempos) y compara contra una línea
+# base guardada para marcar regresiones.
+#
+# Uso:
+#   python -m benchmarks.suite --output bench.json
+#   python -m benchmarks.suite --sizes 10000 100000 --baseline bench.json --tolerance 0.25
+#   python -m benchmarks.suite --cases compute import excel --sports "La Liga"
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from modules import storage
+from modules.cache import dataset_cache
+from modules.columnar import read_sqlite
+from modules.datasets import create_dataset, dataset_data
+from modules.export import dataset_sheet, write_workbook
+from modules.ingest import import_frame
+from modules.migrations import migrate
+from modules.sports import get as sport_spec
+from modules.utils import FREE_SCHEMAS, STANDINGS_FUNCTIONS
+from benchmarks.standings import synthetic_matches
+
+DEFAULT_SIZES = [10_000, 100_000]
+# Tolerancia por defecto antes de marcar una regresión (20 % más lento o más memoria)
+DEFAULT_TOLERANCE = 0.2
+# Diferencias menores que esto (segundos / MB) se consideran ruido
+MIN_DELTA_S = 0.005
+MIN_DELTA_MB = 1.0
+
+CASES = ["compute", "import", "get_dataset_data", "excel"]
+# Nombre de la función medida en cada caso (así se reportan)
+_COMPUTE_NAMES = {sport: fn.__name__ for sport, fn in STANDINGS_FUNCTIONS.items()}
+# Marcador máximo por partido según el formato (ruleset) del deporte
+_MAX_SCORES = {"La Liga": 5, "MLB": 10, "NFL": 45}
+_F1_POINTS = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+
+
+def synthetic_dataset(sport, n, teams=20, seed=0):
+    """n filas ficticias con las columnas de FREE_SCHEMAS[sport]"""
+    cols = FREE_SCHEMAS[sport]
+    if sport_spec(sport).kind == "puntos":
+        rng = np.random.default_rng(seed)
+        pilotos = np.array([f"Piloto {i:02d}" for i in range(teams)], dtype=object)
+        # Dos pilotos por constructor
+        equipos = np.array([f"Equipo {i // 2:02d}" for i in range(teams)], dtype=object)
+        piloto = rng.integers(0, teams, n)
+        return pd.DataFrame({cols[0]: pilotos[piloto], cols[1]: equipos[piloto],
+                             cols[2]: rng.choice(_F1_POINTS, n)})
+    max_score = _MAX_SCORES.get(sport_spec(sport).rules, 5)
+    return synthetic_matches(n, teams, seed=seed, cols=tuple(cols), max_score=max_score)
+
+
+def measure(fn, repeat=3, setup=None):
+    """(mejor tiempo en segundos, pico de memoria en MB) de ``fn()``.
+
+    ``setup()`` se ejecuta antes de cada llamada, fuera de la medición.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def _fresh_dataset(db_path, sport):
+    return create_dataset("bench", sport, f"bench {sport}", db_path=db_path)
+
+
+def run(sizes=DEFAULT_SIZES, sports=None, cases=None, repeat=3, teams=20, progress=None):
+    """Lista de resultados {caso, funcion, deporte, filas, segundos, pico_mb}"""
+    sports = list(sports or FREE_SCHEMAS)
+    cases = list(cases or CASES)
+    results = []
+
+    def record(case, function, sport, n, seconds, peak):
+        results.append({"caso": case, "funcion": function, "deporte": sport, "filas": n,
+                        "segundos": round(seconds, 6), "pico_mb": round(peak, 3)})
+        if progress:
+            progress(results[-1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench.db")
+        migrate(db)
+        for n in sizes:
+            for sport in sports:
+                df = synthetic_dataset(sport, n, teams)
+                if "compute" in cases:
+                    fn = STANDINGS_FUNCTIONS[sport]
+                    record("compute", _COMPUTE_NAMES[sport], sport, n, *measure(lambda: fn(df), repeat))
+                if "import" in cases:
+                    # Cada repetición importa a un dataset nuevo (import_csv_to_dataset → import_frame)
+                    target = {}
+                    setup = lambda: target.update(id=_fresh_dataset(db, sport))
+                    record("import", "import_csv_to_dataset", sport, n,
+                           *measure(lambda: import_frame(df, target["id"], sport, db_path=db), repeat, setup))
+                if "get_dataset_data" not in cases and "excel" not in cases:
+                    continue
+                dataset_id = _fresh_dataset(db, sport)
+                import_frame(df, dataset_id, sport, db_path=db)
+                if "get_dataset_data" in cases:
+                    # Sin caché en memoria: la primera lectura genera la copia columnar y las siguientes la mapean
+                    record("get_dataset_data", "get_dataset_data", sport, n,
+                           *measure(lambda: dataset_data(dataset_id, sport, db), repeat, dataset_cache.invalidate))
+                    # Ruta SQLite (JOIN con teams), la que se usa sin copia columnar al día
+                    record("get_dataset_data", "read_sqlite", sport, n,
+                           *measure(lambda: read_sqlite(dataset_id, sport, db), repeat))
+                if "excel" in cases:
+                    standings = STANDINGS_FUNCTIONS[sport](df)
+                    tables = sport_spec(sport).frames(standings)
+                    sheets = [("DATA", dataset_sheet(dataset_id, sport))] + [(f"T{i}", t) for i, t in enumerate(tables)]
+                    path = os.path.join(tmp, "bench.xlsx")
+                    record("excel", "export_workbook", sport, n,
+                           *measure(lambda: write_workbook(path, sheets, db), repeat))
+        storage.close_all()
+    dataset_cache.invalidate()
+    return results
+
+
+def environment():
+    return {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compara con los resultados de una línea base; una fila por medición común.
+
+    ``regresion`` es True si el tiempo o el pico de memoria superan la base en
+    más de ``tolerance`` (y en más de MIN_DELTA_S / MIN_DELTA_MB).
+    """
+    key = ["caso", "funcion", "deporte", "filas"]
+    current = pd.DataFrame(results)
+    base = pd.DataFrame(baseline)
+    if current.empty or base.empty:
+        return pd.DataFrame(columns=key + ["segundos", "base_segundos", "ratio", "pico_mb", "base_pico_mb", "regresion"])
+    merged = current.merge(base[key + ["segundos", "pico_mb"]].rename(
+        columns={"segundos": "base_segundos", "pico_mb": "base_pico_mb"}), on=key, how="inner")
+    merged["ratio"] = (merged["segundos"] / merged["base_segundos"].where(merged["base_segundos"] > 0)).round(3)
+    slower = ((merged["segundos"] > merged["base_segundos"] * (1 + tolerance))
+              & (merged["segundos"] - merged["base_segundos"] > MIN_DELTA_S))
+    heavier = ((merged["pico_mb"] > merged["base_pico_mb"] * (1 + tolerance))
+               & (merged["pico_mb"] - merged["base_pico_mb"] > MIN_DELTA_MB))
+    merged["regresion"] = slower | heavier
+    return merged[key + ["segundos", "base_segundos", "ratio", "pico_mb", "base_pico_mb", "regresion"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de benchmarks (cálculos de utils, importación, lectura y Excel)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--sports", nargs="+", choices=list(FREE_SCHEMAS), default=None)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--output", default=None, help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", default=None, help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    def report(r):
+        print(f"{r['caso']:<17} {r['deporte']:<8} {r['filas']:>9}  {r['segundos']:>9.4f} s  {r['pico_mb']:>9.1f} MB")
+
+    results = run(args.sizes, args.sports, args.cases, args.repeat, args.teams, progress=report)
+    payload = {"entorno": environment(), "parametros": {"sizes": args.sizes, "repeat": args.repeat, "teams": args.teams},
+               "resultados": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["resultados"]
+        table = compare(results, baseline, args.tolerance)
+        print(table.to_string(index=False))
+        regressions = int(table["regresion"].sum())
+        if regressions:
+            print(f"{regressions} regresiones (tolerancia {args.tolerance:.0%})")
+            return 1
+        print("Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from modules.columnar import migrate_all, store_dir
+from modules.migrations import migrate
+
+
+def _avance(hechos, total):
+    print(f"  {hechos}/{total} datasets", end="\r")
+
+
+migrate()
+written = migrate_all(progress=_avance)
+
+print(f"\nCopia columnar actualizada en {store_dir()} ({written} datasets escritos).")
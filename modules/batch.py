@@ -0,0 +1,150 @@
+# batch.py - Tablas de posiciones en lote, sin Streamlit (lo usa la CLI sportika)
+#
+# Cada trabajo (un dataset de la base o un archivo CSV) se procesa en un
+# proceso del pool: lee sus filas, calcula la tabla con modules.utils y
+# escribe sus archivos; al proceso principal solo vuelve un resumen.
+import importlib.util
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import pandas as pd
+
+from modules import datasets, sports
+from modules.export import dataset_sheet, write_workbook
+from modules.simulation import MP_START_METHOD
+from modules.utils import FREE_SCHEMAS, validate_schema
+
+FORMATS = ("csv", "xlsx", "parquet")
+
+
+class Job(NamedTuple):
+    """Un dataset de la base (``dataset_id``) o un archivo CSV (``csv_path``)"""
+    name: str
+    sport: str
+    dataset_id: int = None
+    csv_path: str = None
+
+
+def infer_sport(columns):
+    """Deporte cuyo esquema está completo en ``columns`` (None si ninguno o varios);
+    cuentan también las columnas derivables (F1: Puntos desde Posicion)"""
+    header = pd.DataFrame(columns=list(columns))
+    matches = [sport for sport, schema in FREE_SCHEMAS.items()
+               if set(schema) <= set(sports.get(sport).prepare_frame(header).columns)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def _slug(text):
+    return re.sub(r"[^0-9A-Za-z_-]+", "_", str(text)).strip("_") or "dataset"
+
+
+def csv_job(path, sport=None):
+    """Trabajo para un CSV; sin ``sport`` se deduce de los encabezados"""
+    if sport is None:
+        sport = infer_sport(pd.read_csv(path, nrows=0).columns)
+        if sport is None:
+            raise ValueError(f"{path}: no se pudo deducir el deporte por sus columnas")
+    return Job(os.path.splitext(os.path.basename(path))[0], sport, csv_path=path)
+
+
+def dataset_jobs(ids=None, username=None, sport=None, db_path=None):
+    """Trabajos para los datasets ``ids`` (o todos los que cumplan los filtros si es None)"""
+    rows = datasets.list_datasets(username, sport, db_path)
+    if ids is not None:
+        wanted = set(ids)
+        rows = [row for row in rows if row[0] in wanted]
+        missing = wanted - {row[0] for row in rows}
+        if missing:
+            raise ValueError(f"Datasets inexistentes: {sorted(missing)}")
+    return [Job(f"{dataset_id}_{_slug(name)}", row_sport, dataset_id=dataset_id)
+            for dataset_id, row_sport, name, _, _ in sorted(rows)]
+
+
+def check_formats(formats):
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Formatos no soportados: {unknown}")
+    if "parquet" in formats and not (importlib.util.find_spec("pyarrow") or importlib.util.find_spec("fastparquet")):
+        raise ValueError("El formato parquet requiere pyarrow (pip install pyarrow)")
+
+
+def write_outputs(sheets, base, formats, data_sheet=None, db_path=None):
+    """Escribe las hojas [(nombre, DataFrame)] como ``base``_<hoja>.csv/.parquet y/o ``base``.xlsx.
+
+    ``data_sheet`` (DataFrame o QuerySheet) se agrega como hoja DATA solo al Excel.
+    """
+    files = []
+    for fmt in formats:
+        if fmt == "xlsx":
+            path = base + ".xlsx"
+            extra = [("DATA", data_sheet)] if data_sheet is not None else []
+            write_workbook(path, extra + list(sheets), db_path)
+            files.append(path)
+            continue
+        for sheet, df in sheets:
+            path = f"{base}_{sheet.lower()}.{fmt}"
+            if fmt == "csv":
+                df.to_csv(path, index=False)
+            else:
+                df.to_parquet(path, index=False)
+            files.append(path)
+    return files
+
+
+def run_job(job, out_dir, formats, include_data=False, db_path=None):
+    """Calcula y escribe la tabla de un trabajo; devuelve un resumen"""
+    started = time.perf_counter()
+    if job.csv_path is not None:
+        df = sports.get(job.sport).prepare_frame(pd.read_csv(job.csv_path))
+        missing, _, _ = validate_schema(df, job.sport)
+        if missing:
+            raise ValueError(f"Faltan columnas para {job.sport}: {missing}")
+        data_sheet = df
+    else:
+        df = datasets.dataset_data(job.dataset_id, job.sport, db_path)
+        # Filas crudas en streaming desde SQLite, como en la exportación de la app
+        data_sheet = dataset_sheet(job.dataset_id, job.sport)
+    sheets = datasets.compute_standings(df, job.sport)
+    files = write_outputs(sheets, os.path.join(out_dir, _slug(job.name)), formats,
+                          data_sheet if include_data else None, db_path)
+    return {"trabajo": job.name, "deporte": job.sport, "filas": len(df), "archivos": files,
+            "segundos": round(time.perf_counter() - started, 3), "error": None}
+
+
+def _run_safe(job, out_dir, formats, include_data, db_path):
+    # Un archivo inválido no debe cortar el lote completo
+    try:
+        return run_job(job, out_dir, formats, include_data, db_path)
+    except Exception as e:
+        return {"trabajo": job.name, "deporte": job.sport, "filas": 0, "archivos": [],
+                "segundos": 0.0, "error": str(e)}
+
+
+def run_batch(jobs, out_dir, formats=("csv",), n_jobs=None, include_data=False, db_path=None, progress=None):
+    """Ejecuta ``jobs`` en un pool de ``n_jobs`` procesos (por defecto, uno por CPU).
+
+    Devuelve los resúmenes en el orden de ``jobs``; ``progress(resumen)`` se
+    invoca al terminar cada trabajo.
+    """
+    check_formats(formats)
+    os.makedirs(out_dir, exist_ok=True)
+    args = (out_dir, tuple(formats), include_data, db_path)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(jobs))
+    results = [None] * len(jobs)
+    if n_jobs <= 1:
+        for i, job in enumerate(jobs):
+            results[i] = _run_safe(job, *args)
+            if progress:
+                progress(results[i])
+        return results
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context(MP_START_METHOD)) as pool:
+        futures = {pool.submit(_run_safe, job, *args): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if progress:
+                progress(results[futures[future]])
+    return results
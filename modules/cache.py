@@ -0,0 +1,88 @@
+# cache.py - Caché LRU en memoria para datasets y tablas calculadas
+#
+# Convención de claves: (dataset_ids, sport, versiones, ...) donde dataset_ids
+# es una tupla de ids; así invalidate_dataset() encuentra también las entradas
+# de simulaciones que combinan varios datasets.
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Caché LRU acotada y segura entre hilos con contadores de aciertos/fallos"""
+
+    def __init__(self, maxsize=32, name=""):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Devuelve el valor en caché o lo calcula con ``compute()`` y lo guarda.
+
+        Los valores se comparten entre llamadas: no deben modificarse in situ.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, predicate=None):
+        """Elimina las entradas cuya clave cumple ``predicate`` (todas si es None)"""
+        with self._lock:
+            keys = [k for k in self._data if predicate is None or predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# DataFrames crudos por dataset y tablas de posiciones calculadas
+dataset_cache = LRUCache(maxsize=16, name="datasets")
+standings_cache = LRUCache(maxsize=64, name="standings")
+
+
+def invalidate_dataset(dataset_id):
+    """Descarta todo lo cacheado que dependa de ``dataset_id``"""
+    def depends(key):
+        return dataset_id in key[0]
+    return dataset_cache.invalidate(depends) + standings_cache.invalidate(depends)
+
+
+def cache_stats():
+    return [dataset_cache.stats(), standings_cache.stats()]
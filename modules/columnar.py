@@ -0,0 +1,204 @@
+# columnar.py - Copia columnar de cada dataset (arreglos NumPy mapeados en memoria)
+#
+# SQLite sigue siendo la fuente de verdad; aquí se guarda una copia compacta
+# por dataset: una carpeta con un .npy por columna. Los nombres (equipos,
+# pilotos) se codifican con diccionario (códigos int8/16/32 + vocabulario) y
+# los números se reducen al entero más pequeño que los contiene. Al leer, los
+# .npy se abren con mmap, así que cargar un dataset no copia sus filas.
+#
+# Cada copia guarda el data_version del dataset; si no coincide se ignora y se
+# vuelve a leer de SQLite (y se regenera).
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from modules import storage, teams
+from modules.ingest import ENTITY_COLUMNS, IMPORT_TARGETS, OPTIONAL_TARGETS, import_columns
+
+# Desactivar con COLUMNAR_STORE=false para leer siempre desde SQLite
+COLUMNAR_ENABLED = os.getenv("COLUMNAR_STORE", "true").lower() in ("1", "true", "yes", "on")
+
+_META = "meta.json"
+
+
+def store_dir(db_path=None):
+    """Carpeta de las copias columnar, junto al archivo de la base de datos"""
+    base, _ = os.path.splitext(db_path or storage.DB_PATH)
+    return base + ".columnar"
+
+
+def dataset_dir(dataset_id, db_path=None):
+    return os.path.join(store_dir(db_path), str(int(dataset_id)))
+
+
+def read_sqlite(dataset_id, sport, db_path=None):
+    """Filas del dataset desde las tablas SQLite, con los nombres de columna del CSV"""
+    if sport not in IMPORT_TARGETS:
+        return pd.DataFrame()
+    table = IMPORT_TARGETS[sport][0]
+    db_cols, csv_cols = import_columns(sport)
+    # Las opcionales vacías ('' es el DEFAULT de carrera) se leen como nulos
+    select = ", ".join(f"NULLIF({db}, '') AS {csv}" if csv in OPTIONAL_TARGETS else f"{db} AS {csv}"
+                       for db, csv in zip(db_cols, csv_cols))
+    with storage.read(db_path) as con:
+        df = pd.read_sql_query(f"SELECT {select} FROM {table} WHERE dataset_id=? ORDER BY id",
+                               con, params=(dataset_id,))
+        # Ids de teams -> Categorical (mismas categorías en local y visitante)
+        names = teams.decode(con, sport, {col: df[col] for col in ENTITY_COLUMNS[sport]})
+    for col, values in names.items():
+        df[col] = values
+    # Columnas opcionales solo si el dataset las trae
+    empty = [col for col in OPTIONAL_TARGETS if col in df and df[col].isna().all()]
+    return df.drop(columns=empty)
+
+
+def _code_dtype(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def encode_column(series):
+    """(arreglos a guardar, descripción de la columna) para una columna.
+
+    Los arreglos son {"": valores o códigos, ".mask": nulos (solo si hay)}.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Se conservan las categorías (compartidas entre columnas de equipos)
+        codes = series.cat.codes.to_numpy()
+        return ({"": codes.astype(_code_dtype(len(series.cat.categories)))},
+                {"kind": "dict", "vocab": [str(c) for c in series.cat.categories]})
+    if not pd.api.types.is_numeric_dtype(series):
+        codes, uniques = pd.factorize(series, sort=True)
+        return {"": codes.astype(_code_dtype(len(uniques)))}, {"kind": "dict", "vocab": [str(u) for u in uniques]}
+    mask = series.isna().to_numpy()
+    values = series.to_numpy(dtype="float64", na_value=0.0)
+    if not np.all(values == np.round(values)):
+        return {"": series.to_numpy(dtype="float64", na_value=np.nan)}, {"kind": "float"}
+    lo, hi = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    dtype = np.result_type(np.min_scalar_type(lo), np.min_scalar_type(hi), np.int8)
+    arrays = {"": values.astype(dtype)}
+    if mask.any():
+        arrays[".mask"] = mask
+    return arrays, {"kind": "int", "masked": bool(mask.any())}
+
+
+def decode_column(info, values, mask=None):
+    """Inverso de encode_column (sin copiar ``values`` salvo en columnas con nulos)"""
+    if info["kind"] == "dict":
+        return pd.Categorical.from_codes(values, categories=info["vocab"])
+    if mask is not None:
+        return pd.arrays.IntegerArray(np.asarray(values), np.asarray(mask))
+    return values
+
+
+def save(dataset_id, sport, df, version, db_path=None):
+    """Escribe la copia columnar de ``df`` en una carpeta temporal propia y la
+    reemplaza por la actual; True si quedó escrita.
+
+    Si otro hilo o proceso escribe la misma copia a la vez, gana uno y el otro
+    descarta la suya: la copia es solo un acelerador, así que los errores de
+    disco no se propagan (se seguirá leyendo de SQLite).
+    """
+    final = dataset_dir(dataset_id, db_path)
+    root = os.path.dirname(final)
+    try:
+        os.makedirs(root, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f"{os.path.basename(final)}.tmp", dir=root)
+    except OSError:
+        return False
+    stale = None
+    try:
+        meta = {"sport": sport, "version": version, "rows": len(df), "columns": []}
+        for i, col in enumerate(df.columns):
+            arrays, info = encode_column(df[col])
+            for suffix, array in arrays.items():
+                np.save(os.path.join(tmp, f"{i}{suffix}.npy"), array)
+            meta["columns"].append({"name": str(col), **info})
+        with open(os.path.join(tmp, _META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        # La copia anterior se aparta con un rename (los lectores con mmap la siguen viendo)
+        # y la nueva ocupa su lugar con otro: sin ventana de borrado mientras tanto
+        if os.path.isdir(final):
+            stale = tempfile.mkdtemp(prefix=f"{os.path.basename(final)}.old", dir=root)
+            os.replace(final, os.path.join(stale, "copia"))
+        os.replace(tmp, final)
+    except OSError:
+        # Otro hilo ya dejó su copia en ``final`` (o falló el disco): se conserva la existente
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    finally:
+        if stale:
+            shutil.rmtree(stale, ignore_errors=True)
+    return True
+
+
+def load(dataset_id, sport, version, db_path=None):
+    """DataFrame desde la copia columnar, o None si no existe o está desactualizada.
+
+    Los nombres se devuelven como Categorical sobre los códigos mapeados y los
+    números como vistas de solo lectura: no modificar in situ.
+    """
+    path = dataset_dir(dataset_id, db_path)
+    try:
+        with open(os.path.join(path, _META), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("sport") != sport or meta.get("version") != version:
+        return None
+    data = {}
+    try:
+        for i, col in enumerate(meta["columns"]):
+            values = np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r")
+            mask = np.load(os.path.join(path, f"{i}.mask.npy"), mmap_mode="r") if col.get("masked") else None
+            data[col["name"]] = decode_column(col, values, mask)
+    except OSError:
+        # La carpeta se reemplazó mientras se leía
+        return None
+    return pd.DataFrame(data, copy=False)
+
+
+def remove(dataset_id, db_path=None):
+    shutil.rmtree(dataset_dir(dataset_id, db_path), ignore_errors=True)
+
+
+def load_dataset(dataset_id, sport, version, db_path=None):
+    """Lee el dataset de la copia columnar si está al día; si no, de SQLite (y la regenera)"""
+    if COLUMNAR_ENABLED and version is not None:
+        df = load(dataset_id, sport, version, db_path)
+        if df is not None:
+            return df
+    df = read_sqlite(dataset_id, sport, db_path)
+    if COLUMNAR_ENABLED and version is not None and sport in IMPORT_TARGETS:
+        save(dataset_id, sport, df, version, db_path)
+    return df
+
+
+def migrate_all(db_path=None, progress=None):
+    """Genera (o actualiza) la copia columnar de todos los datasets existentes.
+
+    Devuelve el número de datasets escritos; ``progress(hechos, total)``
+    se invoca tras cada uno. Borra las copias de datasets eliminados.
+    """
+    with storage.read(db_path) as con:
+        datasets = con.execute("SELECT id, sport, data_version FROM datasets ORDER BY id").fetchall()
+    written = 0
+    for done, (dataset_id, sport, version) in enumerate(datasets, start=1):
+        if sport in IMPORT_TARGETS and load(dataset_id, sport, version, db_path) is None:
+            save(dataset_id, sport, read_sqlite(dataset_id, sport, db_path), version, db_path)
+            written += 1
+        if progress:
+            progress(done, len(datasets))
+    known = {str(d[0]) for d in datasets}
+    root = store_dir(db_path)
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            if name not in known:
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return written
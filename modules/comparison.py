@@ -0,0 +1,115 @@
+# comparison.py - Comparativa de N escenarios (tabla alineada, deltas de posición, dispersión)
+#
+# Cada escenario es una tabla resumen (Pos, Equipo/Piloto, ..., <métrica>_<etiqueta>).
+# En lugar de unir los DataFrames uno a uno, se concatenan una sola vez las
+# columnas de clave, métrica y posición, se factorizan los nombres y se
+# colocan en matrices (entidades × escenarios) con una sola asignación.
+import warnings
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from modules import sports
+from modules.profiling import timed
+
+# (columna de entidad, prefijo de la métrica comparada) por deporte
+SCENARIO_METRICS = sports.View(lambda sport: (sport.tables[0].index, sport.scenario[1]))
+
+
+class Comparison(NamedTuple):
+    """Resultado de compare_scenarios; todos los DataFrames comparten índice (entidades)"""
+    values: pd.DataFrame   # métrica por escenario (columnas = etiquetas)
+    ranks: pd.DataFrame    # posición por escenario
+    deltas: pd.DataFrame   # posiciones ganadas respecto al escenario de referencia
+    stats: pd.DataFrame    # media, desviación, mínimo, máximo y rango de la métrica y la posición
+    reference: str
+
+
+def _metric_column(df, prefix, label):
+    column = f"{prefix}_{label}"
+    if column in df.columns:
+        return column
+    # Escenarios guardados con otra etiqueta: primera columna con el prefijo
+    candidates = [c for c in df.columns if str(c).startswith(prefix + "_")]
+    if not candidates:
+        raise KeyError(f"El escenario {label} no tiene columna {prefix}_*")
+    return candidates[0]
+
+
+def _ranks_from_values(values):
+    # Posición por métrica descendente cuando el escenario no trae Pos
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind="stable")
+    ranks = np.empty(len(values), dtype=float)
+    ranks[order] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+@timed()
+def compare_scenarios(frames, sport, reference=None):
+    """Alinea los escenarios ``frames`` {etiqueta: DataFrame} por equipo o piloto.
+
+    Las entidades ausentes en un escenario quedan como NaN. ``reference`` es
+    la etiqueta contra la que se miden los deltas de posición (por defecto la
+    primera); un delta positivo significa que el equipo sube en la tabla.
+    """
+    if not frames:
+        raise ValueError("No hay escenarios para comparar")
+    key, prefix = SCENARIO_METRICS[sport]
+    labels = [str(label) for label in frames]
+    reference = labels[0] if reference is None else str(reference)
+    if reference not in labels:
+        raise ValueError(f"Escenario de referencia desconocido: {reference}")
+
+    names, values, ranks, lengths = [], [], [], []
+    for label, df in zip(labels, frames.values()):
+        metric = pd.to_numeric(df[_metric_column(df, prefix, label)], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        names.append(df[key].to_numpy(dtype=object))
+        values.append(metric)
+        ranks.append(pd.to_numeric(df["Pos"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                     if "Pos" in df.columns else _ranks_from_values(metric))
+        lengths.append(len(df))
+
+    # Una sola concatenación + factorize; la "pivot" es una asignación por (código, escenario)
+    codes, entities = pd.factorize(np.concatenate(names), sort=True)
+    column = np.repeat(np.arange(len(labels)), lengths)
+    valid = codes >= 0
+    shape = (len(entities), len(labels))
+    value_matrix = np.full(shape, np.nan)
+    rank_matrix = np.full(shape, np.nan)
+    value_matrix[codes[valid], column[valid]] = np.concatenate(values)[valid]
+    rank_matrix[codes[valid], column[valid]] = np.concatenate(ranks)[valid]
+
+    index = pd.Index(entities, name=key)
+    ref = labels.index(reference)
+    deltas = rank_matrix[:, [ref]] - rank_matrix
+    with warnings.catch_warnings():
+        # Filas todo NaN (métrica no numérica) dan RuntimeWarning en nanmean/nanmin
+        warnings.simplefilter("ignore", RuntimeWarning)
+        stats = pd.DataFrame({
+            "Media": np.nanmean(value_matrix, axis=1),
+            "Desv": np.nanstd(value_matrix, axis=1),
+            "Min": np.nanmin(value_matrix, axis=1),
+            "Max": np.nanmax(value_matrix, axis=1),
+            "Pos_mejor": np.nanmin(rank_matrix, axis=1),
+            "Pos_peor": np.nanmax(rank_matrix, axis=1),
+            "Escenarios": np.sum(~np.isnan(value_matrix), axis=1),
+        }, index=index)
+    stats["Rango"] = stats["Max"] - stats["Min"]
+    stats["Rango_Pos"] = stats["Pos_peor"] - stats["Pos_mejor"]
+    stats = stats.round({"Media": 2, "Desv": 2})
+    stats = stats.sort_values(["Media", "Pos_mejor"], ascending=[False, True], kind="mergesort")
+    order = stats.index
+
+    def frame(matrix):
+        return pd.DataFrame(matrix, index=index, columns=labels).loc[order]
+
+    return Comparison(frame(value_matrix), frame(rank_matrix), frame(deltas), stats, reference)
+
+
+def comparison_table(comparison):
+    """Tabla para mostrar: métrica y posición por escenario, deltas y dispersión"""
+    values = comparison.values.add_prefix("Valor_")
+    ranks = comparison.ranks.add_prefix("Pos_")
+    deltas = comparison.deltas.drop(columns=[comparison.reference]).add_prefix("ΔPos_")
+    return pd.concat([values, ranks, deltas, comparison.stats[["Media", "Desv", "Rango", "Rango_Pos"]]], axis=1)
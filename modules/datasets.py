@@ -0,0 +1,94 @@
+# datasets.py - Acceso a datasets sin Streamlit (lo usan app.py y la CLI sportika)
+#
+# Las funciones lanzan excepciones; app.py las envuelve para mostrar st.error.
+from modules import sports, storage
+from modules.cache import dataset_cache, invalidate_dataset
+from modules.columnar import load_dataset, remove as remove_columnar
+from modules.profiling import timed
+from modules.utils import STANDINGS_FUNCTIONS, compute_round_standings, round_column
+
+_DATASET_COLUMNS = "id, sport, name, is_projection, created_at"
+
+
+def create_dataset(username, sport, name, is_projection=False, db_path=None):
+    """Crea un nuevo dataset y retorna su ID"""
+    with storage.transaction(db_path) as con:
+        cur = con.execute("INSERT INTO datasets (username, sport, name, is_projection) VALUES (?, ?, ?, ?)",
+                          (username, sport, name, 1 if is_projection else 0))
+        return cur.lastrowid
+
+
+@timed()
+def list_datasets(username=None, sport=None, db_path=None):
+    """Filas (id, sport, name, is_projection, created_at), las más recientes primero.
+
+    Sin ``username`` devuelve los datasets de todos los usuarios.
+    """
+    where, params = [], []
+    if username is not None:
+        where.append("username=?")
+        params.append(username)
+    if sport:
+        where.append("sport=?")
+        params.append(sport)
+    sql = f"SELECT {_DATASET_COLUMNS} FROM datasets"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with storage.read(db_path) as con:
+        return con.execute(sql + " ORDER BY created_at DESC, id DESC", params).fetchall()
+
+
+def delete_dataset(dataset_id, db_path=None):
+    """Elimina un dataset, sus filas (ON DELETE CASCADE), su caché y su copia columnar"""
+    with storage.transaction(db_path) as con:
+        con.execute("DELETE FROM datasets WHERE id=?", (dataset_id,))
+    invalidate_dataset(dataset_id)
+    remove_columnar(dataset_id, db_path)
+
+
+@timed()
+def dataset_version(dataset_id, db_path=None):
+    """Versión de contenido del dataset (None si no existe)"""
+    with storage.read(db_path) as con:
+        row = con.execute("SELECT data_version FROM datasets WHERE id=?", (dataset_id,)).fetchone()
+    return row[0] if row else None
+
+
+def dataset_sport(dataset_id, db_path=None):
+    with storage.read(db_path) as con:
+        row = con.execute("SELECT sport FROM datasets WHERE id=?", (dataset_id,)).fetchone()
+    return row[0] if row else None
+
+
+@timed()
+def dataset_data(dataset_id, sport, db_path=None):
+    """Filas del dataset como DataFrame (cacheado; no modificar in situ)"""
+    version = dataset_version(dataset_id, db_path)
+    key = ((dataset_id,), sport, (version,)) + ((db_path,) if db_path else ())
+    # Copia columnar mapeada en memoria si está al día; si no, SQLite
+    return dataset_cache.get_or_compute(key, lambda: load_dataset(dataset_id, sport, version, db_path))
+
+
+def standings_sheets(standings, sport):
+    """[(nombre de hoja, DataFrame)] para el resultado de STANDINGS_FUNCTIONS / load_standings"""
+    spec = sports.get(sport)
+    return [(table.sheet, df) for table, df in zip(spec.tables, spec.frames(standings))]
+
+
+def round_sheets(timeline, sport):
+    """[(nombre de hoja, DataFrame)] para el resultado de compute_round_standings"""
+    spec = sports.get(sport)
+    return list(zip(spec.round_sheets, spec.frames(timeline)))
+
+
+def compute_standings(df, sport):
+    """Cálculo completo de la tabla de ``df``, como lista de hojas (ver standings_sheets).
+
+    Si los partidos traen Jornada/Fecha se agrega la hoja JORNADAS con la tabla
+    después de cada jornada (en F1, con Carrera, CARRERAS_PILOTOS y
+    CARRERAS_CONSTRUCTORES).
+    """
+    sheets = standings_sheets(STANDINGS_FUNCTIONS[sport](df), sport)
+    if round_column(df, sport):
+        sheets += round_sheets(compute_round_standings(df, sport), sport)
+    return sheets
@@ -0,0 +1,97 @@
+# export.py - Exportación a Excel (xlsxwriter, constant_memory)
+#
+# Las hojas DATA se escriben fila a fila desde un cursor SQLite: en modo
+# constant_memory xlsxwriter vuelca cada fila al disco al pasar a la
+# siguiente, así que armar el libro no depende del tamaño del dataset. El
+# resultado sí se devuelve completo (bytes) para la descarga.
+import tempfile
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import pandas as pd
+import xlsxwriter
+
+from modules import storage
+from modules.profiling import timed
+from modules.ingest import IMPORT_TARGETS, import_columns
+
+# Filas leídas del cursor por cada fetchmany
+FETCH_SIZE = 10_000
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class QuerySheet(NamedTuple):
+    """Hoja cuyas filas salen de una consulta SQL (encabezados = ``columns``)"""
+    sql: str
+    params: tuple
+    columns: list
+
+
+def dataset_sheet(dataset_id, sport):
+    """Hoja con las filas crudas de un dataset, con los nombres de columna del CSV"""
+    table = IMPORT_TARGETS[sport][0]
+    db_cols, csv_cols = import_columns(sport)
+    select, joins = [], []
+    for i, col in enumerate(db_cols):
+        if col.endswith("_id"):
+            # Nombre desde la dimensión teams
+            select.append(f"t{i}.nombre")
+            joins.append(f"LEFT JOIN teams t{i} ON t{i}.id = x.{col}")
+        else:
+            select.append(f"x.{col}")
+    sql = "SELECT {} FROM {} x {} WHERE x.dataset_id=? ORDER BY x.id".format(", ".join(select), table, " ".join(joins))
+    return QuerySheet(sql, (dataset_id,), list(csv_cols))
+
+
+def _frame_rows(df):
+    # Sin formato de fecha xlsxwriter escribiría el número de serie: fechas como texto ISO
+    dates = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
+    if dates:
+        df = df.assign(**{c: df[c].astype("string") for c in dates})
+    return storage.frame_rows(df, list(df.columns))
+
+
+def _query_rows(con, sheet):
+    cursor = con.execute(sheet.sql, sheet.params)
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        yield from rows
+
+
+@timed()
+def write_workbook(target, sheets, db_path=None):
+    """Escribe ``sheets`` [(nombre, DataFrame | QuerySheet), ...] en ``target`` (ruta o archivo).
+
+    Las consultas se leen en una instantánea de solo lectura propia, sin
+    bloquear las conexiones de la app; sin QuerySheet no se abre la base.
+    """
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    header = workbook.add_format({"bold": True, "border": 1, "align": "center"})
+    needs_db = any(isinstance(source, QuerySheet) for _, source in sheets)
+    with (storage.snapshot(db_path) if needs_db else nullcontext()) as con:
+        for name, source in sheets:
+            worksheet = workbook.add_worksheet(name)
+            if isinstance(source, QuerySheet):
+                columns, rows = source.columns, _query_rows(con, source)
+            else:
+                columns, rows = [str(c) for c in source.columns], _frame_rows(source)
+            worksheet.write_row(0, 0, columns, header)
+            # constant_memory exige escribir las filas en orden
+            for r, row in enumerate(rows, start=1):
+                worksheet.write_row(r, 0, row)
+    workbook.close()
+
+
+def export_workbook(sheets, db_path=None):
+    """Contenido (bytes) del libro, para ``st.download_button``.
+
+    El libro se escribe en un archivo temporal anónimo que se cierra (y se
+    borra) al leerlo: en memoria solo queda el .xlsx comprimido.
+    """
+    with tempfile.TemporaryFile(suffix=".xlsx") as out:
+        write_workbook(out, sheets, db_path)
+        out.seek(0)
+        return out.read()
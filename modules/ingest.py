@@ -0,0 +1,134 @@
+# ingest.py - Importación de datos a SQLite (DataFrame completo o CSV por bloques)
+import pandas as pd
+
+from modules import sports, storage, teams
+from modules.cache import invalidate_dataset
+from modules.standings_store import apply_increment
+from modules.utils import FREE_SCHEMAS, OPTIONAL_SCHEMAS, validate_schema
+
+# Filas por bloque al leer CSV grandes; la memoria pico depende de este valor,
+# no del tamaño del archivo
+CSV_CHUNK_SIZE = 50_000
+
+# Destino de cada deporte del registro: tabla SQLite y columnas (tabla <- CSV);
+# las columnas *_id guardan el id en `teams` del nombre de la columna CSV
+IMPORT_TARGETS = sports.View(lambda sport: (sport.table, list(sport.db_columns), list(sport.schema)))
+
+# Columnas opcionales (CSV -> tabla) de los deportes en OPTIONAL_SCHEMAS; las
+# que no vienen en los datos quedan en NULL
+OPTIONAL_TARGETS = {"Jornada": "jornada", "Fecha": "fecha", "Carrera": "carrera", "Posicion": "posicion",
+                    "Vuelta_Rapida": "vuelta_rapida", "Sprint": "sprint",
+                    "HR_Local": "hr_local", "HR_Visitante": "hr_visitante"}
+OPTIONAL_DTYPES = {"Jornada": "Int64", "Fecha": "string", "Carrera": "string", "Posicion": "Int64",
+                   "Vuelta_Rapida": "boolean", "Sprint": "boolean", "HR_Local": "Int64", "HR_Visitante": "Int64"}
+
+# Columnas CSV de nombres (equipos/pilotos) que se codifican con la tabla teams
+ENTITY_COLUMNS = sports.View(
+    lambda sport: [csv for db, csv in zip(sport.db_columns, sport.schema) if db.endswith("_id")])
+
+# Tipos explícitos para read_csv (evita la inferencia y las columnas object de números)
+CSV_DTYPES = sports.View(lambda sport: dict(sport.dtypes))
+
+
+def import_columns(sport):
+    """(columnas de la tabla, columnas CSV) del deporte: las requeridas más las opcionales"""
+    _, db_cols, csv_cols = IMPORT_TARGETS[sport]
+    optional = list(OPTIONAL_SCHEMAS.get(sport, []))
+    return db_cols + [OPTIONAL_TARGETS[c] for c in optional], csv_cols + optional
+
+
+class IngestError(ValueError):
+    """Error de validación o lectura durante la importación"""
+
+
+def _insert(con, dataset_id, sport, df, chunk_size=None, progress=None):
+    """Inserta un bloque de filas y actualiza la tabla materializada"""
+    table = IMPORT_TARGETS[sport][0]
+    db_cols, csv_cols = import_columns(sport)
+    ids = teams.encode(con, sport, df, ENTITY_COLUMNS[sport])
+    # Las opcionales que no vienen se guardan como NULL (no con el DEFAULT de la columna)
+    rows = pd.DataFrame({col: ids[col] if col in ids else df[col].array if col in df else None for col in csv_cols},
+                        index=pd.RangeIndex(len(df)))
+    if "Fecha" in df and not pd.api.types.is_string_dtype(df["Fecha"]):
+        # Fechas como texto ISO (las columnas datetime se guardan sin la hora si es 00:00)
+        rows["Fecha"] = df["Fecha"].astype("string").array
+    storage.bulk_insert(con, table, ["dataset_id"] + db_cols,
+                        storage.frame_rows(rows, csv_cols, constants=(dataset_id,)),
+                        total=len(df), chunk_size=chunk_size, progress=progress)
+    apply_increment(con, dataset_id, sport, df)
+
+
+def _bump_version(con, dataset_id):
+    con.execute("UPDATE datasets SET data_version = data_version + 1 WHERE id=?", (dataset_id,))
+
+
+def import_frame(df, dataset_id, sport, progress=None, chunk_size=None, db_path=None):
+    """Importa un DataFrame ya cargado en una sola transacción"""
+    if sport not in IMPORT_TARGETS:
+        return 0
+    df = sports.get(sport).prepare_frame(df)
+    with storage.transaction(db_path) as con:
+        _insert(con, dataset_id, sport, df, chunk_size=chunk_size, progress=progress)
+        _bump_version(con, dataset_id)
+    invalidate_dataset(dataset_id)
+    return len(df)
+
+
+def read_header(file):
+    """Lee solo la cabecera del CSV (ruta o archivo abierto, que se rebobina)"""
+    columns = list(pd.read_csv(file, nrows=0).columns)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return columns
+
+
+def missing_columns(sport, columns):
+    """Columnas del esquema que faltan en un archivo con la cabecera ``columns``;
+    las derivables (F1: Puntos desde Posicion; MLB: carreras desde HR) pueden faltar"""
+    header = sports.get(sport).prepare_frame(pd.DataFrame(columns=list(columns))).columns
+    return [c for c in FREE_SCHEMAS[sport] if c not in header]
+
+
+def ingest_csv(file, dataset_id, sport, chunksize=None, progress=None, db_path=None):
+    """Importa un CSV por bloques con ``read_csv(chunksize=...)``.
+
+    Cada bloque se valida con ``validate_schema`` y se inserta con executemany;
+    todo ocurre en una transacción, así que un bloque inválido deshace la
+    importación completa. ``progress(filas, None)`` se llama tras cada bloque.
+    Devuelve el total de filas importadas.
+    """
+    if sport not in IMPORT_TARGETS:
+        raise IngestError(f"Deporte no soportado: {sport}")
+    spec = sports.get(sport)
+    expected = FREE_SCHEMAS[sport]
+    missing = missing_columns(sport, read_header(file))
+    if missing:
+        raise IngestError(f"Columnas faltantes: {missing}")
+    # Las opcionales (Jornada/Fecha, Carrera/Posicion...) se importan si están en el archivo
+    wanted = set(expected) | set(OPTIONAL_SCHEMAS.get(sport, []))
+    dtypes = {**CSV_DTYPES[sport], **{c: OPTIONAL_DTYPES[c] for c in OPTIONAL_SCHEMAS.get(sport, [])}}
+    reader = pd.read_csv(file, chunksize=chunksize or CSV_CHUNK_SIZE, usecols=lambda c: c in wanted,
+                         dtype=dtypes)
+    done = 0
+    with storage.transaction(db_path) as con:
+        chunks = iter(reader)
+        index = 0
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except (ValueError, TypeError) as e:
+                raise IngestError(f"Bloque {index + 1} (desde la fila {done + 1}): {e}") from e
+            chunk = spec.prepare_frame(chunk)
+            missing, _, _ = validate_schema(chunk, expected)
+            if missing:
+                raise IngestError(f"Columnas faltantes: {missing}")
+            _insert(con, dataset_id, sport, chunk)
+            done += len(chunk)
+            index += 1
+            if progress:
+                progress(done, None)
+        _bump_version(con, dataset_id)
+    invalidate_dataset(dataset_id)
+    return done
@@ -0,0 +1,368 @@
+# migrations.py - Esquema SQLite versionado con PRAGMA user_version
+#
+# Cada migración es una lista de sentencias SQL que lleva la base de datos de
+# la versión N-1 a la N. Nunca se editan migraciones ya publicadas: los cambios
+# de esquema se agregan al final de MIGRATIONS.
+from modules import storage
+
+_DATA_TABLES_DDL = {
+    "matches": '''CREATE TABLE matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+        local TEXT,
+        visitante TEXT,
+        goles_local INTEGER DEFAULT 0,
+        goles_visitante INTEGER DEFAULT 0,
+        puntos_local INTEGER DEFAULT 0,
+        puntos_visitante INTEGER DEFAULT 0
+    )''',
+    "f1_results": '''CREATE TABLE f1_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+        piloto TEXT,
+        equipo TEXT,
+        puntos INTEGER DEFAULT 0,
+        carrera TEXT DEFAULT ''
+    )''',
+    "mlb_games": '''CREATE TABLE mlb_games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+        equipo_local TEXT,
+        equipo_visitante TEXT,
+        hr_local INTEGER DEFAULT 0,
+        hr_visitante INTEGER DEFAULT 0,
+        runs_local INTEGER DEFAULT 0,
+        runs_visitante INTEGER DEFAULT 0
+    )''',
+}
+
+
+def _rebuild_with_cascade(table):
+    """SQLite no permite ALTER de claves foráneas: se recrea la tabla y se copian
+    las filas cuyo dataset existe (las huérfanas ya no son accesibles)."""
+    ddl = _DATA_TABLES_DDL[table].replace(f"CREATE TABLE {table}", f"CREATE TABLE {table}_new", 1)
+    return [
+        ddl,
+        f"INSERT INTO {table}_new SELECT * FROM {table} WHERE dataset_id IN (SELECT id FROM datasets)",
+        f"DROP TABLE {table}",
+        f"ALTER TABLE {table}_new RENAME TO {table}",
+    ]
+
+
+# Columnas de nombres (equipo/piloto) que pasan a ser id de la tabla teams (v5)
+_ENTITY_COLUMNS = {
+    "matches": ["local", "visitante"],
+    "f1_results": ["piloto", "equipo"],
+    "mlb_games": ["equipo_local", "equipo_visitante"],
+}
+
+_ID_TABLES_DDL = {
+    "matches": '''CREATE TABLE matches_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+        local_id INTEGER REFERENCES teams (id),
+        visitante_id INTEGER REFERENCES teams (id),
+        goles_local INTEGER DEFAULT 0,
+        goles_visitante INTEGER DEFAULT 0,
+        puntos_local INTEGER DEFAULT 0,
+        puntos_visitante INTEGER DEFAULT 0
+    )''',
+    "f1_results": '''CREATE TABLE f1_results_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+        piloto_id INTEGER REFERENCES teams (id),
+        equipo_id INTEGER REFERENCES teams (id),
+        puntos INTEGER DEFAULT 0,
+        carrera TEXT DEFAULT ''
+    )''',
+    "mlb_games": '''CREATE TABLE mlb_games_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+        equipo_local_id INTEGER REFERENCES teams (id),
+        equipo_visitante_id INTEGER REFERENCES teams (id),
+        hr_local INTEGER DEFAULT 0,
+        hr_visitante INTEGER DEFAULT 0,
+        runs_local INTEGER DEFAULT 0,
+        runs_visitante INTEGER DEFAULT 0
+    )''',
+}
+
+# Columnas que se copian tal cual en la reconstrucción
+_KEPT_COLUMNS = {
+    "matches": ["goles_local", "goles_visitante", "puntos_local", "puntos_visitante"],
+    "f1_results": ["puntos", "carrera"],
+    "mlb_games": ["hr_local", "hr_visitante", "runs_local", "runs_visitante"],
+}
+
+
+def _rebuild_with_team_ids(table):
+    """Registra los nombres en teams (por deporte del dataset) y recrea la tabla con ids"""
+    names = _ENTITY_COLUMNS[table]
+    register = " UNION ".join(
+        f"SELECT d.sport, x.{col} FROM {table} x JOIN datasets d ON d.id = x.dataset_id WHERE x.{col} IS NOT NULL"
+        for col in names)
+    joins = " ".join(f"LEFT JOIN teams t{i} ON t{i}.sport = d.sport AND t{i}.nombre = x.{col}"
+                     for i, col in enumerate(names))
+    columns = ["id", "dataset_id"] + [f"{col}_id" for col in names] + _KEPT_COLUMNS[table]
+    values = ["x.id", "x.dataset_id"] + [f"t{i}.id" for i in range(len(names))] + [f"x.{c}" for c in _KEPT_COLUMNS[table]]
+    return [
+        f"INSERT OR IGNORE INTO teams (sport, nombre) {register}",
+        _ID_TABLES_DDL[table],
+        f"""INSERT INTO {table}_new ({", ".join(columns)})
+            SELECT {", ".join(values)} FROM {table} x JOIN datasets d ON d.id = x.dataset_id {joins}""",
+        f"DROP TABLE {table}",
+        f"ALTER TABLE {table}_new RENAME TO {table}",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_dataset ON {table} (dataset_id)",
+    ]
+
+
+MIGRATIONS = [
+    # v1: esquema original (usuarios, escenarios, privilegios y datasets deportivos)
+    [
+        '''CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS scenarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            sport TEXT,
+            label TEXT,
+            payload_json TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS entitlements (
+            username TEXT PRIMARY KEY,
+            is_premium INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS datasets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            sport TEXT,
+            name TEXT,
+            is_projection INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dataset_id INTEGER,
+            local TEXT,
+            visitante TEXT,
+            goles_local INTEGER DEFAULT 0,
+            goles_visitante INTEGER DEFAULT 0,
+            puntos_local INTEGER DEFAULT 0,
+            puntos_visitante INTEGER DEFAULT 0,
+            FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS f1_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dataset_id INTEGER,
+            piloto TEXT,
+            equipo TEXT,
+            puntos INTEGER DEFAULT 0,
+            carrera TEXT DEFAULT '',
+            FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS mlb_games (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dataset_id INTEGER,
+            equipo_local TEXT,
+            equipo_visitante TEXT,
+            hr_local INTEGER DEFAULT 0,
+            hr_visitante INTEGER DEFAULT 0,
+            runs_local INTEGER DEFAULT 0,
+            runs_visitante INTEGER DEFAULT 0,
+            FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+        )''',
+    ],
+    # v2: ON DELETE CASCADE en tablas de datos e índices para las consultas de la app
+    _rebuild_with_cascade("matches")
+    + _rebuild_with_cascade("f1_results")
+    + _rebuild_with_cascade("mlb_games")
+    + [
+        # get_dataset_data / delete_dataset
+        "CREATE INDEX IF NOT EXISTS idx_matches_dataset ON matches (dataset_id)",
+        "CREATE INDEX IF NOT EXISTS idx_f1_results_dataset ON f1_results (dataset_id)",
+        "CREATE INDEX IF NOT EXISTS idx_mlb_games_dataset ON mlb_games (dataset_id)",
+        # get_datasets: WHERE username=? [AND sport=?] ORDER BY created_at
+        "CREATE INDEX IF NOT EXISTS idx_datasets_user_sport_created ON datasets (username, sport, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_datasets_user_created ON datasets (username, created_at)",
+        # load_scenarios: WHERE username=? AND sport=? ORDER BY created_at
+        "CREATE INDEX IF NOT EXISTS idx_scenarios_user_sport_created ON scenarios (username, sport, created_at)",
+    ],
+    # v3: versión de contenido por dataset (clave de caché, se incrementa al importar)
+    [
+        "ALTER TABLE datasets ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0",
+    ],
+    # v4: tabla de posiciones materializada (totales por equipo/piloto/constructor)
+    [
+        '''CREATE TABLE IF NOT EXISTS standings (
+            dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+            tipo TEXT NOT NULL,
+            nombre TEXT NOT NULL,
+            pj INTEGER NOT NULL DEFAULT 0,
+            g INTEGER NOT NULL DEFAULT 0,
+            e INTEGER NOT NULL DEFAULT 0,
+            p INTEGER NOT NULL DEFAULT 0,
+            gf INTEGER NOT NULL DEFAULT 0,
+            gc INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dataset_id, tipo, nombre)
+        ) WITHOUT ROWID''',
+        # Carga inicial desde los datos existentes (perspectiva local + visitante)
+        '''INSERT INTO standings (dataset_id, tipo, nombre, pj, g, e, p, gf, gc)
+        SELECT dataset_id, 'equipo', nombre, COUNT(*), COALESCE(SUM(f > c), 0), COALESCE(SUM(f = c), 0),
+               COUNT(*) - COALESCE(SUM(f > c), 0) - COALESCE(SUM(f = c), 0),
+               COALESCE(SUM(f), 0), COALESCE(SUM(c), 0)
+        FROM (
+            SELECT m.dataset_id, m.local AS nombre,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_local ELSE m.goles_local END AS f,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_visitante ELSE m.goles_visitante END AS c
+            FROM matches m JOIN datasets d ON d.id = m.dataset_id
+            UNION ALL
+            SELECT m.dataset_id, m.visitante,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_visitante ELSE m.goles_visitante END,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_local ELSE m.goles_local END
+            FROM matches m JOIN datasets d ON d.id = m.dataset_id
+            UNION ALL
+            SELECT dataset_id, equipo_local, hr_local, hr_visitante FROM mlb_games
+            UNION ALL
+            SELECT dataset_id, equipo_visitante, hr_visitante, hr_local FROM mlb_games
+        )
+        WHERE nombre IS NOT NULL
+        GROUP BY dataset_id, nombre''',
+        '''INSERT INTO standings (dataset_id, tipo, nombre, pj, gf)
+        SELECT dataset_id, 'piloto', piloto, COUNT(*), COALESCE(SUM(puntos), 0)
+        FROM f1_results WHERE piloto IS NOT NULL GROUP BY dataset_id, piloto''',
+        '''INSERT INTO standings (dataset_id, tipo, nombre, pj, gf)
+        SELECT dataset_id, 'constructor', equipo, COUNT(*), COALESCE(SUM(puntos), 0)
+        FROM f1_results WHERE equipo IS NOT NULL GROUP BY dataset_id, equipo''',
+    ],
+    # v5: dimensión de equipos/pilotos por deporte; las tablas de datos guardan ids enteros
+    [
+        '''CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY,
+            sport TEXT NOT NULL,
+            nombre TEXT NOT NULL,
+            UNIQUE (sport, nombre)
+        )''',
+    ]
+    + _rebuild_with_team_ids("matches")
+    + _rebuild_with_team_ids("f1_results")
+    + _rebuild_with_team_ids("mlb_games"),
+    # v6: payload binario de escenarios (payload_json queda para filas antiguas) y
+    # índice para la última versión por etiqueta (MAX(id) ... GROUP BY label)
+    [
+        "ALTER TABLE scenarios ADD COLUMN payload BLOB",
+        "CREATE INDEX IF NOT EXISTS idx_scenarios_user_sport_label ON scenarios (username, sport, label, id)",
+    ],
+    # v7: jornada y fecha opcionales de cada partido (tabla por jornada)
+    [
+        "ALTER TABLE matches ADD COLUMN jornada INTEGER",
+        "ALTER TABLE matches ADD COLUMN fecha TEXT",
+        "ALTER TABLE mlb_games ADD COLUMN jornada INTEGER",
+        "ALTER TABLE mlb_games ADD COLUMN fecha TEXT",
+    ],
+    # v8: cruces materializados (totales de cada equipo contra cada rival) para
+    # los desempates h2h de la tabla materializada
+    [
+        '''CREATE TABLE IF NOT EXISTS head_to_head (
+            dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+            equipo TEXT NOT NULL,
+            rival TEXT NOT NULL,
+            pj INTEGER NOT NULL DEFAULT 0,
+            g INTEGER NOT NULL DEFAULT 0,
+            e INTEGER NOT NULL DEFAULT 0,
+            p INTEGER NOT NULL DEFAULT 0,
+            gf INTEGER NOT NULL DEFAULT 0,
+            gc INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dataset_id, equipo, rival)
+        ) WITHOUT ROWID''',
+        # Carga inicial desde los datos existentes (perspectiva local + visitante)
+        '''INSERT INTO head_to_head (dataset_id, equipo, rival, pj, g, e, p, gf, gc)
+        SELECT x.dataset_id, te.nombre, tr.nombre, COUNT(*), COALESCE(SUM(f > c), 0), COALESCE(SUM(f = c), 0),
+               COUNT(*) - COALESCE(SUM(f > c), 0) - COALESCE(SUM(f = c), 0),
+               COALESCE(SUM(f), 0), COALESCE(SUM(c), 0)
+        FROM (
+            SELECT m.dataset_id, m.local_id AS equipo_id, m.visitante_id AS rival_id,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_local ELSE m.goles_local END AS f,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_visitante ELSE m.goles_visitante END AS c
+            FROM matches m JOIN datasets d ON d.id = m.dataset_id
+            UNION ALL
+            SELECT m.dataset_id, m.visitante_id, m.local_id,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_visitante ELSE m.goles_visitante END,
+                   CASE WHEN d.sport = 'NFL' THEN m.puntos_local ELSE m.goles_local END
+            FROM matches m JOIN datasets d ON d.id = m.dataset_id
+            UNION ALL
+            SELECT dataset_id, equipo_local_id, equipo_visitante_id, hr_local, hr_visitante FROM mlb_games
+            UNION ALL
+            SELECT dataset_id, equipo_visitante_id, equipo_local_id, hr_visitante, hr_local FROM mlb_games
+        ) x
+        JOIN teams te ON te.id = x.equipo_id
+        JOIN teams tr ON tr.id = x.rival_id
+        GROUP BY x.dataset_id, te.nombre, tr.nombre''',
+    ],
+    # v9: resultados F1 por carrera (posición final, vuelta rápida, sprint); la
+    # columna carrera ya existía pero nunca se llenaba
+    [
+        "ALTER TABLE f1_results ADD COLUMN posicion INTEGER",
+        "ALTER TABLE f1_results ADD COLUMN vuelta_rapida INTEGER",
+        "ALTER TABLE f1_results ADD COLUMN sprint INTEGER",
+        "UPDATE f1_results SET carrera = NULL WHERE carrera = ''",
+    ],
+    # v10: carreras reales de MLB (runs_*); hasta ahora las victorias se decidían
+    # por HR, así que los partidos existentes quedan con carreras = HR
+    [
+        "UPDATE mlb_games SET runs_local = hr_local, runs_visitante = hr_visitante",
+        # Los HR se materializan aparte (tipo 'hr'); en los datos existentes coinciden con las carreras
+        """INSERT INTO standings (dataset_id, tipo, nombre, pj, g, e, p, gf, gc)
+        SELECT s.dataset_id, 'hr', s.nombre, s.pj, s.g, s.e, s.p, s.gf, s.gc
+        FROM standings s JOIN datasets d ON d.id = s.dataset_id
+        WHERE d.sport = 'MLB' AND s.tipo = 'equipo'""",
+        # Invalida las copias columnares (cambian las columnas del dataset)
+        "UPDATE datasets SET data_version = data_version + 1 WHERE sport = 'MLB'",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_version(con):
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path=None):
+    """Aplica las migraciones pendientes y devuelve la versión final del esquema.
+
+    Todas las migraciones pendientes corren en una sola transacción junto con
+    la actualización de ``user_version``; si algo falla, no se aplica ninguna.
+    """
+    with storage.exclusive(db_path) as con:
+        version = get_version(con)
+        if version >= SCHEMA_VERSION:
+            return version
+        if not con.execute("SELECT 1 FROM sqlite_master").fetchone():
+            # Base recién creada: auto_vacuum=INCREMENTAL para que la retención compacte con
+            # incremental_vacuum (el VACUUM de una base vacía es instantáneo); las existentes
+            # lo activan con la CLI de retención
+            con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            con.execute("VACUUM")
+        # Las reconstrucciones de tablas requieren desactivar las FK temporalmente
+        # (PRAGMA foreign_keys no tiene efecto dentro de una transacción)
+        con.execute("PRAGMA foreign_keys=OFF")
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                for statements in MIGRATIONS[version:]:
+                    for statement in statements:
+                        con.execute(statement)
+                if con.execute("PRAGMA foreign_key_check").fetchone():
+                    raise RuntimeError("La migración deja filas que violan claves foráneas")
+                con.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+        finally:
+            con.execute("PRAGMA foreign_keys=ON")
+        return get_version(con)
@@ -0,0 +1,166 @@
+# profiling.py - Tiempos por ejecución (rerun) de la app: spans, conteos y filas
+#
+# app.py abre una "ejecución" al inicio de cada rerun y la cierra al final.
+# Dentro, span()/@timed registran duración, profundidad y filas de las
+# funciones instrumentadas (acceso a datos, compute_*, Excel) y section()
+# marca el tramo de cada pestaña. Fuera de una ejecución activa todo es un
+# no-op (un ContextVar.get), así que CLI, workers y tests no pagan nada.
+#
+# Cada ejecución cerrada se agrega como una línea JSON a PROFILING_LOG.
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Registrar todas las sesiones (además de las que activan el panel)
+PROFILING_ENABLED = os.getenv("PROFILING", "false").lower() in ("1", "true", "yes", "on")
+PROFILING_LOG = os.getenv("PROFILING_LOG", "profiling.jsonl")
+# Al superar este tamaño el log se rota a <log>.1
+MAX_LOG_BYTES = 10 * 1024 * 1024
+
+_current = contextvars.ContextVar("profiling_run", default=None)
+_log_lock = threading.Lock()
+
+
+class _Run:
+    def __init__(self, label):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started = time.perf_counter()
+        self.date = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.spans = []
+        self.depth = 0
+        self.section = None
+
+    def add(self, name, start, duration, depth, rows=None, **attrs):
+        span = {"nombre": name, "inicio_ms": round((start - self.started) * 1e3, 3),
+                "ms": round(duration * 1e3, 3), "nivel": depth}
+        if rows is not None:
+            span["filas"] = int(rows)
+        if self.section:
+            span["seccion"] = self.section[0]
+        span.update(attrs)
+        self.spans.append(span)
+
+
+def _rows(result):
+    """Filas de un resultado: len() de DataFrames y listas (suma en tuplas como pilotos/constructores)"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        sizes = [_rows(r) for r in result]
+        return None if any(s is None for s in sizes) else sum(sizes)
+    return len(result) if hasattr(result, "shape") and hasattr(result, "__len__") else None
+
+
+def active():
+    return _current.get() is not None
+
+
+def begin_run(label=""):
+    """Abre la ejecución del rerun actual (descarta la anterior si no se cerró)"""
+    _current.set(_Run(label))
+
+
+def end_run(log_path=None):
+    """Cierra la ejecución, la agrega al log y devuelve su registro (None si no había)"""
+    run = _current.get()
+    if run is None:
+        return None
+    _close_section(run)
+    _current.set(None)
+    record = {"id": run.id, "fecha": run.date, "etiqueta": run.label,
+              "total_ms": round((time.perf_counter() - run.started) * 1e3, 3), "spans": run.spans}
+    write_log(record, log_path)
+    return record
+
+
+@contextmanager
+def span(name, **attrs):
+    """Mide el bloque; ``attrs`` se guardan con el span (p. ej. filas=len(df))"""
+    run = _current.get()
+    if run is None:
+        yield
+        return
+    depth = run.depth
+    run.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.depth = depth
+        run.add(name, start, time.perf_counter() - start, depth, **attrs)
+
+
+def timed(name=None):
+    """Decorador: span con el nombre de la función y las filas del resultado"""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = _current.get()
+            if run is None:
+                return fn(*args, **kwargs)
+            depth = run.depth
+            run.depth += 1
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                run.depth = depth
+            run.add(label, start, time.perf_counter() - start, depth, rows=_rows(result))
+            return result
+        return wrapper
+    return decorate
+
+
+def _close_section(run):
+    if run.section:
+        name, start = run.section
+        run.section = None
+        run.add(name, start, time.perf_counter() - start, 0, tipo="seccion")
+
+
+def section(name):
+    """Cierra la sección en curso y abre ``name`` (tramos de nivel superior, p. ej. pestañas)"""
+    run = _current.get()
+    if run is None:
+        return
+    _close_section(run)
+    run.section = (name, time.perf_counter())
+
+
+def summarize(record):
+    """(por función, por sección) como listas de dicts ordenadas por tiempo total"""
+    functions, sections = {}, []
+    for s in record["spans"]:
+        if s.get("tipo") == "seccion":
+            sections.append({"seccion": s["nombre"], "ms": s["ms"]})
+            continue
+        agg = functions.setdefault(s["nombre"], {"funcion": s["nombre"], "llamadas": 0, "total_ms": 0.0,
+                                                 "max_ms": 0.0, "filas": 0})
+        agg["llamadas"] += 1
+        agg["total_ms"] = round(agg["total_ms"] + s["ms"], 3)
+        agg["max_ms"] = max(agg["max_ms"], s["ms"])
+        agg["filas"] += s.get("filas", 0)
+    by_time = sorted(functions.values(), key=lambda a: a["total_ms"], reverse=True)
+    return by_time, sorted(sections, key=lambda a: a["ms"], reverse=True)
+
+
+def write_log(record, log_path=None):
+    path = log_path or PROFILING_LOG
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _log_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            # El perfilado nunca debe romper la app
+            pass
@@ -0,0 +1,182 @@
+# retention.py - Retención de versiones de escenarios y compactación de la base
+#
+# Cada guardado de un escenario agrega una fila; load_scenarios solo usa la
+# última por etiqueta. Aquí se conservan las últimas N versiones por
+# (usuario, deporte, etiqueta), el resto se borra (o se mueve a un archivo
+# SQLite aparte) y se devuelve el espacio con incremental_vacuum.
+#
+# Las bases creadas antes de auto_vacuum=INCREMENTAL necesitan una vez el
+# VACUUM completo de la CLI (--vacuum full); la tarea de la app nunca lo hace,
+# porque reescribe toda la base bloqueando las escrituras mientras dura.
+#
+# Uso:
+#   python -m modules.retention --keep 3
+#   python -m modules.retention --keep 1 --archive --vacuum full
+import argparse
+import os
+import threading
+import time
+
+from modules import storage
+from modules.migrations import migrate
+
+# Versiones que se conservan por (usuario, deporte, etiqueta)
+KEEP_VERSIONS = int(os.getenv("SCENARIO_KEEP_VERSIONS", "3"))
+# Intervalo mínimo entre ejecuciones automáticas dentro de la app
+BACKGROUND_INTERVAL_S = 6 * 60 * 60
+
+_SCENARIO_COLUMNS = "id, username, sport, label, payload_json, payload, created_at"
+
+_EXPIRED_SQL = """SELECT id FROM (
+                      SELECT id, ROW_NUMBER() OVER (PARTITION BY username, sport, label ORDER BY id DESC) AS rn
+                      FROM scenarios)
+                  WHERE rn > ?"""
+
+_ARCHIVE_DDL = """CREATE TABLE IF NOT EXISTS archive.scenarios (
+                      id INTEGER PRIMARY KEY,
+                      username TEXT,
+                      sport TEXT,
+                      label TEXT,
+                      payload_json TEXT,
+                      payload BLOB,
+                      created_at TIMESTAMP,
+                      archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                  )"""
+
+
+def archive_path(db_path=None):
+    """Archivo SQLite donde se guardan las versiones archivadas"""
+    base, _ = os.path.splitext(db_path or storage.DB_PATH)
+    return base + ".archive.db"
+
+
+def database_size(db_path=None):
+    """Bytes en disco de la base (archivo principal + WAL)"""
+    path = db_path or storage.DB_PATH
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def prune_scenarios(keep=None, archive=False, db_path=None):
+    """Borra (o archiva) las versiones de escenarios más allá de las ``keep`` últimas.
+
+    Devuelve el número de filas eliminadas de ``scenarios``.
+    """
+    keep = KEEP_VERSIONS if keep is None else keep
+    if keep < 1:
+        raise ValueError("keep debe ser al menos 1 (load_scenarios usa la última versión)")
+    if not archive:
+        with storage.transaction(db_path) as con:
+            return con.execute(f"DELETE FROM scenarios WHERE id IN ({_EXPIRED_SQL})", (keep,)).rowcount
+    # ATTACH no puede ejecutarse dentro de una transacción
+    with storage.exclusive(db_path) as con:
+        con.execute("ATTACH DATABASE ? AS archive", (archive_path(db_path),))
+        try:
+            with storage.transaction(db_path) as tx:
+                tx.execute(_ARCHIVE_DDL)
+                tx.execute(f"""INSERT OR REPLACE INTO archive.scenarios ({_SCENARIO_COLUMNS})
+                               SELECT {_SCENARIO_COLUMNS} FROM scenarios WHERE id IN ({_EXPIRED_SQL})""", (keep,))
+                return tx.execute(f"DELETE FROM scenarios WHERE id IN ({_EXPIRED_SQL})", (keep,)).rowcount
+        finally:
+            con.execute("DETACH DATABASE archive")
+
+
+def compact(full=False, db_path=None):
+    """Devuelve al sistema las páginas libres; True si se compactó.
+
+    Con ``full`` (solo CLI) se activa auto_vacuum=INCREMENTAL y se hace VACUUM
+    completo. Si no, ``PRAGMA incremental_vacuum``, que solo sirve con
+    auto_vacuum=INCREMENTAL: en otro modo no se compacta.
+    """
+    with storage.exclusive(db_path) as con:
+        if full:
+            # El cambio de modo de auto_vacuum se aplica con el VACUUM
+            con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            con.execute("VACUUM")
+        elif con.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            # executescript la ejecuta completa (execute() solo libera una página por paso)
+            con.executescript("PRAGMA incremental_vacuum;")
+        else:
+            return False
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return True
+
+
+def run_retention(keep=None, archive=False, vacuum="incremental", db_path=None):
+    """Poda + compactación; devuelve un informe con el espacio recuperado.
+
+    ``vacuum`` es "incremental", "full" o None (sin compactar).
+    """
+    started = time.perf_counter()
+    before = database_size(db_path)
+    removed = prune_scenarios(keep, archive=archive, db_path=db_path)
+    compacted = bool(vacuum) and compact(full=(vacuum == "full"), db_path=db_path)
+    after = database_size(db_path)
+    return {
+        "eliminados": removed,
+        "compactada": compacted,
+        "archivados": removed if archive else 0,
+        "bytes_antes": before,
+        "bytes_despues": after,
+        "bytes_recuperados": max(before - after, 0),
+        "segundos": round(time.perf_counter() - started, 3),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+# --- Tarea en segundo plano (una por proceso) ---
+_background_lock = threading.Lock()
+_background = {"thread": None, "last_run": 0.0, "last_report": None, "error": None}
+
+
+def _background_job(keep, archive, db_path):
+    try:
+        _background["last_report"] = run_retention(keep, archive=archive, db_path=db_path)
+        _background["error"] = None
+    except Exception as e:
+        _background["error"] = str(e)
+
+
+def start_background(keep=None, archive=False, interval_s=BACKGROUND_INTERVAL_S, force=False, db_path=None):
+    """Lanza la retención en un hilo si pasó ``interval_s`` desde la última (o con ``force``).
+
+    Devuelve True si se lanzó; no bloquea a quien la llama.
+    """
+    with _background_lock:
+        thread = _background["thread"]
+        if thread is not None and thread.is_alive():
+            return False
+        if not force and time.time() - _background["last_run"] < interval_s:
+            return False
+        _background["last_run"] = time.time()
+        thread = threading.Thread(target=_background_job, args=(keep, archive, db_path),
+                                  name="scenario-retention", daemon=True)
+        _background["thread"] = thread
+        thread.start()
+        return True
+
+
+def background_status():
+    """(en ejecución, último informe, último error)"""
+    thread = _background["thread"]
+    return (thread is not None and thread.is_alive()), _background["last_report"], _background["error"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retención de versiones de escenarios y compactación de SQLite")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS, help="versiones a conservar por etiqueta")
+    parser.add_argument("--archive", action="store_true", help="mover las versiones antiguas a " + os.path.basename(archive_path()))
+    parser.add_argument("--vacuum", choices=["incremental", "full", "none"], default="incremental")
+    parser.add_argument("--db", default=None, help="ruta de la base (por defecto app_data.db)")
+    args = parser.parse_args(argv)
+    migrate(args.db)
+    report = run_retention(args.keep, archive=args.archive,
+                           vacuum=None if args.vacuum == "none" else args.vacuum, db_path=args.db)
+    print(f"Escenarios eliminados: {report['eliminados']} (archivados: {report['archivados']})")
+    print(f"Tamaño: {report['bytes_antes'] / 1e6:.2f} MB -> {report['bytes_despues'] / 1e6:.2f} MB "
+          f"({report['bytes_recuperados'] / 1e6:.2f} MB recuperados en {report['segundos']} s)")
+    if args.vacuum == "incremental" and not report["compactada"]:
+        print("Sin compactar: la base no usa auto_vacuum=INCREMENTAL (actívalo una vez con --vacuum full)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# scenarios.py - Escenarios guardados: payload binario columnar y carga diferida
+#
+# El resumen de cada escenario se guarda en binario columnar comprimido (un
+# buffer por columna; los textos codificados con diccionario). load_scenarios solo
+# lee los metadatos de la última versión por etiqueta; el payload se lee y se
+# decodifica al pedir el DataFrame.
+import io
+import json
+import struct
+import zlib
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from modules import storage
+from modules.columnar import decode_column, encode_column
+from modules.profiling import timed
+
+# Formato: MAGIC + zlib(largo del encabezado (4 bytes) + encabezado JSON + buffers).
+# Las columnas se codifican igual que en la copia columnar de los datasets.
+MAGIC = b"SPK1"
+
+
+def encode_frame(df):
+    """Serializa ``df`` a bytes compactos (columnas contiguas, un solo zlib)"""
+    header, buffers = [], []
+    for col in df.columns:
+        arrays, info = encode_column(df[col])
+        info["name"] = str(col)
+        info["arrays"] = [[suffix, array.dtype.str, len(array)] for suffix, array in arrays.items()]
+        header.append(info)
+        buffers.extend(np.ascontiguousarray(array).tobytes() for array in arrays.values())
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return MAGIC + zlib.compress(struct.pack("<I", len(head)) + head + b"".join(buffers))
+
+
+@timed()
+def decode_frame(payload):
+    """Inverso de encode_frame; los arreglos son vistas sobre el buffer descomprimido"""
+    if payload[:len(MAGIC)] != MAGIC:
+        raise ValueError("Payload de escenario no reconocido")
+    raw = zlib.decompress(payload[len(MAGIC):])
+    (size,) = struct.unpack_from("<I", raw)
+    offset = 4 + size
+    out = {}
+    for info in json.loads(raw[4:offset].decode("utf-8")):
+        arrays = {}
+        for suffix, dtype, count in info["arrays"]:
+            arrays[suffix] = np.frombuffer(raw, dtype=dtype, count=count, offset=offset)
+            offset += arrays[suffix].nbytes
+        out[info["name"]] = decode_column(info, arrays[""], arrays.get(".mask"))
+    return pd.DataFrame(out)
+
+
+def _decode_legacy(payload_json):
+    # Filas anteriores a v6: JSON orient="records"
+    return pd.read_json(io.StringIO(payload_json), orient="records")
+
+
+class StoredScenario:
+    """Última versión de un escenario; el DataFrame se lee y decodifica al usarlo"""
+
+    def __init__(self, scenario_id, label, created_at, db_path=None):
+        self.id = scenario_id
+        self.label = label
+        self.created_at = created_at
+        self._db_path = db_path
+
+    @cached_property
+    def frame(self):
+        with storage.read(self._db_path) as con:
+            payload, payload_json = con.execute("SELECT payload, payload_json FROM scenarios WHERE id=?",
+                                                (self.id,)).fetchone()
+        return decode_frame(payload) if payload is not None else _decode_legacy(payload_json)
+
+
+def save_scenario(username, sport, label, df, db_path=None):
+    """Guarda una nueva versión del escenario ``label``; devuelve su id"""
+    payload = encode_frame(df)
+    with storage.transaction(db_path) as con:
+        return con.execute("""INSERT INTO scenarios (username, sport, label, payload)
+                              VALUES (?, ?, ?, ?)""", (username, sport, label, payload)).lastrowid
+
+
+@timed()
+def load_scenarios(username, sport, db_path=None):
+    """{etiqueta: StoredScenario} con la versión más reciente de cada etiqueta (sin leer payloads)"""
+    with storage.read(db_path) as con:
+        rows = con.execute("""SELECT s.id, s.label, s.created_at FROM scenarios s
+                              JOIN (SELECT MAX(id) AS id FROM scenarios
+                                    WHERE username=? AND sport=? GROUP BY label) latest ON latest.id = s.id
+                              ORDER BY s.label""", (username, sport)).fetchall()
+    return {label: StoredScenario(scenario_id, label, created_at, db_path) for scenario_id, label, created_at in rows}
@@ -0,0 +1,247 @@
+# sensitivity.py - Motor incremental de escenarios "what-if" (pestaña Sensibilidad)
+#
+# Los totales base se calculan una sola vez. Al ajustar un equipo (o piloto)
+# solo se recalculan sus partidos: se resta su aporte original, se suma el
+# ajustado y se reordena la tabla. El costo es O(partidos del equipo + equipos)
+# en lugar de copiar el DataFrame y recalcular todo. Los desempates h2h usan la
+# matriz de cruces base con la fila y la columna del equipo ajustado rehechas.
+import numpy as np
+import pandas as pd
+
+from modules import sports
+from modules.utils import (FINALIZERS, MATCH_COLUMNS, TIEBREAKERS, _countback_keys, _is_h2h, batched_team_totals,
+                           finalize_f1, finish_counts, h2h_add, h2h_matrix, pair_results, rank_positions, stat_totals, team_codes, team_totals,
+                           totals_frame)
+
+
+def _positions(keys, target):
+    """Posición de la columna ``target`` en cada fila (D, k) según ``keys`` descendentes.
+
+    Los empates completos se resuelven por orden alfabético (índice de equipo),
+    igual que el orden estable de _rank.
+    """
+    k = keys[0].shape[1]
+    better = np.zeros(keys[0].shape, dtype=bool)
+    tied = np.ones(keys[0].shape, dtype=bool)
+    for key in keys:
+        mine = key[:, [target]]
+        better |= tied & (key > mine)
+        tied &= key == mine
+    better |= tied & (np.arange(k) < target)[None, :]
+    return better.sum(axis=1) + 1
+
+
+def _delta_index(deltas):
+    if np.all(deltas == np.round(deltas)):
+        deltas = deltas.astype(int)
+    return pd.Index(deltas, name="Delta")
+
+
+def _group_rows(codes, k):
+    """Índices de fila agrupados por código: rows[starts[c]:starts[c+1]]"""
+    validos = np.flatnonzero(codes >= 0)
+    order = validos[np.argsort(codes[validos], kind="stable")]
+    starts = np.searchsorted(codes[order], np.arange(k + 1))
+    return order, starts
+
+
+class MatchWhatIf:
+    """Ajusta el marcador de un equipo en todos sus partidos (deportes por partidos)"""
+
+    def __init__(self, df, sport):
+        col_local, col_visitante, col_favor_local, col_favor_visitante = MATCH_COLUMNS[sport]
+        self.sport = sport
+        self.rules = sports.get(sport).rules
+        n = len(df)
+        codes, equipos = team_codes(df, col_local, col_visitante)
+        self.equipos = list(equipos)
+        self.index = {nombre: i for i, nombre in enumerate(self.equipos)}
+        self.home, self.away = codes[:n], codes[n:]
+        self.score_home = pd.to_numeric(df[col_favor_local], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        self.score_away = pd.to_numeric(df[col_favor_visitante], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        self.base = np.vstack(self._totals(self.home, self.away, self.score_home, self.score_away))
+        # Estadísticas que no dependen del marcador (p. ej. HR): no cambian con el ajuste
+        self.stats = stat_totals(df, sport)
+        # Cruces (5, k, k) para los desempates h2h (None si el formato no los usa)
+        self.pairs = None
+        if any(_is_h2h(rule) for rule in TIEBREAKERS[self.rules]):
+            self.pairs = h2h_matrix(pair_results(df, *MATCH_COLUMNS[sport]), self.equipos)
+        # Partidos de cada equipo (local o visitante); un partido consigo mismo aparece dos veces
+        self._order, self._starts = _group_rows(codes, len(self.equipos))
+        self._n = n
+
+    def _totals(self, home, away, score_home, score_away):
+        return team_totals(np.concatenate([home, away]),
+                           np.concatenate([score_home, score_away]),
+                           np.concatenate([score_away, score_home]),
+                           len(self.equipos))
+
+    def rows_for(self, team):
+        """Índices de los partidos donde participa ``team``"""
+        code = self.index.get(team)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(self._order[self._starts[code]:self._starts[code + 1]] % self._n)
+
+    def adjusted_totals(self, team, delta):
+        """Totales (5 × equipos) con ``delta`` sumado al marcador de ``team`` en cada partido"""
+        rows = self.rows_for(team)
+        if not len(rows) or not delta:
+            return self.base
+        code = self.index[team]
+        home, away = self.home[rows], self.away[rows]
+        sh, sa = self.score_home[rows], self.score_away[rows]
+        before = np.vstack(self._totals(home, away, sh, sa))
+        after = np.vstack(self._totals(home, away, sh + delta * (home == code), sa + delta * (away == code)))
+        return self.base - before + after
+
+    def adjusted_pairs(self, team, delta):
+        """Matriz de cruces con ``delta`` sumado al marcador de ``team``: solo se
+        rehacen su fila y su columna, a partir de sus partidos"""
+        rows = self.rows_for(team)
+        if self.pairs is None or not len(rows) or not delta:
+            return self.pairs
+        code = self.index[team]
+        home, away = self.home[rows], self.away[rows]
+        sh = self.score_home[rows] + delta * (home == code)
+        sa = self.score_away[rows] + delta * (away == code)
+        ok = (home >= 0) & (away >= 0)
+        home, away, sh, sa = home[ok], away[ok], sh[ok], sa[ok]
+        pairs = self.pairs.copy()
+        pairs[:, code, :] = 0
+        pairs[:, :, code] = 0
+        return h2h_add(pairs, np.concatenate([home, away]), np.concatenate([away, home]),
+                       np.concatenate([sh, sa]), np.concatenate([sa, sh]))
+
+    def standings(self, team=None, delta=0):
+        """Tabla completa (mismo formato que compute_*, con sus desempates) con el ajuste aplicado"""
+        totals = self.adjusted_totals(team, delta) if team is not None else self.base
+        pairs = self.adjusted_pairs(team, delta) if team is not None else self.pairs
+        return FINALIZERS[self.rules](totals_frame(self.equipos, *totals).assign(**self.stats), pairs)
+
+    @property
+    def entities(self):
+        return self.equipos
+
+    def sweep(self, teams, deltas):
+        """Posición de cada equipo para cada ``delta`` aplicado a ese mismo equipo.
+
+        Por equipo se arma un arreglo (deltas × partidos del equipo) y se
+        recalculan todos los escenarios con un solo bincount; los que quedan
+        con empates se desempatan con h2h (rank_positions). Devuelve un
+        DataFrame índice=delta, columnas=equipo.
+        """
+        deltas = np.asarray(list(deltas), dtype=float)
+        out = {}
+        for team in teams:
+            code = self.index.get(team)
+            if code is None:
+                continue
+            rows = self.rows_for(team)
+            home, away = self.home[rows], self.away[rows]
+            sh, sa = self.score_home[rows], self.score_away[rows]
+            shift = deltas[:, None]
+            new_sh = sh[None, :] + shift * (home == code)[None, :]
+            new_sa = sa[None, :] + shift * (away == code)[None, :]
+            codes = np.concatenate([home, away])
+            before = np.vstack(self._totals(home, away, sh, sa))[:, None, :]
+            after = batched_team_totals(codes, np.hstack([new_sh, new_sa]), np.hstack([new_sa, new_sh]),
+                                         len(self.equipos))
+            totals = self.base[:, None, :] - before + after
+            # Cruces: la matriz base sin la fila ni la columna del equipo más sus partidos ajustados
+            pairs = matches = None
+            if self.pairs is not None:
+                pairs = self.pairs.copy()
+                pairs[:, code, :] = 0
+                pairs[:, :, code] = 0
+                ok = (codes >= 0) & (np.concatenate([away, home]) >= 0)
+                matches = (codes[ok], np.concatenate([away, home])[ok],
+                           np.hstack([new_sh, new_sa])[:, ok], np.hstack([new_sa, new_sh])[:, ok])
+            out[team] = rank_positions(self.rules, totals, self.equipos, pairs, matches)[:, code] + 1
+        return pd.DataFrame(out, index=_delta_index(deltas))
+
+
+class F1WhatIf:
+    """Ajusta los puntos por carrera de un piloto (y de su constructor).
+
+    El ajuste no cambia las llegadas, así que el desempate por llegadas usa
+    las de ``df`` (se cuentan una vez, en el primer empate).
+    """
+
+    sport = "F1"
+
+    def __init__(self, df):
+        self._df = df
+        self._finishes = {}
+        self.driver_codes, drivers = pd.factorize(df["Piloto"], sort=True)
+        self.team_codes, teams = pd.factorize(df["Equipo"], sort=True)
+        self.drivers, self.teams = list(drivers), list(teams)
+        self.index = {nombre: i for i, nombre in enumerate(self.drivers)}
+        self.points = pd.to_numeric(df["Puntos"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        self._scored = ~np.isnan(self.points)
+        self.base_drivers = self._sum(self.driver_codes, len(self.drivers), self.points)
+        self.base_teams = self._sum(self.team_codes, len(self.teams), self.points)
+        self._order, self._starts = _group_rows(self.driver_codes, len(self.drivers))
+        self._dtype = "int64" if pd.api.types.is_integer_dtype(df["Puntos"]) else "float64"
+
+    @staticmethod
+    def _sum(codes, k, weights):
+        ok = codes >= 0
+        return np.bincount(codes[ok], weights=np.nan_to_num(weights[ok]), minlength=k)
+
+    def rows_for(self, driver):
+        code = self.index.get(driver)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self._order[self._starts[code]:self._starts[code + 1]]
+
+    def finishes(self, col):
+        """Llegadas de "Piloto" o "Equipo" (finish_counts), calculadas una vez"""
+        if col not in self._finishes:
+            self._finishes[col] = finish_counts(self._df, col)
+        return self._finishes[col]
+
+    @property
+    def entities(self):
+        return self.drivers
+
+    def sweep(self, drivers, deltas):
+        """Posición de cada piloto para cada ``delta`` por carrera (índice=delta, columnas=piloto)"""
+        deltas = np.asarray(list(deltas), dtype=float)
+        countback = None
+        out = {}
+        for driver in drivers:
+            code = self.index.get(driver)
+            if code is None:
+                continue
+            races = np.count_nonzero(self._scored[self.rows_for(driver)])
+            points = np.repeat(self.base_drivers[None, :], len(deltas), axis=0)
+            points[:, code] += deltas * races
+            if countback is None:
+                # Desempate por llegadas (más victorias, luego más 2.os...), igual que finalize_f1
+                countback = _countback_keys(self.drivers, "Piloto", self.finishes("Piloto"))
+            keys = [points] + [np.broadcast_to(key, points.shape) for key in countback]
+            out[driver] = _positions(keys, code)
+        return pd.DataFrame(out, index=_delta_index(deltas))
+
+    def standings(self, driver=None, delta=0):
+        drivers, teams = self.base_drivers, self.base_teams
+        rows = self.rows_for(driver) if driver is not None else np.empty(0, dtype=np.intp)
+        if len(rows) and delta:
+            # NaN + delta sigue siendo NaN: solo cuentan las carreras con puntos
+            rows = rows[self._scored[rows]]
+            drivers = drivers.copy()
+            drivers[self.index[driver]] += delta * len(rows)
+            teams = teams + self._sum(self.team_codes[rows], len(self.teams), np.full(len(rows), float(delta)))
+        return finalize_f1(pd.DataFrame({"Piloto": self.drivers, "Puntos": drivers.astype(self._dtype)}),
+                           pd.DataFrame({"Equipo": self.teams, "Puntos": teams.astype(self._dtype)}),
+                           self.finishes)
+
+
+def build_whatif(df, sport):
+    """Crea el motor incremental adecuado para ``sport``"""
+    spec = sports.get(sport)
+    df = spec.prepare_frame(df)
+    if spec.kind == "puntos":
+        return F1WhatIf(df)
+    return MatchWhatIf(df, sport)
@@ -0,0 +1,175 @@
+# simulation.py - Simulación Monte Carlo de temporadas (deportes por partidos)
+#
+# Se ajusta un modelo de fuerza por equipo (ataque/defensa + ventaja local)
+# sobre los partidos jugados y se muestrean los partidos pendientes para
+# S temporadas a la vez con NumPy. Los lotes se reparten en un pool de
+# procesos; cada lote devuelve solo histogramas de posiciones. Las tablas
+# simuladas se ordenan con los mismos desempates que la tabla mostrada: las
+# temporadas con empates usan la matriz de cruces base más sus partidos.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules import sports
+from modules.profiling import timed
+from modules.utils import (MATCH_COLUMNS, TIEBREAKERS, _is_h2h, _perspective_arrays, _rank_columns,
+                           batched_team_totals, h2h_matrix, pair_results, rank_positions, team_totals)
+
+# Temporadas por lote (memoria ~ lote × partidos pendientes)
+BATCH_SIZE = 5_000
+# Por debajo de este número de temporadas no compensa lanzar procesos
+PARALLEL_THRESHOLD = 20_000
+# Partidos "virtuales" con rendimiento promedio que suavizan la fuerza estimada
+PRIOR_GAMES = 2.0
+# Equipos que descienden (últimos N)
+RELEGATION_SPOTS = 3
+TOP_SPOTS = 4
+# Los pools de procesos (lotes de temporadas y modules.batch) arrancan procesos nuevos: un
+# fork del llamador (el servidor de Streamlit) copiaría sus hilos (y los locks que tengan
+# tomados) y sus conexiones SQLite
+MP_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Distribución del marcador por deporte (Sport.score_model): goles/HR ~ Poisson; puntos NFL ~ Normal
+SCORE_MODELS = sports.View(lambda sport: sport.score_model, where=lambda sport: sport.score_model is not None)
+
+
+def fit_model(base_df, sport, teams=None):
+    """Estima ataque/defensa por equipo y la ventaja local a partir de los resultados.
+
+    λ_local(i, j) = media · local · ataque_i · defensa_j, con ataque y defensa
+    relativos al promedio de la liga y suavizados con PRIOR_GAMES.
+    """
+    col_local, col_visitante, col_favor_local, col_favor_visitante = MATCH_COLUMNS[sport]
+    spec = sports.get(sport)
+    equipos, codes, favor, contra = _perspective_arrays(base_df, *MATCH_COLUMNS[sport])
+    teams = sorted(set(equipos) | set(teams or []))
+    posicion = {team: i for i, team in enumerate(teams)}
+    remap = np.array([posicion[e] for e in equipos] + [-1], dtype=np.intp)
+    totals = np.vstack(team_totals(remap[codes], favor, contra, len(teams)))
+    pj, _, _, gf, gc = totals
+    home = pd.to_numeric(base_df[col_favor_local], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    away = pd.to_numeric(base_df[col_favor_visitante], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    scores = np.concatenate([home, away])
+    mean = np.nanmean(scores) if np.isfinite(scores).any() else 1.0
+    mean = max(mean, 1e-6)
+    home_factor = (np.nanmean(home) / mean) if np.isfinite(home).any() else 1.0
+    away_factor = (np.nanmean(away) / mean) if np.isfinite(away).any() else 1.0
+    attack = (gf + PRIOR_GAMES * mean) / (pj + PRIOR_GAMES) / mean
+    defense = (gc + PRIOR_GAMES * mean) / (pj + PRIOR_GAMES) / mean
+    return {
+        "sport": sport,
+        # Los lotes corren en otros procesos: el modelo lleva lo que necesitan del registro
+        "rules": spec.rules,
+        "scores": spec.score_model,
+        "teams": teams,
+        "mean": float(mean),
+        "home": float(home_factor),
+        "away": float(away_factor),
+        "attack": attack,
+        "defense": defense,
+        "std": float(np.nanstd(scores)) if np.isfinite(scores).any() else 1.0,
+        "base_totals": totals,
+        # Cruces jugados (5, k, k) para los desempates h2h (None si el formato no los usa)
+        "base_pairs": (h2h_matrix(pair_results(base_df, *MATCH_COLUMNS[sport]), teams)
+                       if any(_is_h2h(rule) for rule in TIEBREAKERS[spec.rules]) else None),
+    }
+
+
+def remaining_round_robin(base_df, sport, rounds=2):
+    """Partidos pendientes de un calendario de todos contra todos (ida y vuelta por defecto)"""
+    col_local, col_visitante = MATCH_COLUMNS[sport][:2]
+    teams = sorted(set(base_df[col_local].dropna()) | set(base_df[col_visitante].dropna()))
+    played = base_df.groupby([col_local, col_visitante]).size()
+    # Con ida y vuelta cada cruce local/visitante se juega rounds // 2 veces
+    per_pair = max(rounds // 2, 1)
+    rows = []
+    for local in teams:
+        for visitante in teams:
+            if local == visitante:
+                continue
+            pending = per_pair - int(played.get((local, visitante), 0))
+            rows.extend([(local, visitante)] * max(pending, 0))
+    return pd.DataFrame(rows, columns=[col_local, col_visitante])
+
+
+def _sample_scores(model, lam_home, lam_away, size, rng):
+    if model["scores"] == "poisson":
+        return rng.poisson(lam_home, size), rng.poisson(lam_away, size)
+    std = model["std"]
+    home = np.clip(np.rint(rng.normal(lam_home, std, size)), 0, None)
+    away = np.clip(np.rint(rng.normal(lam_away, std, size)), 0, None)
+    return home, away
+
+
+def _simulate_batch(model, home, away, n_sims, seed):
+    """Simula ``n_sims`` temporadas; devuelve (histograma posiciones k×k, suma de la métrica principal)"""
+    rng = np.random.default_rng(seed)
+    k = len(model["teams"])
+    m = model["mean"]
+    lam_home = m * model["home"] * model["attack"][home] * model["defense"][away]
+    lam_away = m * model["away"] * model["attack"][away] * model["defense"][home]
+    size = (n_sims, len(home))
+    score_home, score_away = _sample_scores(model, lam_home, lam_away, size, rng)
+    score_home, score_away = score_home.astype(float), score_away.astype(float)
+    sim = batched_team_totals(np.concatenate([home, away]),
+                              np.hstack([score_home, score_away]),
+                              np.hstack([score_away, score_home]), k)
+    totals = model["base_totals"][:, None, :] + sim
+    # Desempates h2h: cruces jugados más los partidos simulados de cada temporada
+    matches = (np.concatenate([home, away]), np.concatenate([away, home]),
+               np.hstack([score_home, score_away]), np.hstack([score_away, score_home]))
+    positions = rank_positions(model["rules"], totals, model["teams"], model["base_pairs"], matches)
+    histogram = np.bincount((np.arange(k) * k + positions).ravel(), minlength=k * k).reshape(k, k)
+    metric = TIEBREAKERS[model["rules"]][0]
+    return histogram, _rank_columns(model["rules"], totals, [metric])[metric].sum(axis=0)
+
+
+@timed()
+def simulate_season(base_df, sport, fixtures=None, n_sims=10_000, n_jobs=None, seed=None, batch_size=None):
+    """Probabilidades de campeón, top 4 y descenso por equipo.
+
+    ``fixtures`` son los partidos pendientes (columnas local/visitante del
+    deporte); si es None se usa el calendario de ida y vuelta restante.
+    Devuelve un DataFrame ordenado por probabilidad de título.
+    """
+    if sport not in SCORE_MODELS:
+        raise ValueError(f"Simulación no disponible para {sport}")
+    col_local, col_visitante = MATCH_COLUMNS[sport][:2]
+    if fixtures is None:
+        fixtures = remaining_round_robin(base_df, sport)
+    fixtures = fixtures[[col_local, col_visitante]].dropna()
+    model = fit_model(base_df, sport, teams=set(fixtures[col_local]) | set(fixtures[col_visitante]))
+    index = {team: i for i, team in enumerate(model["teams"])}
+    home = fixtures[col_local].map(index).to_numpy(dtype=np.intp)
+    away = fixtures[col_visitante].map(index).to_numpy(dtype=np.intp)
+
+    batch_size = batch_size or BATCH_SIZE
+    sizes = [batch_size] * (n_sims // batch_size) + ([n_sims % batch_size] if n_sims % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if n_jobs is None:
+        n_jobs = 1 if n_sims < PARALLEL_THRESHOLD else (os.cpu_count() or 1)
+    if n_jobs > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(sizes)),
+                                 mp_context=multiprocessing.get_context(MP_START_METHOD)) as pool:
+            results = list(pool.map(_simulate_batch, [model] * len(sizes), [home] * len(sizes),
+                                    [away] * len(sizes), sizes, seeds))
+    else:
+        results = [_simulate_batch(model, home, away, size, s) for size, s in zip(sizes, seeds)]
+
+    k = len(model["teams"])
+    histogram = sum(r[0] for r in results)
+    metric_sum = sum(r[1] for r in results)
+    probs = histogram / max(n_sims, 1)
+    metric = TIEBREAKERS[model["rules"]][0]
+    out = pd.DataFrame({
+        "Equipo": model["teams"],
+        f"{metric}_esperados": np.round(metric_sum / max(n_sims, 1), 2),
+        "P_Campeon": probs[:, 0],
+        f"P_Top{TOP_SPOTS}": probs[:, :min(TOP_SPOTS, k)].sum(axis=1),
+        "P_Descenso": probs[:, max(k - RELEGATION_SPOTS, 0):].sum(axis=1) if k > RELEGATION_SPOTS else 0.0,
+        "Pos_media": probs @ np.arange(1, k + 1),
+    })
+    return out.sort_values(["P_Campeon", "Pos_media"], ascending=[False, True], kind="mergesort").reset_index(drop=True)
@@ -0,0 +1,229 @@
+# sports.py - Registro de deportes: esquema, almacenamiento, cálculo, hojas y ajustes
+#
+# Cada deporte se declara una sola vez con un Sport y el resto de la app
+# consulta el registro en lugar de ramificar por nombre. Una liga nueva con
+# un formato existente (p. ej. Premier League con el de La Liga) es una
+# llamada a register().
+#
+# Las declaraciones son solo datos: el kernel de cálculo se indica como
+# "modulo:funcion" y se importa en el primer uso. Los módulos de
+# SPORT_PLUGINS (separados por comas) se importan la primera vez que se
+# consulta el registro; cada uno llama a register() al importarse.
+import functools
+import importlib
+import os
+from collections.abc import Mapping
+from typing import NamedTuple
+
+SPORT_PLUGINS = [m.strip() for m in os.getenv("SPORT_PLUGINS", "").split(",") if m.strip()]
+
+# "partidos": local, visitante, marcador local, marcador visitante (tabla por equipos)
+# "puntos": piloto, equipo, puntos (clasificación de pilotos y constructores)
+KINDS = ("partidos", "puntos")
+# Columnas opcionales de jornada de los deportes por partidos (tabla por jornada)
+ROUND_COLUMNS = ("Jornada", "Fecha")
+# Columnas opcionales de F1: carrera, posición final y reglas de puntos (vuelta rápida, sprint)
+RACE_COLUMNS = ("Carrera", "Posicion", "Vuelta_Rapida", "Sprint")
+
+
+class Table(NamedTuple):
+    """Una tabla del resultado del kernel: hoja de Excel, título y gráfico de barras"""
+    sheet: str
+    title: str
+    index: str   # columna de entidad (eje del gráfico y clave de comparación)
+    value: str   # columna graficada
+
+
+class Knob(NamedTuple):
+    """Ajuste de la pestaña Sensibilidad"""
+    entity_label: str
+    default_entity: str
+    delta_label: str
+    low: int
+    high: int
+    default: int
+
+
+class Sport(NamedTuple):
+    name: str
+    kind: str
+    schema: tuple        # columnas CSV requeridas (en "partidos": local, visitante, marcadores)
+    dtypes: dict         # tipos para read_csv
+    table: str           # tabla SQLite de las filas
+    db_columns: tuple    # columnas de la tabla en el orden de ``schema``; *_id -> tabla teams
+    kernel: str          # "modulo:funcion" del cálculo completo (DataFrame o tupla de DataFrames);
+                         # recibe las columnas del deporte de ``rules`` (se renombran si difieren)
+    tables: tuple        # Table por cada DataFrame del resultado
+    scenario: tuple      # (columna de la métrica, prefijo con que se guarda en escenarios)
+    knob: Knob
+    ruleset: str = None  # formato de tabla y desempates de utils (por defecto, ``name``)
+    optional: tuple = ()  # columnas CSV opcionales (ver OPTIONAL_TARGETS en ingest)
+    score_model: str = None  # marcador en Monte Carlo: "poisson" o "normal" (None = sin simulación)
+    rounds: tuple = ROUND_COLUMNS  # columnas que definen las jornadas, en orden de preferencia
+    round_sheets: tuple = ("JORNADAS",)  # hojas del resultado de compute_round_standings
+    prepare: str = None  # "modulo:funcion" que completa columnas derivables antes de validar
+    stats: tuple = ()  # (columna de la tabla, col. local, col. visitante) sumadas aparte del marcador
+
+    @property
+    def rules(self):
+        return self.ruleset or self.name
+
+    @property
+    def slug(self):
+        return self.name.lower().replace(" ", "_")
+
+    @property
+    def compute(self):
+        """Kernel de cálculo (se importa en el primer uso)"""
+        base = _REGISTRY.get(self.rules, self)
+        return _adapted(self.kernel, tuple(zip(self.schema, base.schema)) if base.schema != self.schema else ())
+
+    def prepare_frame(self, df):
+        """``df`` con las columnas derivables completas (sin ``prepare``, tal cual)"""
+        return load(self.prepare)(df) if self.prepare else df
+
+    def frames(self, result):
+        """Resultado del kernel (o de load_standings) como lista, en el orden de ``tables``"""
+        return list(result) if isinstance(result, tuple) else [result]
+
+
+_REGISTRY = {}
+_plugins_loaded = False
+
+
+def register(sport):
+    """Agrega (o reemplaza) un deporte en el registro y lo devuelve"""
+    if sport.kind not in KINDS:
+        raise ValueError(f"{sport.name}: tipo de deporte desconocido {sport.kind!r}")
+    if len(sport.db_columns) != len(sport.schema):
+        raise ValueError(f"{sport.name}: db_columns debe tener una columna por columna de schema")
+    if sport.kind == "partidos" and len(sport.schema) != 4:
+        raise ValueError(f"{sport.name}: un deporte por partidos tiene 4 columnas (local, visitante, marcadores)")
+    if ":" not in sport.kernel or (sport.prepare and ":" not in sport.prepare):
+        raise ValueError(f"{sport.name}: kernel y prepare deben tener la forma 'modulo:funcion'")
+    _REGISTRY[sport.name] = sport
+    return sport
+
+
+def _load_plugins():
+    global _plugins_loaded
+    if not _plugins_loaded:
+        _plugins_loaded = True
+        for module in SPORT_PLUGINS:
+            importlib.import_module(module)
+
+
+def get(name):
+    """Deporte registrado con ese nombre (KeyError si no existe)"""
+    _load_plugins()
+    return _REGISTRY[name]
+
+
+def names():
+    _load_plugins()
+    return list(_REGISTRY)
+
+
+@functools.lru_cache(maxsize=None)
+def load(path):
+    """Objeto ``funcion`` del módulo ``modulo`` a partir de "modulo:funcion\""""
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+@functools.lru_cache(maxsize=None)
+def _adapted(kernel, renames):
+    """Kernel que primero renombra las columnas ``renames`` ((csv, del kernel), ...)"""
+    fn = load(kernel)
+    if not renames:
+        return fn
+
+    @functools.wraps(fn)
+    def adapted(df):
+        return fn(df.rename(columns=dict(renames)))
+    return adapted
+
+
+class View(Mapping):
+    """Vista {nombre: valor} de solo lectura sobre el registro.
+
+    Se evalúa en cada acceso, así que refleja los deportes registrados después
+    de crearla; ``where`` filtra los deportes incluidos.
+    """
+
+    def __init__(self, value, where=None):
+        self._value = value
+        self._where = where or (lambda sport: True)
+
+    def __getitem__(self, name):
+        try:
+            sport = get(name)
+        except TypeError:
+            raise KeyError(name) from None
+        if not self._where(sport):
+            raise KeyError(name)
+        return self._value(sport)
+
+    def __iter__(self):
+        return (name for name in names() if self._where(_REGISTRY[name]))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def is_match(sport):
+    return sport.kind == "partidos"
+
+
+register(Sport(
+    name="La Liga", kind="partidos",
+    schema=("Local", "Visitante", "Goles_Local", "Goles_Visitante"),
+    dtypes={"Local": "string", "Visitante": "string", "Goles_Local": "Int64", "Goles_Visitante": "Int64"},
+    table="matches", db_columns=("local_id", "visitante_id", "goles_local", "goles_visitante"),
+    kernel="modules.utils:compute_standings_laliga",
+    tables=(Table("TABLA", "Tabla de posiciones (regla 3-1-0)", "Equipo", "PTS"),),
+    scenario=("PTS", "PTS"),
+    knob=Knob("Equipo a ajustar (exacto como aparece en DATA)", "Real Madrid",
+              "Goles a sumar por partido (hipotético)", -2, 2, 1),
+    optional=ROUND_COLUMNS, score_model="poisson",
+))
+register(Sport(
+    name="F1", kind="puntos",
+    schema=("Piloto", "Equipo", "Puntos"),
+    dtypes={"Piloto": "string", "Equipo": "string", "Puntos": "Int64"},
+    table="f1_results", db_columns=("piloto_id", "equipo_id", "puntos"),
+    kernel="modules.utils:compute_f1_points",
+    tables=(Table("PILOTOS", "Pilotos", "Piloto", "Puntos"),
+            Table("CONSTRUCTORES", "Constructores", "Equipo", "Puntos")),
+    scenario=("Puntos", "PTS"),
+    knob=Knob("Piloto a ajustar", "Max Perez", "Puntos a sumar por carrera", -5, 5, 2),
+    optional=RACE_COLUMNS, rounds=("Carrera",), round_sheets=("CARRERAS_PILOTOS", "CARRERAS_CONSTRUCTORES"),
+    prepare="modules.utils:f1_race_points",
+))
+register(Sport(
+    name="MLB", kind="partidos",
+    schema=("Equipo_Local", "Equipo_Visitante", "R_Local", "R_Visitante"),
+    dtypes={"Equipo_Local": "string", "Equipo_Visitante": "string", "R_Local": "Int64", "R_Visitante": "Int64"},
+    table="mlb_games", db_columns=("equipo_local_id", "equipo_visitante_id", "runs_local", "runs_visitante"),
+    kernel="modules.utils:compute_mlb_summary",
+    tables=(Table("RESUMEN", "Resumen por equipo (ficticio)", "Equipo", "R"),),
+    scenario=("R", "R"),
+    knob=Knob("Equipo a ajustar", "Yankees", "Carreras a sumar por juego", -2, 2, 1),
+    # Sin R_Local/R_Visitante (archivos anteriores) las carreras se toman de los HR
+    optional=("HR_Local", "HR_Visitante") + ROUND_COLUMNS, score_model="poisson",
+    prepare="modules.utils:mlb_runs", stats=(("HR", "HR_Local", "HR_Visitante"),),
+))
+register(Sport(
+    name="NFL", kind="partidos",
+    schema=("Local", "Visitante", "Puntos_Local", "Puntos_Visitante"),
+    dtypes={"Local": "string", "Visitante": "string", "Puntos_Local": "Int64", "Puntos_Visitante": "Int64"},
+    table="matches", db_columns=("local_id", "visitante_id", "puntos_local", "puntos_visitante"),
+    kernel="modules.utils:compute_nfl_table",
+    tables=(Table("RESUMEN", "Tabla NFL (ficticia)", "Equipo", "W"),),
+    scenario=("W", "W"),
+    knob=Knob("Equipo a ajustar", "Cowboys", "Puntos a sumar por juego", -7, 7, 3),
+    optional=ROUND_COLUMNS, score_model="normal",
+))
@@ -0,0 +1,133 @@
+# standings_store.py - Tabla de posiciones materializada por dataset
+#
+# La tabla `standings` guarda los totales acumulados (PJ, G, E, P, GF, GC) por
+# equipo, piloto o constructor y `head_to_head` los de cada cruce equipo-rival
+# (desempates h2h). Al importar partidos solo se suman los totales de los
+# equipos y cruces afectados (UPSERT); leer la tabla es un SELECT por clave.
+import pandas as pd
+
+from modules import sports, storage
+from modules.profiling import timed
+from modules.utils import FINALIZERS, MATCH_COLUMNS, STANDINGS_FUNCTIONS, aggregate_team_results, finalize_f1, pair_results
+
+TOTAL_COLUMNS = ["PJ", "G", "E", "P", "GF", "GC"]
+
+_UPSERT_SQL = """INSERT INTO standings (dataset_id, tipo, nombre, pj, g, e, p, gf, gc)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 ON CONFLICT (dataset_id, tipo, nombre) DO UPDATE SET
+                     pj = pj + excluded.pj, g = g + excluded.g, e = e + excluded.e,
+                     p = p + excluded.p, gf = gf + excluded.gf, gc = gc + excluded.gc"""
+
+_UPSERT_H2H_SQL = """INSERT INTO head_to_head (dataset_id, equipo, rival, pj, g, e, p, gf, gc)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     ON CONFLICT (dataset_id, equipo, rival) DO UPDATE SET
+                         pj = pj + excluded.pj, g = g + excluded.g, e = e + excluded.e,
+                         p = p + excluded.p, gf = gf + excluded.gf, gc = gc + excluded.gc"""
+
+def _increments(df, sport):
+    """Totales de las filas nuevas, como lista de (tipo, totales con columna Nombre)"""
+    spec = sports.get(sport)
+    if sports.is_match(spec):
+        col_local, col_visitante = MATCH_COLUMNS[sport][:2]
+        totals = aggregate_team_results(df, *MATCH_COLUMNS[sport])
+        out = [("equipo", totals.rename(columns={"Equipo": "Nombre"}))]
+        # Estadísticas aparte del marcador (p. ej. HR en MLB): una fila por equipo con GF = a favor
+        for name, stat_local, stat_visitante in spec.stats:
+            if stat_local in df.columns and stat_visitante in df.columns:
+                stat = aggregate_team_results(df, col_local, col_visitante, stat_local, stat_visitante)
+                out.append((name.lower(), stat.rename(columns={"Equipo": "Nombre"})))
+        return out
+    if spec.kind == "puntos":
+        driver, team, points = spec.schema
+        out = []
+        for tipo, col in (("piloto", driver), ("constructor", team)):
+            grouped = df.groupby(col)[points].agg(["size", "sum"]).reset_index()
+            totals = pd.DataFrame({"Nombre": grouped[col], "PJ": grouped["size"],
+                                   "G": 0, "E": 0, "P": 0, "GF": grouped["sum"].astype("int64"), "GC": 0})
+            out.append((tipo, totals))
+        return out
+    return []
+
+
+def apply_increment(con, dataset_id, sport, df):
+    """Suma a la tabla materializada los totales de ``df`` (filas recién insertadas).
+
+    Debe ejecutarse dentro de la misma transacción que inserta las filas.
+    """
+    for tipo, totals in _increments(df, sport):
+        con.executemany(_UPSERT_SQL, storage.frame_rows(totals, ["Nombre"] + TOTAL_COLUMNS,
+                                                        constants=(dataset_id, tipo)))
+    if sport in MATCH_COLUMNS:
+        pairs = pair_results(df, *MATCH_COLUMNS[sport])
+        con.executemany(_UPSERT_H2H_SQL, storage.frame_rows(pairs, ["Equipo", "Rival"] + TOTAL_COLUMNS,
+                                                            constants=(dataset_id,)))
+
+
+def rebuild(con, dataset_id, sport, df):
+    """Recalcula desde cero la tabla materializada de un dataset"""
+    con.execute("DELETE FROM standings WHERE dataset_id=?", (dataset_id,))
+    con.execute("DELETE FROM head_to_head WHERE dataset_id=?", (dataset_id,))
+    apply_increment(con, dataset_id, sport, df)
+
+
+def _load_totals(con, dataset_id, tipo):
+    rows = con.execute("""SELECT nombre, pj, g, e, p, gf, gc FROM standings
+                          WHERE dataset_id=? AND tipo=? ORDER BY nombre""", (dataset_id, tipo)).fetchall()
+    return pd.DataFrame(rows, columns=["Nombre"] + TOTAL_COLUMNS)
+
+
+def _load_finishes(con, dataset_id, spec, col):
+    """Llegadas por posición (carreras, sin sprints) de pilotos o constructores, como finish_counts"""
+    entity = spec.db_columns[spec.schema.index(col)]
+    rows = con.execute(f"""SELECT t.nombre, f.posicion, COUNT(*) FROM {spec.table} f
+                           JOIN teams t ON t.id = f.{entity}
+                           WHERE f.dataset_id=? AND f.posicion >= 1 AND NOT COALESCE(f.sprint, 0)
+                           GROUP BY t.nombre, f.posicion""", (dataset_id,)).fetchall()
+    return pd.DataFrame(rows, columns=[col, "Posicion", "N"])
+
+
+def _load_pairs(con, dataset_id):
+    rows = con.execute("""SELECT equipo, rival, pj, g, e, p, gf, gc FROM head_to_head
+                          WHERE dataset_id=?""", (dataset_id,)).fetchall()
+    return pd.DataFrame(rows, columns=["Equipo", "Rival"] + TOTAL_COLUMNS)
+
+
+@timed()
+def load_standings(dataset_id, sport, db_path=None):
+    """Tabla de posiciones desde la tabla materializada (mismo formato que compute_*)"""
+    spec = sports.get(sport)
+    with storage.read(db_path) as con:
+        if spec.kind == "puntos":
+            drivers = _load_totals(con, dataset_id, "piloto").rename(columns={"Nombre": "Piloto", "GF": "Puntos"})
+            constructors = _load_totals(con, dataset_id, "constructor").rename(columns={"Nombre": "Equipo", "GF": "Puntos"})
+            # Las llegadas (desempate por llegadas) solo se leen si hay empates
+            return finalize_f1(drivers, constructors, lambda col: _load_finishes(con, dataset_id, spec, col))
+        totals = _load_totals(con, dataset_id, "equipo").rename(columns={"Nombre": "Equipo"})
+        for name, _, _ in spec.stats:
+            stat = _load_totals(con, dataset_id, name.lower())
+            if len(stat):
+                totals[name] = totals["Equipo"].map(stat.set_index("Nombre")["GF"]).fillna(0).astype("int64")
+        # Los cruces solo se leen si hay empates que resolver con h2h
+        return FINALIZERS[spec.rules](totals, lambda: _load_pairs(con, dataset_id))
+
+
+def check_consistency(dataset_id, sport, df, db_path=None):
+    """Compara la tabla materializada con el cálculo compute_* sobre ``df``.
+
+    Devuelve un DataFrame con las diferencias (vacío si coinciden).
+    """
+    spec = sports.get(sport)
+    stored = load_standings(dataset_id, sport, db_path)
+    expected = STANDINGS_FUNCTIONS[sport](df)
+    pairs = [(table.index, got, want)
+             for table, got, want in zip(spec.tables, spec.frames(stored), spec.frames(expected))]
+    diffs = []
+    for key, got, want in pairs:
+        merged = want.merge(got, on=key, how="outer", suffixes=("_calc", "_mat"), indicator=True)
+        for col in [c for c in want.columns if c != key]:
+            a, b = merged[col + "_calc"], merged[col + "_mat"]
+            bad = (merged["_merge"] != "both") | ~((a == b) | (a.isna() & b.isna()))
+            for _, row in merged[bad].iterrows():
+                diffs.append({"Clave": key, "Nombre": row[key], "Columna": col,
+                              "Calculado": row[col + "_calc"], "Materializado": row[col + "_mat"]})
+    return pd.DataFrame(diffs, columns=["Clave", "Nombre", "Columna", "Calculado", "Materializado"])
@@ -0,0 +1,160 @@
+# storage.py - Conexiones SQLite por hilo (WAL) y context managers de transacción
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import islice, repeat
+
+from modules import profiling
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app_data.db")
+
+# Ajustes aplicados a cada conexión nueva
+# Espera máxima por el lock de escritura (una importación grande lo retiene mientras dura)
+BUSY_TIMEOUT_MS = 30_000
+MMAP_SIZE = 256 * 1024 * 1024
+CACHE_SIZE_KB = 64 * 1024
+
+# Filas por lote en las inserciones masivas
+BULK_CHUNK_SIZE = 50_000
+
+# Solo protege la creación/cierre de conexiones y exclusive(); la concurrencia entre
+# lectores y el escritor la resuelven WAL y busy_timeout
+_lock = threading.RLock()
+_connections = {}  # (pid, hilo, ruta) -> conexión
+
+
+def _configure(con):
+    """Activa WAL, synchronous=NORMAL, mmap, busy timeout y claves foráneas"""
+    con.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    con.execute("PRAGMA foreign_keys=ON")
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    con.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    con.execute("PRAGMA temp_store=MEMORY")
+
+
+def _prune_dead(pid):
+    """Cierra las conexiones de hilos que ya terminaron (cada rerun de Streamlit usa un hilo nuevo)"""
+    alive = {thread.ident for thread in threading.enumerate()}
+    for key in [k for k in _connections if k[0] == pid and k[1] not in alive]:
+        _connections.pop(key).close()
+
+
+def get_connection(db_path=None):
+    """Devuelve la conexión de larga duración del hilo actual para ``db_path``.
+
+    Cada hilo abre la suya (se reabre tras un fork), así las sesiones leen en
+    paralelo con WAL mientras otra escribe.
+    """
+    path = db_path or DB_PATH
+    key = (os.getpid(), threading.get_ident(), path)
+    con = _connections.get(key)
+    if con is None:
+        with _lock:
+            _prune_dead(key[0])
+            with profiling.span("db.connect"):
+                con = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                      isolation_level=None, check_same_thread=False)
+                _configure(con)
+            _connections[key] = con
+    return con
+
+
+@contextmanager
+def transaction(db_path=None):
+    """Transacción de escritura: BEGIN IMMEDIATE ... COMMIT (ROLLBACK si hay error)"""
+    # El span incluye la espera del lock de escritura (busy_timeout)
+    with profiling.span("db.transaction"):
+        con = get_connection(db_path)
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        else:
+            con.execute("COMMIT")
+
+
+@contextmanager
+def read(db_path=None):
+    """Acceso de solo lectura sobre la conexión del hilo"""
+    with profiling.span("db.read"):
+        yield get_connection(db_path)
+
+
+@contextmanager
+def snapshot(db_path=None):
+    """Conexión propia de corta duración con una transacción de lectura.
+
+    En WAL no bloquea a los escritores ni a las demás conexiones; útil para
+    lecturas largas (exportaciones) que deben ver un estado consistente.
+    """
+    con = sqlite3.connect(db_path or DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000,
+                          isolation_level=None, check_same_thread=False)
+    try:
+        _configure(con)
+        con.execute("BEGIN")
+        yield con
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+
+@contextmanager
+def exclusive(db_path=None):
+    """Conexión del hilo sin transacción implícita (PRAGMAs, migraciones); un solo
+    hilo del proceso a la vez"""
+    with _lock:
+        yield get_connection(db_path)
+
+
+def close_all():
+    """Cierra las conexiones abiertas por este proceso (de todos sus hilos)"""
+    with _lock:
+        pid = os.getpid()
+        for key in [k for k in _connections if k[0] == pid]:
+            _connections.pop(key).close()
+
+
+def frame_rows(df, columns, constants=()):
+    """Convierte columnas de un DataFrame en tuplas de valores Python.
+
+    La conversión a objetos Python se hace una vez por columna (``tolist``)
+    y no por fila; ``constants`` se antepone a cada tupla (p. ej. dataset_id).
+    """
+    arrays = [repeat(value) for value in constants]
+    arrays.extend(_python_values(df[col]) for col in columns)
+    return zip(*arrays)
+
+
+def _python_values(series):
+    # Los nulos de tipos nullable (pd.NA) no se pueden enlazar en sqlite3
+    if series.hasnans:
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.tolist()
+
+
+def bulk_insert(con, table, columns, rows, total=None, chunk_size=None, progress=None):
+    """Inserta ``rows`` con executemany en lotes de ``chunk_size`` filas.
+
+    Debe llamarse dentro de ``transaction()`` para que todo el lote sea una
+    sola transacción. ``progress(insertadas, total)`` se invoca tras cada lote.
+    Devuelve el número de filas insertadas.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        table, ", ".join(columns), ", ".join("?" * len(columns)))
+    rows = iter(rows)
+    done = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        con.executemany(sql, chunk)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+    return done
@@ -0,0 +1,51 @@
+# teams.py - Dimensión de equipos/pilotos: nombre <-> id entero por deporte
+#
+# Las tablas de datos guardan solo ids; los nombres se registran una vez en
+# `teams` y se recuperan al leer como Categorical (códigos enteros + nombres).
+import numpy as np
+import pandas as pd
+
+
+def ensure_ids(con, sport, names):
+    """Ids de ``names`` en ``sport``, registrando los nombres nuevos.
+
+    Debe llamarse dentro de una transacción de escritura.
+    """
+    con.executemany("INSERT OR IGNORE INTO teams (sport, nombre) VALUES (?, ?)",
+                    ((sport, name) for name in names))
+    lookup = dict(con.execute("SELECT nombre, id FROM teams WHERE sport=?", (sport,)))
+    return np.array([lookup[name] for name in names], dtype=np.int64)
+
+
+def encode(con, sport, df, columns):
+    """Ids (Int64, nulos como <NA>) de las columnas de nombres ``columns`` de ``df``"""
+    values = np.concatenate([df[col].to_numpy(dtype=object) for col in columns]) if columns else np.empty(0)
+    codes, uniques = pd.factorize(values)
+    # El código -1 (nulo) toma el último valor y queda enmascarado
+    ids = np.append(ensure_ids(con, sport, [str(u) for u in uniques]), 0)
+    out = pd.arrays.IntegerArray(ids[codes], codes < 0)
+    n = len(df)
+    return {col: out[i * n:(i + 1) * n] for i, col in enumerate(columns)}
+
+
+def decode(con, sport, id_columns):
+    """Convierte arreglos de ids en Categorical con las mismas categorías (nombres ordenados).
+
+    ``id_columns`` es {columna: arreglo de ids (float con NaN o Int64)}; todas
+    las columnas comparten categorías, así que sus códigos son comparables.
+    """
+    arrays = {col: pd.to_numeric(pd.Series(ids), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+              for col, ids in id_columns.items()}
+    used = np.unique(np.concatenate([a[~np.isnan(a)] for a in arrays.values()] or [np.empty(0)])).astype(np.int64)
+    names = dict(con.execute("SELECT id, nombre FROM teams WHERE sport=?", (sport,)))
+    order = sorted(used.tolist(), key=lambda i: names[i])
+    lookup = np.full(int(used.max()) + 1 if len(used) else 0, -1, dtype=np.int32)
+    lookup[order] = np.arange(len(order), dtype=np.int32)
+    categories = [names[i] for i in order]
+    out = {}
+    for col, a in arrays.items():
+        codes = np.full(len(a), -1, dtype=np.int32)
+        ok = ~np.isnan(a)
+        codes[ok] = lookup[a[ok].astype(np.int64)]
+        out[col] = pd.Categorical.from_codes(codes, categories=categories)
+    return out
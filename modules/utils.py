@@ -1,12 +1,32 @@
-# utils.py - Módulo mínimo para evitar errores de importación
+# utils.py - Motor de tablas de posiciones
+#
+# Valida los esquemas de CSV y calcula las tablas. Los partidos se pasan a la
+# perspectiva de cada equipo (una fila local y otra visitante) y los totales
+# PJ/G/E/GF/GC se acumulan en una sola pasada con NumPy (bincount sobre los
+# códigos de equipo), sin recorrer los partidos por equipo. Cada formato tiene
+# su FINALIZER, que arma las columnas de la tabla y la ordena con los
+# criterios de TIEBREAKERS (los h2h, con la matriz de cruces de los equipos
+# empatados). La tabla después de cada jornada (compute_round_standings)
+# acumula esos totales por jornada con un cumsum.
+# F1 suma los puntos de cada carrera (F1_POINTS_TABLE si el archivo trae
+# posiciones) y desempata por llegadas: más victorias, más 2.os, etc. MLB
+# decide los juegos por carreras (los archivos con solo HR las toman de los HR).
+import numpy as np
 import pandas as pd
 
-FREE_SCHEMAS = {
-    "La Liga": ["Local", "Visitante", "Goles_Local", "Goles_Visitante"],
-    "F1": ["Piloto", "Equipo", "Puntos"],
-    "MLB": ["Equipo_Local", "Equipo_Visitante", "HR_Local", "HR_Visitante"],
-    "NFL": ["Local", "Visitante", "Puntos_Local", "Puntos_Visitante"]
-}
+from modules import sports
+from modules.profiling import timed
+from modules.sports import ROUND_COLUMNS
+
+# Vistas sobre el registro de deportes (modules.sports)
+FREE_SCHEMAS = sports.View(lambda sport: list(sport.schema))
+
+# Columnas (local, visitante, marcador local, marcador visitante) de los deportes por partidos
+MATCH_COLUMNS = sports.View(lambda sport: tuple(sport.schema), sports.is_match)
+
+# Columnas opcionales (número de jornada y/o fecha); con alguna de ellas se
+# puede calcular la tabla después de cada jornada.
+OPTIONAL_SCHEMAS = sports.View(lambda sport: list(sport.optional), lambda sport: bool(sport.optional))
 
 def validate_schema(df, schema):
     # schema puede ser una lista de columnas o el nombre del deporte
@@ -21,162 +41,705 @@ def validate_schema(df, schema):
     extra = [col for col in df.columns if col not in expected_set]
     return missing, extra, expected
 
+def team_codes(df, col_local, col_visitante):
+    """Códigos enteros de local + visitante (en ese orden) y los equipos ordenados.
+
+    Con columnas Categorical de mismas categorías (ids de la tabla teams) se
+    reutilizan sus códigos sin comparar cadenas; si no, se factoriza.
+    """
+    local, visitante = df[col_local], df[col_visitante]
+    if (isinstance(local.dtype, pd.CategoricalDtype) and isinstance(visitante.dtype, pd.CategoricalDtype)
+            and local.cat.categories.equals(visitante.cat.categories)):
+        categorias = local.cat.categories
+        codigos = np.concatenate([local.cat.codes.to_numpy(), visitante.cat.codes.to_numpy()]).astype(np.intp)
+        # Solo equipos presentes, en orden alfabético (mismo resultado que factorize(sort=True))
+        presentes = np.flatnonzero(np.bincount(codigos[codigos >= 0], minlength=len(categorias)))
+        orden = presentes[np.argsort(np.asarray(categorias[presentes], dtype=object), kind="stable")]
+        nuevo = np.full(len(categorias) + 1, -1, dtype=np.intp)
+        nuevo[orden] = np.arange(len(orden))
+        return nuevo[codigos], pd.Index(categorias[orden])
+    nombres = np.concatenate([local.to_numpy(dtype=object), visitante.to_numpy(dtype=object)])
+    return pd.factorize(nombres, sort=True)
+
+def _scores(df, col_favor_local, col_favor_visitante):
+    """(favor, contra) por perspectiva: local en las primeras ``len(df)`` posiciones"""
+    marcador_local = pd.to_numeric(df[col_favor_local], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    marcador_visitante = pd.to_numeric(df[col_favor_visitante], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return (np.concatenate([marcador_local, marcador_visitante]),
+            np.concatenate([marcador_visitante, marcador_local]))
+
+def _perspective_arrays(df, col_local, col_visitante, col_favor_local, col_favor_visitante):
+    """Convierte los partidos en arreglos por equipo (una fila local y otra visitante).
+
+    Devuelve (equipos, codigos, favor, contra) donde ``codigos`` indexa ``equipos``
+    (ordenados alfabéticamente) y las primeras ``len(df)`` posiciones corresponden
+    a la perspectiva local.
+    """
+    codigos, equipos = team_codes(df, col_local, col_visitante)
+    favor, contra = _scores(df, col_favor_local, col_favor_visitante)
+    # Equipos nulos (código -1) no forman parte de la tabla
+    validos = codigos >= 0
+    return equipos, codigos[validos], favor[validos], contra[validos]
+
+def team_perspective(df, col_local="Local", col_visitante="Visitante",
+                     col_favor_local="Goles_Local", col_favor_visitante="Goles_Visitante"):
+    """Formato largo: una fila por equipo y partido con columnas Equipo, Favor, Contra, Es_Local"""
+    equipos, codigos, favor, contra = _perspective_arrays(
+        df, col_local, col_visitante, col_favor_local, col_favor_visitante)
+    n = len(df)
+    es_local = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+    nombres_validos = np.concatenate([df[col_local].notna().to_numpy(),
+                                      df[col_visitante].notna().to_numpy()])
+    return pd.DataFrame({
+        "Equipo": np.asarray(equipos, dtype=object)[codigos],
+        "Favor": favor,
+        "Contra": contra,
+        "Es_Local": es_local[nombres_validos],
+    })
+
+def team_totals(codigos, favor, contra, k):
+    """Totales (PJ, G, E, GF, GC) por código de equipo con bincount; ignora códigos < 0"""
+    validos = codigos >= 0
+    codigos, favor, contra = codigos[validos], favor[validos], contra[validos]
+    jugados = np.bincount(codigos, minlength=k).astype(np.int64)
+    ganados = np.bincount(codigos, weights=favor > contra, minlength=k).astype(np.int64)
+    empates = np.bincount(codigos, weights=favor == contra, minlength=k).astype(np.int64)
+    # sum() de pandas ignora NaN; replicamos ese comportamiento
+    goles_favor = np.bincount(codigos, weights=np.nan_to_num(favor), minlength=k)
+    goles_contra = np.bincount(codigos, weights=np.nan_to_num(contra), minlength=k)
+    return jugados, ganados, empates, goles_favor.astype(np.int64), goles_contra.astype(np.int64)
+
+def batched_team_totals(codes, favor, contra, k):
+    """team_totals para D escenarios a la vez.
+
+    ``favor``/``contra`` tienen forma (D, m) y ``codes`` (m,); cada escenario se
+    desplaza a su propio bloque de ``k`` casillas para un único bincount.
+    Devuelve un arreglo (5, D, k): PJ, G, E, GF, GC.
+    """
+    validos = codes >= 0
+    codes, favor, contra = codes[validos], favor[:, validos], contra[:, validos]
+    d = favor.shape[0]
+    flat = (codes[None, :] + k * np.arange(d)[:, None]).ravel()
+
+    def count(weights=None):
+        w = None if weights is None else np.asarray(weights, dtype=float).ravel()
+        return np.bincount(flat, weights=w, minlength=d * k).reshape(d, k)
+
+    return np.stack([
+        count(),
+        count(favor > contra),
+        count(favor == contra),
+        count(np.nan_to_num(favor)),
+        count(np.nan_to_num(contra)),
+    ]).astype(np.int64)
+
+# Las tablas de los deportes por partidos se indexan por formato (Sport.rules):
+# una liga nueva puede reutilizar el de La Liga, NFL o MLB.
+
+def totals_frame(equipos, jugados, ganados, empates, goles_favor, goles_contra):
+    """DataFrame de totales por equipo (Equipo, PJ, G, E, P, GF, GC)"""
+    return pd.DataFrame({
+        "Equipo": list(equipos),
+        "PJ": jugados,
+        "G": ganados,
+        "E": empates,
+        "P": jugados - ganados - empates,
+        "GF": goles_favor,
+        "GC": goles_contra,
+    })
+
+def aggregate_team_results(df, col_local="Local", col_visitante="Visitante",
+                           col_favor_local="Goles_Local", col_favor_visitante="Goles_Visitante"):
+    """Agrega PJ/G/E/P/GF/GC por equipo en una sola pasada (bincount sobre códigos)"""
+    equipos, codigos, favor, contra = _perspective_arrays(
+        df, col_local, col_visitante, col_favor_local, col_favor_visitante)
+    return totals_frame(equipos, *team_totals(codigos, favor, contra, len(equipos)))
+
+def pair_results(df, col_local="Local", col_visitante="Visitante",
+                 col_favor_local="Goles_Local", col_favor_visitante="Goles_Visitante"):
+    """Totales (PJ, G, E, P, GF, GC) de cada equipo contra cada rival.
+
+    Formato largo (Equipo, Rival, ...) con solo los cruces jugados; los pares
+    se agrupan con un único bincount sobre sus códigos, sin filtrar por grupo.
+    """
+    codigos, equipos = team_codes(df, col_local, col_visitante)
+    favor, contra = _scores(df, col_favor_local, col_favor_visitante)
+    n = len(df)
+    rivales = np.concatenate([codigos[n:], codigos[:n]])
+    validos = (codigos >= 0) & (rivales >= 0)
+    k = len(equipos)
+    pares, inverse = np.unique(codigos[validos] * k + rivales[validos], return_inverse=True)
+    totals = totals_frame(np.asarray(equipos, dtype=object)[pares // k],
+                          *team_totals(inverse, favor[validos], contra[validos], len(pares)))
+    totals.insert(1, "Rival", np.asarray(equipos, dtype=object)[pares % k])
+    return totals
+
+def h2h_matrix(pairs, equipos):
+    """Arreglo (5, k, k) con PJ, G, E, GF, GC de cada equipo (fila) contra cada
+    rival (columna), en el orden de ``equipos``; pivot vectorizado de ``pairs``"""
+    index = pd.Index(list(equipos))
+    k = len(index)
+    filas = index.get_indexer(pairs["Equipo"])
+    columnas = index.get_indexer(pairs["Rival"])
+    presentes = (filas >= 0) & (columnas >= 0)
+    matrix = np.zeros((5, k, k), dtype=np.int64)
+    matrix[:, filas[presentes], columnas[presentes]] = pairs[["PJ", "G", "E", "GF", "GC"]].to_numpy()[presentes].T
+    return matrix
+
+def h2h_add(matrix, codes, rivals, favor, contra):
+    """Suma a ``matrix`` (5, k, k) los partidos (una perspectiva por elemento) de
+    ``codes`` contra ``rivals``; mismo criterio que team_totals"""
+    stats = np.stack([np.ones(len(codes)), favor > contra, favor == contra,
+                      np.nan_to_num(favor), np.nan_to_num(contra)]).astype(np.int64)
+    np.add.at(matrix, (np.arange(5)[:, None], codes[None, :], rivals[None, :]), stats)
+    return matrix
+
+# Criterios de orden por formato, de mayor a menor. "h2h:<columna>" es esa
+# columna en la mini-tabla de los partidos entre los equipos empatados; cuando
+# un criterio divide un grupo, cada subgrupo vuelve a aplicar la lista desde
+# el principio (con su propia mini-tabla). El empate final es alfabético.
+TIEBREAKERS = {
+    "La Liga": ["PTS", "h2h:PTS", "h2h:DG", "DG", "GF"],
+    "NFL": ["W", "PCT", "h2h:PCT", "DIFF"],
+    "MLB": ["G", "h2h:G", "DIF"],
+}
+
+def _is_h2h(rule):
+    return rule.startswith("h2h:")
+
+def _tiebreak_order(table, rules, h2h, derive):
+    """Orden de las filas de ``table`` según ``rules``; ``h2h`` es la matriz de
+    h2h_matrix en el orden de las filas y ``derive`` calcula las columnas de la
+    mini-tabla a partir de sus totales"""
+    columns = {rule: table[rule].to_numpy() for rule in rules if not _is_h2h(rule)}
+    names = table["Equipo"].to_numpy(dtype=object)
+
+    def mini_table(group):
+        totals = h2h[:, group[:, None], group[None, :]].sum(axis=2)
+        return derive(totals_frame(names[group], totals[0], totals[1], totals[2], totals[3], totals[4]))
+
+    def resolve(group):
+        if len(group) == 1:
+            return list(group)
+        mini = None
+        for rule in rules:
+            if _is_h2h(rule):
+                mini = mini_table(group) if mini is None else mini
+                values = mini[rule[4:]].to_numpy()
+            else:
+                values = columns[rule][group]
+            distinct = np.unique(values)
+            if len(distinct) > 1:
+                # Los subgrupos conservan el orden de las filas (desempate alfabético)
+                return [row for value in distinct[::-1] for row in resolve(group[values == value])]
+        return list(group)
+
+    return np.asarray(resolve(np.arange(len(table))), dtype=np.intp)
+
+def rank_standings(df, ruleset, pairs=None, rules=None):
+    """Ordena la tabla del formato ``ruleset`` con TIEBREAKERS (o ``rules``) y asigna Pos.
+
+    ``pairs`` son los cruces de pair_results, su matriz de h2h_matrix en el
+    orden de las filas de ``df`` o una función que devuelve cualquiera de los
+    dos (solo se llama si hay empates en los criterios previos al primer h2h);
+    sin ellos se omiten los criterios h2h.
+    """
+    rules = rules or TIEBREAKERS[ruleset]
+    plain = [rule for rule in rules if not _is_h2h(rule)]
+    first_h2h = next((i for i, rule in enumerate(rules) if _is_h2h(rule)), None)
+    if pairs is None or first_h2h is None:
+        return _rank(df, plain)
+    # Sin empates antes del primer h2h, el orden simple es el definitivo
+    if not df.duplicated(rules[:first_h2h]).any():
+        return _rank(df, plain)
+    if callable(pairs):
+        pairs = pairs()
+    h2h = pairs if isinstance(pairs, np.ndarray) else h2h_matrix(pairs, df["Equipo"])
+    order = _tiebreak_order(df, rules, h2h, _TABLE_LAYOUT[ruleset][0])
+    df = df.iloc[order].reset_index(drop=True)
+    df["Pos"] = range(1, len(df) + 1)
+    return df
+
+def _mini_totals(group, pairs, matches):
+    """Totales (5, R, k) de cada equipo contra los de su mismo grupo en cada escenario:
+    cruces comunes ``pairs`` (5, k, k) más los partidos propios del escenario ``matches``"""
+    r, k = group.shape
+    same = (group[:, :, None] == group[:, None, :]).astype(np.int64)
+    totals = np.einsum("cij,rij->cri", pairs, same)
+    if matches is not None:
+        codes, rivals, favor, contra = matches
+        ok = group[:, codes] == group[:, rivals]
+        flat = (np.arange(r)[:, None] * k + codes[None, :]).ravel()
+        for stat, weights in enumerate([ok, ok & (favor > contra), ok & (favor == contra),
+                                        ok * np.nan_to_num(favor), ok * np.nan_to_num(contra)]):
+            totals[stat] += np.bincount(flat, weights=np.ravel(weights), minlength=r * k).reshape(r, k).astype(np.int64)
+    return totals
+
+def _rank_columns(ruleset, totals, rules):
+    """Columnas ``rules`` de la tabla de ``ruleset`` para cada escenario de ``totals``
+    (5, R, k), con las mismas columnas derivadas que la tabla final; un arreglo (R, k)
+    por columna"""
+    r, k = totals[0].shape
+    table = _TABLE_LAYOUT[ruleset][0](totals_frame([None] * (r * k), *(t.ravel() for t in totals)))
+    return {rule: table[rule].to_numpy(dtype=float).reshape(r, k) for rule in rules}
+
+def _resolve_ties(ruleset, equipos, totals, pairs, matches):
+    """_tiebreak_order para R escenarios a la vez; devuelve las posiciones (R, k).
+
+    Se parte de un grupo por escenario con todos los equipos y, nivel a nivel,
+    cada grupo de 2+ equipos se divide con el primer criterio que lo separa
+    (las mini-tablas de todos los grupos salen de un solo cálculo por nivel) y
+    los subgrupos vuelven a empezar la lista, como en la versión recursiva.
+    """
+    r, k = totals[0].shape
+    rules = TIEBREAKERS[ruleset]
+    plain = _rank_columns(ruleset, totals, [rule for rule in rules if not _is_h2h(rule)])
+    rows = np.arange(r)[:, None]
+    rank = np.broadcast_to(np.arange(k), (r, k)).copy()     # posición actual de cada equipo
+    group = np.zeros((r, k), dtype=np.intp)                 # grupo = posición de su primer equipo
+    active = np.ones((r, k), dtype=bool)                    # por grupo: aún puede dividirse
+    while True:
+        gid = rows * k + group
+        size = np.bincount(gid.ravel(), minlength=r * k).reshape(r, k)
+        live = np.take_along_axis(active & (size >= 2), group, axis=1)
+        if not live.any():
+            return rank
+        split = np.full((r, k), -1)                         # por grupo: criterio que lo divide
+        chosen = np.zeros((r, k))
+        mini = None
+        for i, rule in enumerate(rules):
+            pending = live & (np.take_along_axis(split, group, axis=1) < 0)
+            if not pending.any():
+                break
+            if _is_h2h(rule):
+                if mini is None:
+                    mini = _rank_columns(ruleset, _mini_totals(group, pairs, matches),
+                                         [x[4:] for x in rules if _is_h2h(x)])
+                values = mini[rule[4:]]
+            else:
+                values = plain[rule]
+            hi, lo = np.full(r * k, -np.inf), np.full(r * k, np.inf)
+            np.maximum.at(hi, gid[pending], values[pending])
+            np.minimum.at(lo, gid[pending], values[pending])
+            split[(hi > lo).reshape(r, k)] = i
+            take = pending & np.take_along_axis(split == i, group, axis=1)
+            chosen[take] = values[take]
+        # Dentro de cada grupo (contiguo), de mayor a menor valor; el empate conserva el orden
+        parent_split = np.take_along_axis(split >= 0, group, axis=1)
+        order = np.lexsort((rank, -chosen, group), axis=-1)
+        rank = np.empty_like(rank)
+        np.put_along_axis(rank, order, np.arange(k)[None, :], axis=-1)
+        g_sorted = np.take_along_axis(group, order, axis=-1)
+        c_sorted = np.take_along_axis(chosen, order, axis=-1)
+        starts = np.ones((r, k), dtype=bool)
+        starts[:, 1:] = (g_sorted[:, 1:] != g_sorted[:, :-1]) | (c_sorted[:, 1:] != c_sorted[:, :-1])
+        new_group = np.empty_like(group)
+        np.put_along_axis(new_group, order, np.maximum.accumulate(np.where(starts, np.arange(k), 0), axis=1), axis=-1)
+        # Los subgrupos de un grupo dividido vuelven a empezar; los que no se dividieron quedan resueltos
+        active = np.zeros((r, k), dtype=bool)
+        active[rows, new_group] = parent_split
+        group = new_group
+
+def rank_positions(ruleset, totals, equipos=None, pairs=None, matches=None):
+    """Posición (0 = primero) de cada equipo en cada escenario de ``totals`` (5, R, k).
+
+    Ordena todos los escenarios a la vez por los criterios de TIEBREAKERS sin
+    los h2h. Con ``pairs`` (matriz
+    (5, k, k) de cruces comunes, como h2h_matrix) y opcionalmente ``matches``
+    (codes, rivals, favor (R, m), contra (R, m): partidos propios de cada
+    escenario, una perspectiva por columna) los escenarios con empates en los
+    criterios previos al primer h2h se reordenan con TIEBREAKERS completos,
+    igual que rank_standings. Devuelve un arreglo (R, k).
+    """
+    rules = TIEBREAKERS[ruleset]
+    keys = list(_rank_columns(ruleset, totals, [rule for rule in rules if not _is_h2h(rule)]).values())
+    r, k = keys[0].shape
+    order = np.lexsort([np.broadcast_to(np.arange(k), (r, k))] + [-key for key in reversed(keys)], axis=-1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(k)[None, :], axis=-1)
+    first_h2h = next((i for i, rule in enumerate(rules) if _is_h2h(rule)), None)
+    if pairs is None or first_h2h is None:
+        return positions
+    # Empate = dos equipos consecutivos (ya ordenados) iguales en todas las claves previas al h2h
+    same = np.ones((r, max(k - 1, 0)), dtype=bool)
+    for key in keys[:first_h2h]:
+        ordered = np.take_along_axis(key, order, axis=-1)
+        same &= ordered[:, 1:] == ordered[:, :-1]
+    tied = np.flatnonzero(same.any(axis=1))
+    if len(tied):
+        if matches is not None:
+            codes, rivals, favor, contra = matches
+            matches = (codes, rivals, favor[tied], contra[tied])
+        positions[tied] = _resolve_ties(ruleset, equipos, [t[tied] for t in totals], pairs, matches)
+    return positions
+
+def _rank(df, by):
+    """Ordena de mayor a menor (estable, desempate alfabético) y asigna Pos"""
+    df = df.sort_values(by, ascending=[False] * len(by), kind="mergesort")
+    df = df.reset_index(drop=True)
+    df["Pos"] = range(1, len(df) + 1)
+    return df
+
+def _laliga_columns(totals):
+    standings_df = totals.copy()
+    standings_df["DG"] = standings_df["GF"] - standings_df["GC"]
+    # Puntos (3 por victoria, 1 por empate)
+    standings_df["PTS"] = standings_df["G"] * 3 + standings_df["E"]
+    return standings_df
+
+def finalize_laliga(totals, pairs=None):
+    """Tabla de La Liga a partir de los totales por equipo (Equipo, PJ, G, E, P, GF, GC)
+    y, para los desempates h2h, de los cruces ``pairs`` (ver rank_standings)"""
+    standings_df = rank_standings(_laliga_columns(totals), "La Liga", pairs)
+    return standings_df[["Pos", "Equipo", "PJ", "G", "E", "P", "GF", "GC", "DG", "PTS"]]
+
+@timed()
 def compute_standings_laliga(df):
     """Calcula la tabla de posiciones de La Liga basada en resultados"""
-    equipos = set(df["Local"].tolist() + df["Visitante"].tolist())
-    standings = []
-    
-    for equipo in equipos:
-        # Partidos como local
-        local_games = df[df["Local"] == equipo]
-        # Partidos como visitante
-        away_games = df[df["Visitante"] == equipo]
-        
-        # Calcular estadísticas
-        partidos = len(local_games) + len(away_games)
-        goles_favor = (local_games["Goles_Local"].sum() + 
-                      away_games["Goles_Visitante"].sum())
-        goles_contra = (local_games["Goles_Visitante"].sum() + 
-                       away_games["Goles_Local"].sum())
-        
-        # Calcular victorias, empates, derrotas
-        victorias = len(local_games[local_games["Goles_Local"] > local_games["Goles_Visitante"]])
-        victorias += len(away_games[away_games["Goles_Visitante"] > away_games["Goles_Local"]])
-        
-        empates = len(local_games[local_games["Goles_Local"] == local_games["Goles_Visitante"]])
-        empates += len(away_games[away_games["Goles_Visitante"] == away_games["Goles_Local"]])
-        
-        derrotas = partidos - victorias - empates
-        
-        # Puntos (3 por victoria, 1 por empate)
-        puntos = victorias * 3 + empates * 1
-        
-        standings.append({
-            "Pos": 0,  # Se calculará después del ordenamiento
-            "Equipo": equipo,
-            "PJ": partidos,
-            "G": victorias,
-            "E": empates,
-            "P": derrotas,
-            "GF": int(goles_favor),
-            "GC": int(goles_contra),
-            "DG": int(goles_favor - goles_contra),
-            "PTS": puntos
-        })
-    
-    # Crear DataFrame y ordenar
-    standings_df = pd.DataFrame(standings)
-    standings_df = standings_df.sort_values(["PTS", "DG", "GF"], ascending=[False, False, False])
-    standings_df["Pos"] = range(1, len(standings_df) + 1)
-    
-    return standings_df[["Pos", "Equipo", "PJ", "G", "E", "P", "GF", "GC", "DG", "PTS"]]
+    cols = MATCH_COLUMNS["La Liga"]
+    return finalize_laliga(aggregate_team_results(df, *cols), lambda: pair_results(df, *cols))
 
-def compute_f1_points(df):
-    """Calcula puntos de pilotos y constructores en F1"""
-    # Agrupar por piloto
-    drivers = df.groupby("Piloto")["Puntos"].sum().reset_index()
-    drivers = drivers.sort_values("Puntos", ascending=False)
-    drivers["Pos"] = range(1, len(drivers) + 1)
-    drivers = drivers[["Pos", "Piloto", "Puntos"]]
-    
-    # Agrupar por constructor/equipo
-    constructors = df.groupby("Equipo")["Puntos"].sum().reset_index()
-    constructors = constructors.sort_values("Puntos", ascending=False)
-    constructors["Pos"] = range(1, len(constructors) + 1)
-    constructors = constructors[["Pos", "Equipo", "Puntos"]]
-    
+# Puntos F1 por posición final (columna = posición; 0 = sin posición o fuera de los puntos):
+# fila 0 carrera, fila 1 sprint
+F1_POINTS_TABLE = np.array([
+    [0, 25, 18, 15, 12, 10, 8, 6, 4, 2, 1],
+    [0, 8, 7, 6, 5, 4, 3, 2, 1, 0, 0],
+])
+# Punto extra por vuelta rápida, solo en carrera y terminando entre los primeros N
+F1_FASTEST_LAP_POINTS = 1
+F1_FASTEST_LAP_TOP = 10
+
+def _flag(df, col):
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=0.0) != 0
+
+def _finish_positions(df):
+    """Posición final de cada fila como float (NaN si no hay, es inválida o es un sprint)"""
+    if "Posicion" not in df.columns:
+        return np.full(len(df), np.nan)
+    pos = pd.to_numeric(df["Posicion"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return np.where((pos >= 1) & ~_flag(df, "Sprint"), pos, np.nan)
+
+def f1_race_points(df):
+    """Completa Puntos desde Posicion (con Vuelta_Rapida y Sprint) donde falte.
+
+    Los puntos salen de F1_POINTS_TABLE indexada por (sprint, posición) en una
+    sola operación; los Puntos que ya trae el archivo se respetan.
+    """
+    if "Posicion" not in df.columns:
+        return df
+    pos = pd.to_numeric(df["Posicion"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    sprint = _flag(df, "Sprint")
+    width = F1_POINTS_TABLE.shape[1]
+    index = np.where((pos >= 1) & (pos < width), pos, 0).astype(np.intp)
+    points = F1_POINTS_TABLE[sprint.astype(np.intp), index]
+    points += F1_FASTEST_LAP_POINTS * (_flag(df, "Vuelta_Rapida") & ~sprint & (pos >= 1) & (pos <= F1_FASTEST_LAP_TOP))
+    points = pd.array(points, dtype="Int64")
+    if "Puntos" in df.columns:
+        points = pd.to_numeric(df["Puntos"], errors="coerce").astype("Int64").fillna(pd.Series(points, index=df.index))
+    return df.assign(Puntos=points)
+
+def finish_counts(df, col):
+    """Cantidad de llegadas en cada posición (carreras, sin sprints) por ``col``: [col, Posicion, N]"""
+    pos = _finish_positions(df)
+    ok = ~np.isnan(pos) & df[col].notna().to_numpy()
+    counts = pd.DataFrame({col: np.asarray(df[col], dtype=object)[ok], "Posicion": pos[ok].astype(np.int64)})
+    return counts.groupby([col, "Posicion"]).size().reset_index(name="N")
+
+def _countback_keys(names, col, counts):
+    """Columnas (n.º de 1.os, n.º de 2.os, ...) alineadas con ``names`` para el desempate por llegadas"""
+    if counts is None or not len(counts):
+        return []
+    rows = pd.Index(names).get_indexer(counts[col])
+    cols, _ = pd.factorize(counts["Posicion"], sort=True)
+    ok = rows >= 0
+    matrix = np.zeros((len(names), cols.max() + 1), dtype=np.int64)
+    np.add.at(matrix, (rows[ok], cols[ok]), counts["N"].to_numpy()[ok])
+    return list(matrix.T)
+
+def _rank_countback(df, col, counts):
+    """Ordena por Puntos; los empates por más victorias, luego más 2.os puestos, etc.
+    (``counts`` puede ser una función: solo se llama si hay empates)"""
+    df = df[[col, "Puntos"]]
+    points = pd.to_numeric(df["Puntos"], errors="coerce").to_numpy(dtype=float, na_value=-np.inf)
+    if callable(counts):
+        counts = counts() if len(np.unique(points)) < len(points) else None
+    keys = [points] + _countback_keys(df[col], col, counts)
+    # Mismo criterio que _rank: empate final por el orden de entrada (alfabético)
+    order = np.lexsort([np.arange(len(df))] + [-np.asarray(key, dtype=float) for key in reversed(keys)])
+    df = df.iloc[order].reset_index(drop=True)
+    df.insert(0, "Pos", range(1, len(df) + 1))
+    return df
+
+def finalize_f1(drivers, constructors, finishes=None):
+    """Ordena los totales de pilotos (Piloto, Puntos) y constructores (Equipo, Puntos).
+
+    ``finishes(col)`` devuelve las llegadas de "Piloto" o "Equipo" como
+    finish_counts para desempatar por llegadas; se llama solo si hay empates.
+    """
+    def counts(col):
+        return (lambda: finishes(col)) if finishes else None
+    drivers = _rank_countback(drivers, "Piloto", counts("Piloto"))
+    constructors = _rank_countback(constructors, "Equipo", counts("Equipo"))
     return drivers, constructors
 
+def _points_by(df, col):
+    # Los nombres vuelven como lista: con columnas Categorical el índice del groupby también lo sería
+    grouped = df.groupby(col, observed=True)["Puntos"].sum()
+    return pd.DataFrame({col: list(grouped.index), "Puntos": grouped.to_numpy()})
+
+@timed()
+def compute_f1_points(df):
+    """Calcula puntos de pilotos y constructores en F1 (Puntos o, si falta, desde Posicion)"""
+    df = f1_race_points(df)
+    # Agrupar por piloto y por constructor/equipo
+    drivers = _points_by(df, "Piloto")
+    constructors = _points_by(df, "Equipo")
+    return finalize_f1(drivers, constructors, lambda col: finish_counts(df, col))
+
+def _race_table(race_codes, races, codes, names, col, points, pos):
+    """Campeonato acumulado de ``col`` después de cada carrera (ver compute_race_standings)"""
+    r, k = len(races), len(names)
+    ok = codes >= 0
+    flat = race_codes[ok] * k + codes[ok]
+    cum_points = np.cumsum(np.bincount(flat, weights=points[ok], minlength=r * k).reshape(r, k), axis=0)
+    # Llegadas acumuladas por posición: (carreras, entidades, posiciones distintas)
+    finished = ok & ~np.isnan(pos)
+    pos_codes, finish_values = pd.factorize(pos[finished], sort=True)
+    p = len(finish_values)
+    cells = (race_codes[finished] * k + codes[finished]) * p + pos_codes
+    finishes = np.cumsum(np.bincount(cells, minlength=r * k * p).reshape(r, k, p), axis=0)
+    keys = [cum_points] + [finishes[:, :, j] for j in range(p)]
+    # Orden por claves descendentes; empate final por orden alfabético, como _rank
+    tiebreak = np.broadcast_to(np.arange(k), (r, k))
+    order = np.lexsort([tiebreak] + [-np.asarray(key, dtype=float) for key in reversed(keys)], axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, k + 1)[None, :], axis=-1)
+    wins = finishes[:, :, 0] if p and finish_values[0] == 1 else np.zeros((r, k), dtype=np.int64)
+    table = pd.DataFrame({
+        "Carrera": np.repeat(np.asarray(races, dtype=object), k),
+        "Pos": ranks.ravel(),
+        col: np.tile(np.asarray(names, dtype=object), r),
+        "Puntos": cum_points.ravel().astype(np.int64),
+        "Victorias": wins.ravel(),
+    })
+    # Cada carrera ya es un bloque contiguo; dentro de él se ordena por posición
+    sort = (np.repeat(np.arange(r), k) * k + ranks.ravel() - 1).argsort(kind="stable")
+    return table.iloc[sort].reset_index(drop=True)
+
+@timed()
+def compute_race_standings(df, round_col="Carrera"):
+    """Campeonato de pilotos y de constructores después de cada carrera (formato largo).
+
+    Los puntos (y las llegadas por posición para el desempate por llegadas) se
+    agrupan por (carrera, piloto) con un bincount y se acumulan con un cumsum
+    sobre las carreras, en el orden en que aparecen en el dataset. Las filas
+    sin carrera se omiten. Devuelve (pilotos, constructores) con las columnas
+    [Carrera, Pos, Piloto/Equipo, Puntos, Victorias].
+    """
+    df = f1_race_points(df)
+    races = df[round_col].astype("string")
+    valid = (races.notna() & (races.str.strip() != "")).to_numpy()
+    df = df[valid]
+    race_codes, carreras = pd.factorize(races[valid], sort=False)
+    points = pd.to_numeric(df["Puntos"], errors="coerce").to_numpy(dtype=float, na_value=0.0)
+    pos = _finish_positions(df)
+    tables = []
+    for col in ("Piloto", "Equipo"):
+        codes, names = pd.factorize(df[col], sort=True)
+        tables.append(_race_table(race_codes, list(carreras), codes, list(names), col, points, pos)
+                      .rename(columns={"Carrera": round_col}))
+    return tuple(tables)
+
+# Exponente de la expectativa pitagórica (Bill James / Baseball Reference)
+PYTHAG_EXPONENT = 1.83
+
+def mlb_runs(df):
+    """Completa R_Local/R_Visitante desde HR_Local/HR_Visitante donde falten
+    (archivos anteriores, solo con HR: como antes, carreras = HR)"""
+    fills = {}
+    for side in ("Local", "Visitante"):
+        runs, hr = f"R_{side}", f"HR_{side}"
+        if hr in df.columns:
+            fills[runs] = df[runs].fillna(df[hr]) if runs in df.columns else df[hr]
+    return df.assign(**fills) if fills else df
+
+def stat_totals(df, sport):
+    """Totales a favor de las estadísticas de Sport.stats presentes en ``df``, como
+    {columna: arreglo} en el orden de equipos de team_codes (el de aggregate_team_results)"""
+    col_local, col_visitante = MATCH_COLUMNS[sport][:2]
+    out = {}
+    for name, stat_local, stat_visitante in sports.get(sport).stats:
+        if stat_local in df.columns and stat_visitante in df.columns:
+            equipos, codigos, favor, _ = _perspective_arrays(df, col_local, col_visitante, stat_local, stat_visitante)
+            out[name] = np.bincount(codigos, weights=np.nan_to_num(favor), minlength=len(equipos)).astype(np.int64)
+    return out
+
+def _mlb_columns(totals):
+    summary_df = totals.rename(columns={"PJ": "J", "GF": "R", "GC": "RA"})
+    # Victoria = más carreras que el rival; sin empates en MLB
+    summary_df["P"] = summary_df["J"] - summary_df["G"]
+    summary_df["AVG"] = np.round(summary_df["G"] / summary_df["J"].where(summary_df["J"] > 0), 3).fillna(0.0)
+    summary_df["DIF"] = summary_df["R"] - summary_df["RA"]
+    # Expectativa pitagórica: R^x / (R^x + RA^x), porcentaje de victorias "merecido"
+    # (con carreras negativas, posibles en los escenarios hipotéticos, queda en 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        runs = summary_df["R"].to_numpy(dtype=float) ** PYTHAG_EXPONENT
+        allowed = summary_df["RA"].to_numpy(dtype=float) ** PYTHAG_EXPONENT
+        summary_df["PYTHAG"] = np.nan_to_num(np.round(runs / (runs + allowed), 3))
+    return summary_df
+
+def _games_behind(wins, losses):
+    """Juegos detrás del líder (el primero del último eje): ((G líder - G) + (P - P líder)) / 2"""
+    return ((wins[..., :1] - wins) + (losses - losses[..., :1])) / 2
+
+def finalize_mlb(totals, pairs=None):
+    """Resumen MLB a partir de los totales por equipo (GF/GC = carreras a favor/en contra,
+    más HR si viene) y los cruces ``pairs``"""
+    summary_df = rank_standings(_mlb_columns(totals), "MLB", pairs)
+    summary_df["JD"] = _games_behind(summary_df["G"].to_numpy(), summary_df["P"].to_numpy())
+    columns = ["Pos", "Equipo", "J", "G", "P", "AVG", "JD", "R", "RA", "DIF", "PYTHAG"]
+    return summary_df[columns + (["HR"] if "HR" in summary_df else [])]
+
+@timed()
 def compute_mlb_summary(df):
-    """Calcula resumen de estadísticas MLB por equipo"""
-    equipos = set(df["Equipo_Local"].tolist() + df["Equipo_Visitante"].tolist())
-    summary = []
-    
-    for equipo in equipos:
-        # Juegos como local
-        local_games = df[df["Equipo_Local"] == equipo]
-        # Juegos como visitante
-        away_games = df[df["Equipo_Visitante"] == equipo]
-        
-        # Calcular estadísticas
-        juegos = len(local_games) + len(away_games)
-        hr_total = (local_games["HR_Local"].sum() + away_games["HR_Visitante"].sum())
-        hr_contra = (local_games["HR_Visitante"].sum() + away_games["HR_Local"].sum())
-        
-        # Calcular victorias (asumiendo que más HR = victoria, simplificado)
-        victorias_local = len(local_games[local_games["HR_Local"] > local_games["HR_Visitante"]])
-        victorias_away = len(away_games[away_games["HR_Visitante"] > away_games["HR_Local"]])
-        victorias = victorias_local + victorias_away
-        
-        derrotas = juegos - victorias
-        avg = victorias / juegos if juegos > 0 else 0
-        
-        summary.append({
-            "Pos": 0,  # Se calculará después
-            "Equipo": equipo,
-            "J": juegos,
-            "G": victorias,
-            "P": derrotas,
-            "AVG": round(avg, 3),
-            "HR": int(hr_total),
-            "R": int(hr_total)  # Simplificado: R = HR para este ejemplo
-        })
-    
-    # Crear DataFrame y ordenar
-    summary_df = pd.DataFrame(summary)
-    summary_df = summary_df.sort_values(["G", "HR"], ascending=[False, False])
-    summary_df["Pos"] = range(1, len(summary_df) + 1)
-    
-    return summary_df[["Pos", "Equipo", "J", "G", "P", "AVG", "HR", "R"]]
+    """Calcula resumen de estadísticas MLB por equipo (victorias por carreras)"""
+    df = mlb_runs(df)
+    cols = MATCH_COLUMNS["MLB"]
+    totals = aggregate_team_results(df, *cols).assign(**stat_totals(df, "MLB"))
+    return finalize_mlb(totals, lambda: pair_results(df, *cols))
+
+def _nfl_columns(totals):
+    standings_df = totals.rename(columns={"PJ": "J", "G": "W", "E": "T", "P": "L",
+                                          "GF": "PF", "GC": "PA"})
+    standings_df["PCT"] = np.round(standings_df["W"] / standings_df["J"].where(standings_df["J"] > 0), 3).fillna(0.0)
+    standings_df["DIFF"] = standings_df["PF"] - standings_df["PA"]
+    return standings_df
 
+def finalize_nfl(totals, pairs=None):
+    """Tabla NFL a partir de los totales por equipo (GF/GC = puntos a favor/en contra)
+    y los cruces ``pairs``"""
+    standings_df = rank_standings(_nfl_columns(totals), "NFL", pairs)
+    return standings_df[["Pos", "Equipo", "J", "W", "L", "T", "PCT", "PF", "PA", "DIFF"]]
+
+@timed()
 def compute_nfl_table(df):
     """Calcula tabla de posiciones NFL basada en puntos"""
-    equipos = set(df["Local"].tolist() + df["Visitante"].tolist())
-    standings = []
-    
-    for equipo in equipos:
-        # Juegos como local
-        local_games = df[df["Local"] == equipo]
-        # Juegos como visitante
-        away_games = df[df["Visitante"] == equipo]
-        
-        # Calcular estadísticas
-        juegos = len(local_games) + len(away_games)
-        puntos_favor = (local_games["Puntos_Local"].sum() + 
-                       away_games["Puntos_Visitante"].sum())
-        puntos_contra = (local_games["Puntos_Visitante"].sum() + 
-                        away_games["Puntos_Local"].sum())
-        
-        # Calcular victorias y derrotas
-        victorias = len(local_games[local_games["Puntos_Local"] > local_games["Puntos_Visitante"]])
-        victorias += len(away_games[away_games["Puntos_Visitante"] > away_games["Puntos_Local"]])
-        
-        empates = len(local_games[local_games["Puntos_Local"] == local_games["Puntos_Visitante"]])
-        empates += len(away_games[away_games["Puntos_Visitante"] == away_games["Puntos_Local"]])
-        
-        derrotas = juegos - victorias - empates
-        
-        win_pct = victorias / juegos if juegos > 0 else 0
-        
-        standings.append({
-            "Pos": 0,  # Se calculará después
-            "Equipo": equipo,
-            "J": juegos,
-            "W": victorias,
-            "L": derrotas,
-            "T": empates,
-            "PCT": round(win_pct, 3),
-            "PF": int(puntos_favor),
-            "PA": int(puntos_contra),
-            "DIFF": int(puntos_favor - puntos_contra)
-        })
-    
-    # Crear DataFrame y ordenar
-    standings_df = pd.DataFrame(standings)
-    standings_df = standings_df.sort_values(["W", "PCT", "DIFF"], ascending=[False, False, False])
-    standings_df["Pos"] = range(1, len(standings_df) + 1)
-    
-    return standings_df[["Pos", "Equipo", "J", "W", "L", "T", "PCT", "PF", "PA", "DIFF"]]
+    cols = MATCH_COLUMNS["NFL"]
+    return finalize_nfl(aggregate_team_results(df, *cols), lambda: pair_results(df, *cols))
+
+# Tabla final a partir de los totales por equipo, por formato
+FINALIZERS = {
+    "La Liga": finalize_laliga,
+    "MLB": finalize_mlb,
+    "NFL": finalize_nfl,
+}
+
+# Columnas derivadas y orden de columnas de la tabla final (sin ordenar) por formato
+_TABLE_LAYOUT = {
+    "La Liga": (_laliga_columns, ["Equipo", "PJ", "G", "E", "P", "GF", "GC", "DG", "PTS"]),
+    "MLB": (_mlb_columns, ["Equipo", "J", "G", "P", "AVG", "JD", "R", "RA", "DIF", "PYTHAG"]),
+    "NFL": (_nfl_columns, ["Equipo", "J", "W", "L", "T", "PCT", "PF", "PA", "DIFF"]),
+}
+
+def round_column(df, sport=None):
+    """Columna de jornada presente y con datos en ``df`` (Jornada antes que Fecha; en F1,
+    Carrera) o None"""
+    for col in (sports.get(sport).rounds if sport else ROUND_COLUMNS):
+        if col in df.columns and (df[col].notna() & (df[col].astype("string") != "")).any():
+            return col
+    return None
+
+def _round_keys(values, col):
+    if col == "Fecha":
+        return pd.to_datetime(values, errors="coerce")
+    return pd.to_numeric(values, errors="coerce")
+
+@timed()
+def compute_round_standings(df, sport, round_col=None):
+    """Tabla después de cada jornada en una sola pasada (formato largo).
+
+    Los partidos se agrupan por (jornada, equipo) con un bincount y los totales
+    acumulados salen de un cumsum sobre las jornadas ordenadas; el orden de
+    cada jornada usa los criterios de TIEBREAKERS sin los h2h y, en las jornadas
+    con empates, los h2h con la matriz de cruces acumulada hasta
+    esa jornada (igual que la tabla final). Los partidos sin jornada/fecha se
+    omiten. Devuelve las columnas
+    [round_col, Pos, ...tabla final] ordenadas por jornada y posición; en los
+    deportes por puntos, (pilotos, constructores) de compute_race_standings.
+    """
+    spec = sports.get(sport)
+    round_col = round_col or round_column(df, sport)
+    if round_col is None:
+        raise ValueError(f"El dataset no tiene columna {' ni '.join(spec.rounds)}")
+    if spec.kind == "puntos":
+        return compute_race_standings(df, round_col)
+    if sport not in MATCH_COLUMNS:
+        raise ValueError(f"Tabla por jornada no disponible para {sport}")
+    ruleset = spec.rules
+    keys = _round_keys(df[round_col], round_col)
+    valid = keys.notna().to_numpy()
+    df = df[valid]
+    round_codes, rounds = pd.factorize(keys[valid], sort=True)
+    col_local, col_visitante, col_favor_local, col_favor_visitante = MATCH_COLUMNS[sport]
+    codigos, equipos = team_codes(df, col_local, col_visitante)
+    favor, contra = _scores(df, col_favor_local, col_favor_visitante)
+    n = len(df)
+    rivales = np.concatenate([codigos[n:], codigos[:n]])
+    jornada = np.concatenate([round_codes, round_codes])
+    # Equipos nulos fuera (como en _perspective_arrays)
+    validos = codigos >= 0
+    k, r = len(equipos), len(rounds)
+    flat = jornada[validos] * k + codigos[validos]
+
+    def cumulative(weights=None):
+        per_round = np.bincount(flat, weights=weights, minlength=r * k).reshape(r, k)
+        return np.cumsum(per_round, axis=0).astype(np.int64)
+
+    f, c = favor[validos], contra[validos]
+    totals = [cumulative(), cumulative(f > c), cumulative(f == c),
+              cumulative(np.nan_to_num(f)), cumulative(np.nan_to_num(c))]
+    derive, columns = _TABLE_LAYOUT[ruleset]
+    table = derive(totals_frame(np.tile(np.asarray(equipos, dtype=object), r), *(t.ravel() for t in totals)))
+    rules = TIEBREAKERS[ruleset]
+    rank_keys = [table[rule].to_numpy(dtype=float).reshape(r, k) for rule in rules if not _is_h2h(rule)]
+    # Orden por claves descendentes; empate por orden alfabético, como _rank
+    tiebreak = np.broadcast_to(np.arange(k), (r, k))
+    order = np.lexsort([tiebreak] + [-key for key in reversed(rank_keys)], axis=-1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, k + 1)[None, :], axis=-1)
+
+    primary = rank_keys[0]
+    tied = {i for i in range(r) if len(np.unique(primary[i])) < k}
+    if tied and any(_is_h2h(rule) for rule in rules):
+        # Matriz de cruces acumulada jornada a jornada; solo se reordenan las jornadas con empates
+        pares = validos & (rivales >= 0)
+        by_round = np.argsort(jornada[pares], kind="stable")
+        bounds = np.searchsorted(jornada[pares][by_round], np.arange(r + 1))
+        rows, cols = codigos[pares][by_round], rivales[pares][by_round]
+        fp, cp = favor[pares][by_round], contra[pares][by_round]
+        stats = np.stack([np.ones(len(fp)), fp > cp, fp == cp, np.nan_to_num(fp), np.nan_to_num(cp)]).astype(np.int64)
+        h2h = np.zeros((5, k, k), dtype=np.int64)
+        for i in range(max(tied) + 1):
+            block = slice(bounds[i], bounds[i + 1])
+            for s in range(5):
+                np.add.at(h2h[s], (rows[block], cols[block]), stats[s, block])
+            if i in tied:
+                order = _tiebreak_order(table.iloc[i * k:(i + 1) * k], rules, h2h, derive)
+                positions[i, order] = np.arange(1, k + 1)
+    table.insert(0, "Pos", positions.ravel())
+    table.insert(0, round_col, np.repeat(np.asarray(rounds), k))
+    # Cada jornada ya es un bloque contiguo; dentro de él se ordena por posición
+    sort = (np.repeat(np.arange(r), k) * k + positions.ravel() - 1).argsort(kind="stable")
+    table = table.iloc[sort].reset_index(drop=True)
+    if "JD" in columns:
+        table["JD"] = _games_behind(table["G"].to_numpy().reshape(r, k), table["P"].to_numpy().reshape(r, k)).ravel()
+    return table[[round_col, "Pos"] + columns]
+
+# Cálculo completo de la tabla por deporte (F1 devuelve (pilotos, constructores));
+# el kernel de cada deporte se importa al primer acceso
+STANDINGS_FUNCTIONS = sports.View(lambda sport: sport.compute)
 
 def merge_laliga_with_projections(df1, df2):
     """Combina datos base de La Liga con proyecciones"""
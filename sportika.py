@@ -0,0 +1,82 @@
+# sportika.py - Línea de comandos sin Streamlit (trabajos nocturnos en lote)
+#
+# Uso:
+#   python sportika.py datasets --username salvador
+#   python sportika.py standings --all --format csv xlsx --out salida
+#   python sportika.py standings --dataset 3 7 --csv data/liga.csv --jobs 4 --format parquet
+import argparse
+import sys
+
+from modules import storage
+from modules.batch import FORMATS, csv_job, dataset_jobs, run_batch
+from modules.datasets import list_datasets
+from modules.migrations import migrate
+from modules.utils import FREE_SCHEMAS
+
+
+def _list(args):
+    rows = list_datasets(args.username, args.sport, args.db)
+    for dataset_id, sport, name, is_projection, created_at in rows:
+        tipo = "Proyección" if is_projection else "Base"
+        print(f"{dataset_id:>6}  {sport:<8} {tipo:<11} {created_at}  {name}")
+    print(f"{len(rows)} datasets")
+    return 0
+
+
+def _standings(args):
+    jobs = []
+    if args.all or args.dataset:
+        jobs += dataset_jobs(args.dataset or None, args.username, args.sport, args.db)
+    jobs += [csv_job(path, args.sport) for path in args.csv]
+    if not jobs:
+        print("Nada que procesar: usa --dataset, --all o --csv", file=sys.stderr)
+        return 2
+
+    def report(result):
+        if result["error"]:
+            print(f"ERROR {result['trabajo']}: {result['error']}", file=sys.stderr)
+        else:
+            print(f"{result['trabajo']} ({result['deporte']}, {result['filas']} filas, "
+                  f"{result['segundos']} s): {', '.join(result['archivos'])}")
+
+    results = run_batch(jobs, args.out, args.format, n_jobs=args.jobs,
+                        include_data=args.with_data, db_path=args.db, progress=report)
+    errors = sum(1 for r in results if r["error"])
+    print(f"{len(results) - errors}/{len(results)} trabajos completados en {args.out}")
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="sportika", description="Tablas de posiciones y exportaciones en lote")
+    parser.add_argument("--db", default=None, help=f"ruta de la base (por defecto {storage.DB_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    listing = sub.add_parser("datasets", help="lista los datasets de la base")
+    listing.add_argument("--username")
+    listing.add_argument("--sport", choices=list(FREE_SCHEMAS))
+    listing.set_defaults(run=_list)
+
+    standings = sub.add_parser("standings", help="calcula tablas de datasets y/o CSV en paralelo")
+    standings.add_argument("--dataset", type=int, nargs="+", default=[], help="ids de datasets")
+    standings.add_argument("--all", action="store_true", help="todos los datasets (filtrables con --username/--sport)")
+    standings.add_argument("--username")
+    standings.add_argument("--sport", choices=list(FREE_SCHEMAS),
+                           help="filtra datasets; en CSV, deporte a usar (si no, se deduce de las columnas)")
+    standings.add_argument("--csv", nargs="+", default=[], help="archivos CSV con el esquema de su deporte")
+    standings.add_argument("--format", nargs="+", choices=FORMATS, default=["csv"])
+    standings.add_argument("--out", default="salida", help="carpeta de salida")
+    standings.add_argument("--jobs", type=int, default=None, help="procesos (por defecto, uno por CPU)")
+    standings.add_argument("--with-data", action="store_true", help="agrega la hoja DATA con las filas crudas al Excel")
+    standings.set_defaults(run=_standings)
+
+    args = parser.parse_args(argv)
+    migrate(args.db)
+    try:
+        return args.run(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# Los módulos se importan como en la app (modules.*) aunque se ejecute `pytest` sin -m
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import storage  # noqa: E402
+from modules.cache import dataset_cache  # noqa: E402
+from modules.migrations import migrate  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Base de datos temporal con el esquema al día (la copia columnar queda junto a ella)"""
+    path = str(tmp_path / "app_data.db")
+    migrate(path)
+    yield path
+    storage.close_all()
+    dataset_cache.invalidate()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from modules.datasets import create_dataset, dataset_data
+from modules.ingest import import_frame
+from modules.sensitivity import build_whatif
+from modules.standings_store import check_consistency, load_standings
+from modules.utils import compute_f1_points, f1_race_points
+
+
+def _races(rows):
+    return pd.DataFrame(rows, columns=["Carrera", "Piloto", "Equipo", "Posicion", "Vuelta_Rapida", "Sprint"])
+
+
+def test_points_from_positions():
+    df = _races([("GP 1", "A", "X", 1, False, False), ("GP 1", "B", "Y", 10, True, False),
+                 ("GP 1", "C", "Y", 11, False, False), ("GP 1", "D", "X", None, True, False),
+                 ("S 2", "A", "X", 1, False, True), ("S 2", "B", "Y", 8, False, True)])
+    # Vuelta rápida: +1 solo terminando entre los 10 primeros; sprint 8-7-...-1
+    assert f1_race_points(df)["Puntos"].tolist() == [25, 2, 0, 0, 8, 1]
+
+
+def test_count_back_breaks_ties_on_points():
+    # Empate a 30: A tiene una victoria en carrera; la de B es en un sprint (no cuenta)
+    df = _races([("GP 1", "A", "X", 1, False, False), ("GP 1", "B", "Y", 2, False, False),
+                 ("GP 2", "B", "Y", 2, False, False), ("GP 2", "A", "X", 3, False, False),
+                 ("S 3", "B", "Y", 1, False, True)]).assign(Puntos=[20, 10, 10, 10, 10])
+    drivers, constructors = compute_f1_points(df)
+    assert drivers["Puntos"].tolist() == [30, 30]
+    assert drivers["Piloto"].tolist() == ["A", "B"]
+    assert constructors["Equipo"].tolist() == ["X", "Y"]
+
+
+def test_count_back_goes_down_the_positions():
+    # Mismos puntos y una victoria cada uno: decide el 2.º puesto de B
+    df = _races([("GP 1", "A", "X", 1, False, False), ("GP 1", "B", "Y", 2, False, False),
+                 ("GP 2", "B", "Y", 1, False, False), ("GP 2", "A", "X", 3, False, False)]
+                ).assign(Puntos=[10, 10, 10, 10])
+    drivers, _ = compute_f1_points(df)
+    assert drivers["Piloto"].tolist() == ["B", "A"]
+
+
+def _season(seed, n_races=5):
+    rng = np.random.default_rng(seed)
+    pilotos = ["A", "B", "C", "D", "E", "F"]
+    rows = []
+    for race in range(n_races):
+        for pos, i in enumerate(rng.permutation(len(pilotos)), start=1):
+            rows.append((f"GP {race}", pilotos[i], f"E{i // 2}", pos, False, race == 2))
+    df = _races(rows)
+    # Pocos puntos distintos: muchos empates que se resuelven por llegadas
+    return df.assign(Puntos=(df["Posicion"] <= 3).astype(int))
+
+
+def test_materialized_standings_use_count_back(db_path):
+    dataset_id = create_dataset("u", "F1", "carreras", db_path=db_path)
+    import_frame(_season(0), dataset_id, "F1", db_path=db_path)
+    df = dataset_data(dataset_id, "F1", db_path)
+    assert check_consistency(dataset_id, "F1", df, db_path).empty
+    for got, want in zip(load_standings(dataset_id, "F1", db_path), compute_f1_points(df)):
+        pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_whatif_uses_count_back():
+    df = _season(1)
+    engine = build_whatif(df, "F1")
+    deltas = [-1, 0, 1]
+    sweep = engine.sweep(["A", "F"], deltas)
+    for driver in ["A", "F"]:
+        for delta in deltas:
+            adjusted = df.assign(Puntos=df["Puntos"] + np.where(df["Piloto"] == driver, delta, 0))
+            got = engine.standings(driver, delta)
+            for a, b in zip(got, compute_f1_points(adjusted)):
+                pd.testing.assert_frame_equal(a, b, check_dtype=False)
+            assert sweep.loc[delta, driver] == got[0].loc[got[0]["Piloto"] == driver, "Pos"].iloc[0]
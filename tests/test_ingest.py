@@ -0,0 +1,33 @@
+import io
+
+import pandas as pd
+
+from modules.datasets import create_dataset, dataset_data
+from modules.ingest import ingest_csv, missing_columns
+
+
+def _csv(df):
+    return io.BytesIO(df.to_csv(index=False).encode())
+
+
+def test_f1_positions_without_points(db_path):
+    # Sin Puntos: se calculan desde Posicion, así que la cabecera es válida
+    df = pd.DataFrame({"Carrera": ["GP 1", "GP 1", "GP 2", "GP 2"], "Piloto": ["A", "B", "A", "B"],
+                       "Equipo": ["X", "Y", "X", "Y"], "Posicion": [1, 2, 2, 1]})
+    assert missing_columns("F1", df.columns) == []
+    assert missing_columns("F1", ["Carrera", "Piloto", "Equipo"]) == ["Puntos"]
+    dataset_id = create_dataset("u", "F1", "posiciones", db_path=db_path)
+    assert ingest_csv(_csv(df), dataset_id, "F1", db_path=db_path) == 4
+    assert dataset_data(dataset_id, "F1", db_path)["Puntos"].tolist() == [25, 18, 18, 25]
+
+
+def test_mlb_home_runs_without_runs(db_path):
+    # Archivo anterior, solo con HR: las carreras se toman de los HR
+    df = pd.DataFrame({"Equipo_Local": ["A", "B"], "Equipo_Visitante": ["B", "A"],
+                       "HR_Local": [2, 0], "HR_Visitante": [1, 3]})
+    assert missing_columns("MLB", df.columns) == []
+    assert missing_columns("MLB", ["Equipo_Local", "Equipo_Visitante", "HR_Local"]) == ["R_Visitante"]
+    dataset_id = create_dataset("u", "MLB", "solo hr", db_path=db_path)
+    assert ingest_csv(_csv(df), dataset_id, "MLB", db_path=db_path) == 2
+    data = dataset_data(dataset_id, "MLB", db_path)
+    assert data["R_Local"].tolist() == [2, 0] and data["R_Visitante"].tolist() == [1, 3]
@@ -0,0 +1,150 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from benchmarks.standings import synthetic_matches
+from modules import storage
+from modules.datasets import dataset_data, delete_dataset
+from modules.migrations import SCHEMA_VERSION, get_version, migrate
+from modules.standings_store import check_consistency, load_standings
+from modules.utils import MATCH_COLUMNS
+
+
+# Esquema anterior a las migraciones (ensure_tables de app.py e init_db.py)
+_BASELINE_DDL = [
+    '''CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+    '''CREATE TABLE IF NOT EXISTS scenarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT,
+        sport TEXT,
+        label TEXT,
+        payload_json TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+    '''CREATE TABLE IF NOT EXISTS entitlements (
+        username TEXT PRIMARY KEY,
+        is_premium INTEGER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+    '''CREATE TABLE IF NOT EXISTS datasets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT,
+        sport TEXT,
+        name TEXT,
+        is_projection INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''',
+    '''CREATE TABLE IF NOT EXISTS matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER,
+        local TEXT,
+        visitante TEXT,
+        goles_local INTEGER DEFAULT 0,
+        goles_visitante INTEGER DEFAULT 0,
+        puntos_local INTEGER DEFAULT 0,
+        puntos_visitante INTEGER DEFAULT 0,
+        FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS f1_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER,
+        piloto TEXT,
+        equipo TEXT,
+        puntos INTEGER DEFAULT 0,
+        carrera TEXT DEFAULT '',
+        FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS mlb_games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER,
+        equipo_local TEXT,
+        equipo_visitante TEXT,
+        hr_local INTEGER DEFAULT 0,
+        hr_visitante INTEGER DEFAULT 0,
+        runs_local INTEGER DEFAULT 0,
+        runs_visitante INTEGER DEFAULT 0,
+        FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+    )''',
+]
+
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """Base con el esquema original y un dataset por deporte (ids 1-4), más una fila huérfana"""
+    path = str(tmp_path / "baseline.db")
+    frames = {
+        "La Liga": synthetic_matches(60, 6, seed=1, max_score=2),
+        "NFL": synthetic_matches(60, 6, seed=2, cols=MATCH_COLUMNS["NFL"], max_score=30),
+        "MLB": synthetic_matches(60, 6, seed=3, cols=("Equipo_Local", "Equipo_Visitante", "HR_Local", "HR_Visitante")),
+        "F1": pd.DataFrame({"Piloto": ["Alonso", "Norris", "Alonso", "Norris"],
+                            "Equipo": ["Aston", "McLaren"] * 2, "Puntos": [25, 18, 18, 25]}),
+    }
+    con = sqlite3.connect(path)
+    for statement in _BASELINE_DDL:
+        con.execute(statement)
+    con.executemany("INSERT INTO datasets (id, username, sport, name) VALUES (?, 'u', ?, ?)",
+                    [(1, "La Liga", "liga"), (2, "NFL", "nfl"), (3, "MLB", "mlb"), (4, "F1", "f1")])
+    con.executemany("INSERT INTO matches (dataset_id, local, visitante, goles_local, goles_visitante) "
+                    "VALUES (1, ?, ?, ?, ?)", frames["La Liga"].itertuples(index=False))
+    con.executemany("INSERT INTO matches (dataset_id, local, visitante, puntos_local, puntos_visitante) "
+                    "VALUES (2, ?, ?, ?, ?)", frames["NFL"].itertuples(index=False))
+    con.executemany("INSERT INTO mlb_games (dataset_id, equipo_local, equipo_visitante, hr_local, hr_visitante) "
+                    "VALUES (3, ?, ?, ?, ?)", frames["MLB"].itertuples(index=False))
+    con.executemany("INSERT INTO f1_results (dataset_id, piloto, equipo, puntos) VALUES (4, ?, ?, ?)",
+                    frames["F1"].itertuples(index=False))
+    # Fila huérfana (sin dataset): la reconstrucción con ON DELETE CASCADE la descarta
+    con.execute("INSERT INTO matches (dataset_id, local, visitante) VALUES (99, 'X', 'Y')")
+    con.commit()
+    con.close()
+    yield path, frames
+    storage.close_all()
+
+
+def test_migrate_baseline_database(baseline_db):
+    path, frames = baseline_db
+    assert migrate(path) == SCHEMA_VERSION
+    with storage.read(path) as con:
+        assert get_version(con) == SCHEMA_VERSION
+        assert con.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == len(frames["La Liga"]) + len(frames["NFL"])
+        assert con.execute("SELECT COUNT(*) FROM mlb_games").fetchone()[0] == len(frames["MLB"])
+    # Migrar otra vez no hace nada
+    assert migrate(path) == SCHEMA_VERSION
+
+
+def test_delete_dataset_cascades_after_migration(baseline_db):
+    path, frames = baseline_db
+    migrate(path)
+    delete_dataset(1, path)
+    with storage.read(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == len(frames["NFL"])
+
+
+def test_migration_materializes_standings(baseline_db):
+    path, _ = baseline_db
+    migrate(path)
+    for dataset_id, sport in [(1, "La Liga"), (2, "NFL"), (3, "MLB"), (4, "F1")]:
+        assert check_consistency(dataset_id, sport, dataset_data(dataset_id, sport, path), path).empty
+
+
+def test_migration_moves_names_to_teams(baseline_db):
+    path, frames = baseline_db
+    migrate(path)
+    for dataset_id, sport in [(1, "La Liga"), (3, "MLB"), (4, "F1")]:
+        names = list(frames[sport].columns[:2])
+        data = dataset_data(dataset_id, sport, path)
+        pd.testing.assert_frame_equal(data[names].astype(str), frames[sport][names])
+
+
+def test_migration_fills_mlb_runs_from_home_runs(baseline_db):
+    path, frames = baseline_db
+    migrate(path)
+    data = dataset_data(3, "MLB", path)
+    assert data["R_Local"].tolist() == frames["MLB"]["HR_Local"].tolist()
+    assert data["R_Visitante"].tolist() == frames["MLB"]["HR_Visitante"].tolist()
+    table = load_standings(3, "MLB", path).set_index("Equipo")
+    assert (table["HR"] == table["R"]).all()
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from modules.utils import PYTHAG_EXPONENT, compute_mlb_summary
+
+
+def test_runs_decide_games_and_derived_columns():
+    df = pd.DataFrame({"Equipo_Local": ["A", "B", "C", "A"], "Equipo_Visitante": ["B", "C", "A", "C"],
+                       "R_Local": [5, 2, 1, 4], "R_Visitante": [3, 6, 7, 3],
+                       # Por HR, A no habría ganado el primero ni B perdido el segundo
+                       "HR_Local": [1, 0, 0, 2], "HR_Visitante": [1, 1, 2, 0]})
+    table = compute_mlb_summary(df).set_index("Equipo")
+    assert table.index.tolist() == ["A", "C", "B"]
+    assert table.loc["A", ["J", "G", "P", "R", "RA", "DIF", "HR"]].tolist() == [3, 3, 0, 16, 7, 9, 5]
+    assert table["JD"].tolist() == [0.0, 2.0, 2.5]
+    expected = 16 ** PYTHAG_EXPONENT / (16 ** PYTHAG_EXPONENT + 7 ** PYTHAG_EXPONENT)
+    assert table.loc["A", "PYTHAG"] == pytest.approx(round(expected, 3))
+
+
+def test_home_runs_only_files_use_them_as_runs():
+    df = pd.DataFrame({"Equipo_Local": ["A", "B"], "Equipo_Visitante": ["B", "A"],
+                       "HR_Local": [2, 0], "HR_Visitante": [1, 3]})
+    table = compute_mlb_summary(df).set_index("Equipo")
+    assert table.loc["A", ["G", "R", "RA", "HR"]].tolist() == [2, 5, 1, 5]
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.standings import synthetic_matches
+from modules import utils
+from modules.utils import MATCH_COLUMNS, STANDINGS_FUNCTIONS, compute_round_standings
+
+
+@pytest.mark.parametrize("sport,rules", [
+    ("La Liga", None),
+    ("NFL", None),
+    ("MLB", None),
+    ("La Liga", ["PTS", "GF", "h2h:PTS", "DG"]),
+])
+def test_each_round_matches_table_up_to_it(monkeypatch, sport, rules):
+    if rules:
+        monkeypatch.setitem(utils.TIEBREAKERS, sport, rules)
+    df = synthetic_matches(90, 6, seed=5, cols=MATCH_COLUMNS[sport], max_score=3)
+    df["Jornada"] = np.repeat(np.arange(1, 10), 10)
+    timeline = compute_round_standings(df, sport)
+    for jornada in (1, 5, 9):
+        got = timeline[timeline["Jornada"] == jornada].drop(columns="Jornada").reset_index(drop=True)
+        want = STANDINGS_FUNCTIONS[sport](df[df["Jornada"] <= jornada])
+        pd.testing.assert_frame_equal(got[want.columns], want, check_dtype=False)
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from benchmarks.standings import synthetic_matches
+from modules import utils
+from modules.sensitivity import build_whatif
+from modules.utils import MATCH_COLUMNS, STANDINGS_FUNCTIONS
+
+
+@pytest.mark.parametrize("sport,rules", [
+    ("La Liga", None),
+    ("NFL", None),
+    ("MLB", None),
+    # Criterios editados: el barrido sigue a TIEBREAKERS, igual que la tabla
+    ("La Liga", ["PTS", "GF", "h2h:PTS", "DG"]),
+    ("NFL", ["W", "h2h:W", "PF"]),
+])
+def test_match_whatif_uses_head_to_head(monkeypatch, sport, rules):
+    # Marcadores bajos: los ajustes crean empates que se resuelven con h2h
+    if rules:
+        monkeypatch.setitem(utils.TIEBREAKERS, sport, rules)
+    col_local, col_visitante, col_favor_local, col_favor_visitante = MATCH_COLUMNS[sport]
+    df = synthetic_matches(40, 6, seed=11, cols=MATCH_COLUMNS[sport], max_score=2)
+    engine = build_whatif(df, sport)
+    deltas = [-2, -1, 0, 1, 2]
+    teams = sorted(set(df[col_local]))[:3]
+    sweep = engine.sweep(teams, deltas)
+    for team in teams:
+        for delta in deltas:
+            adjusted = df.copy()
+            adjusted.loc[adjusted[col_local] == team, col_favor_local] += delta
+            adjusted.loc[adjusted[col_visitante] == team, col_favor_visitante] += delta
+            table = engine.standings(team, delta)
+            pd.testing.assert_frame_equal(table, STANDINGS_FUNCTIONS[sport](adjusted))
+            assert sweep.loc[delta, team] == table.loc[table["Equipo"] == team, "Pos"].iloc[0]
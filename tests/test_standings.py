@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.standings import synthetic_matches
+from modules import utils
+from modules.utils import (MATCH_COLUMNS, STANDINGS_FUNCTIONS, compute_mlb_summary, compute_nfl_table,
+                           compute_standings_laliga, h2h_matrix, pair_results, rank_positions, team_totals)
+
+
+# Implementaciones anteriores (dos máscaras por equipo). Solo cambia el desempate
+# final: alfabético y estable, como el motor actual, en lugar del orden de un set.
+def _legacy_laliga(df):
+    rows = []
+    for equipo in sorted(set(df["Local"].tolist() + df["Visitante"].tolist())):
+        local_games = df[df["Local"] == equipo]
+        away_games = df[df["Visitante"] == equipo]
+        partidos = len(local_games) + len(away_games)
+        gf = local_games["Goles_Local"].sum() + away_games["Goles_Visitante"].sum()
+        gc = local_games["Goles_Visitante"].sum() + away_games["Goles_Local"].sum()
+        g = (len(local_games[local_games["Goles_Local"] > local_games["Goles_Visitante"]])
+             + len(away_games[away_games["Goles_Visitante"] > away_games["Goles_Local"]]))
+        e = (len(local_games[local_games["Goles_Local"] == local_games["Goles_Visitante"]])
+             + len(away_games[away_games["Goles_Visitante"] == away_games["Goles_Local"]]))
+        rows.append({"Pos": 0, "Equipo": equipo, "PJ": partidos, "G": g, "E": e, "P": partidos - g - e,
+                     "GF": int(gf), "GC": int(gc), "DG": int(gf - gc), "PTS": g * 3 + e})
+    out = pd.DataFrame(rows).sort_values(["PTS", "DG", "GF"], ascending=False, kind="mergesort")
+    out["Pos"] = range(1, len(out) + 1)
+    return out.reset_index(drop=True)
+
+
+def _legacy_mlb(df):
+    rows = []
+    for equipo in sorted(set(df["Equipo_Local"].tolist() + df["Equipo_Visitante"].tolist())):
+        local_games = df[df["Equipo_Local"] == equipo]
+        away_games = df[df["Equipo_Visitante"] == equipo]
+        juegos = len(local_games) + len(away_games)
+        hr = local_games["HR_Local"].sum() + away_games["HR_Visitante"].sum()
+        g = (len(local_games[local_games["HR_Local"] > local_games["HR_Visitante"]])
+             + len(away_games[away_games["HR_Visitante"] > away_games["HR_Local"]]))
+        rows.append({"Pos": 0, "Equipo": equipo, "J": juegos, "G": g, "P": juegos - g,
+                     "AVG": round(g / juegos if juegos > 0 else 0, 3), "HR": int(hr), "R": int(hr)})
+    out = pd.DataFrame(rows).sort_values(["G", "HR"], ascending=False, kind="mergesort")
+    out["Pos"] = range(1, len(out) + 1)
+    return out.reset_index(drop=True)
+
+
+def _legacy_nfl(df):
+    rows = []
+    for equipo in sorted(set(df["Local"].tolist() + df["Visitante"].tolist())):
+        local_games = df[df["Local"] == equipo]
+        away_games = df[df["Visitante"] == equipo]
+        juegos = len(local_games) + len(away_games)
+        pf = local_games["Puntos_Local"].sum() + away_games["Puntos_Visitante"].sum()
+        pa = local_games["Puntos_Visitante"].sum() + away_games["Puntos_Local"].sum()
+        w = (len(local_games[local_games["Puntos_Local"] > local_games["Puntos_Visitante"]])
+             + len(away_games[away_games["Puntos_Visitante"] > away_games["Puntos_Local"]]))
+        t = (len(local_games[local_games["Puntos_Local"] == local_games["Puntos_Visitante"]])
+             + len(away_games[away_games["Puntos_Visitante"] == away_games["Puntos_Local"]]))
+        rows.append({"Pos": 0, "Equipo": equipo, "J": juegos, "W": w, "L": juegos - w - t, "T": t,
+                     "PCT": round(w / juegos if juegos > 0 else 0, 3),
+                     "PF": int(pf), "PA": int(pa), "DIFF": int(pf - pa)})
+    out = pd.DataFrame(rows).sort_values(["W", "PCT", "DIFF"], ascending=False, kind="mergesort")
+    out["Pos"] = range(1, len(out) + 1)
+    return out.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_laliga_matches_legacy(monkeypatch, seed):
+    df = synthetic_matches(400, 12, seed=seed)
+    # Con los criterios de orden anteriores la tabla es idéntica
+    monkeypatch.setitem(utils.TIEBREAKERS, "La Liga", ["PTS", "DG", "GF"])
+    pd.testing.assert_frame_equal(compute_standings_laliga(df), _legacy_laliga(df), check_dtype=False)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_mlb_matches_legacy(monkeypatch, seed):
+    # Archivo anterior, solo con HR: las carreras se toman de los HR
+    df = synthetic_matches(400, 12, seed=seed, cols=("Equipo_Local", "Equipo_Visitante", "HR_Local", "HR_Visitante"))
+    monkeypatch.setitem(utils.TIEBREAKERS, "MLB", ["G", "HR"])
+    got = compute_mlb_summary(df)
+    legacy = _legacy_mlb(df)
+    pd.testing.assert_frame_equal(got[legacy.columns], legacy, check_dtype=False)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_nfl_matches_legacy(monkeypatch, seed):
+    df = synthetic_matches(400, 12, seed=seed, cols=MATCH_COLUMNS["NFL"], max_score=40)
+    monkeypatch.setitem(utils.TIEBREAKERS, "NFL", ["W", "PCT", "DIFF"])
+    pd.testing.assert_frame_equal(compute_nfl_table(df), _legacy_nfl(df), check_dtype=False)
+
+
+@pytest.mark.parametrize("compute,legacy,cols", [
+    (compute_standings_laliga, _legacy_laliga, MATCH_COLUMNS["La Liga"]),
+    (compute_nfl_table, _legacy_nfl, MATCH_COLUMNS["NFL"]),
+])
+def test_totals_match_legacy_with_h2h(compute, legacy, cols):
+    # Con los desempates actuales solo puede cambiar el orden dentro de los empates
+    df = synthetic_matches(300, 10, seed=7, cols=cols, max_score=3)
+    got, want = compute(df), legacy(df)
+    pd.testing.assert_frame_equal(got.drop(columns="Pos").sort_values("Equipo").reset_index(drop=True),
+                                  want.drop(columns="Pos").sort_values("Equipo").reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def _laliga(rows):
+    return pd.DataFrame(rows, columns=list(MATCH_COLUMNS["La Liga"]))
+
+
+def test_two_way_tie_uses_head_to_head():
+    # A y B empatan a 3 puntos; B tiene mejor diferencia de goles pero A ganó el cruce
+    df = _laliga([("A", "B", 1, 0), ("B", "C", 5, 0), ("D", "A", 1, 0), ("C", "D", 0, 0)])
+    table = compute_standings_laliga(df)
+    assert table["Equipo"].tolist() == ["D", "A", "B", "C"]
+    assert table.set_index("Equipo").loc[["A", "B"], "PTS"].tolist() == [3, 3]
+
+
+def test_three_way_tie_uses_mini_table_goal_difference():
+    # A, B y C empatan a 6 puntos y a 3 en su mini-tabla: decide la diferencia de goles
+    # entre ellos (B +4, A 0, C -4), no la general (A es el mejor con +8)
+    df = _laliga([("A", "B", 1, 0), ("B", "C", 5, 0), ("C", "A", 1, 0),
+                  ("A", "D", 9, 0), ("D", "A", 1, 0),
+                  ("B", "D", 1, 0), ("D", "B", 1, 0),
+                  ("C", "D", 1, 0), ("D", "C", 1, 0)])
+    table = compute_standings_laliga(df)
+    assert table["Equipo"].tolist() == ["D", "B", "A", "C"]
+    assert table.set_index("Equipo").loc["A", "DG"] > table.set_index("Equipo").loc["B", "DG"]
+
+
+def test_three_way_tie_reapplies_rules_to_remaining_pair():
+    # X sale primero del triple empate por puntos h2h; Y y Z siguen empatados y vuelven a
+    # aplicar los criterios con su propia mini-tabla (Y +1 entre ellos), aunque en la de
+    # tres Z tenga mejor diferencia (-2 contra -4)
+    df = _laliga([("X", "Y", 5, 0), ("X", "Z", 1, 0), ("Y", "Z", 2, 0), ("Z", "Y", 1, 0),
+                  ("Y", "W", 1, 0), ("Z", "W", 1, 0), ("W", "X", 1, 0)])
+    table = compute_standings_laliga(df)
+    assert table["Equipo"].tolist() == ["X", "Y", "Z", "W"]
+    assert table["PTS"].tolist() == [6, 6, 6, 3]
+
+
+@pytest.mark.parametrize("ruleset,rules", [
+    ("La Liga", None),
+    ("NFL", None),
+    ("MLB", None),
+    # Criterios editados: el orden vectorizado sale de TIEBREAKERS, igual que la tabla
+    ("La Liga", ["PTS", "GF", "h2h:PTS", "DG"]),
+    ("NFL", ["W", "h2h:W", "PF"]),
+])
+def test_rank_positions_matches_tables(monkeypatch, ruleset, rules):
+    # Ligas cortas con marcadores bajos: muchos empates que se resuelven con h2h
+    if rules:
+        monkeypatch.setitem(utils.TIEBREAKERS, ruleset, rules)
+    finalize = utils.FINALIZERS[ruleset]
+    for seed in range(20):
+        df = synthetic_matches(30, 6, seed=seed, cols=MATCH_COLUMNS[ruleset], max_score=2)
+        equipos, codes, favor, contra = utils._perspective_arrays(df, *MATCH_COLUMNS[ruleset])
+        totals = np.vstack(team_totals(codes, favor, contra, len(equipos)))[:, None, :]
+        pairs = h2h_matrix(pair_results(df, *MATCH_COLUMNS[ruleset]), equipos)
+        positions = rank_positions(ruleset, totals, equipos, pairs)[0]
+        table = finalize(utils.aggregate_team_results(df, *MATCH_COLUMNS[ruleset]),
+                         lambda: pair_results(df, *MATCH_COLUMNS[ruleset]))
+        expected = table.set_index("Equipo")["Pos"]
+        assert (positions + 1).tolist() == [expected[e] for e in equipos]
+
+
+@pytest.mark.parametrize("ruleset", ["La Liga", "NFL", "MLB"])
+def test_rank_positions_with_scenario_matches(ruleset):
+    # Como en la simulación: cruces comunes más los partidos propios de cada escenario
+    cols = MATCH_COLUMNS[ruleset]
+    base = synthetic_matches(30, 6, seed=1, cols=cols, max_score=2)
+    equipos, codes, favor, contra = utils._perspective_arrays(base, *cols)
+    index = {e: i for i, e in enumerate(equipos)}
+    fixture = synthetic_matches(12, 6, seed=2, cols=cols)
+    home, away = fixture[cols[0]].map(index).to_numpy(), fixture[cols[1]].map(index).to_numpy()
+    rng = np.random.default_rng(3)
+    score_home, score_away = rng.integers(0, 3, (2, 8, len(fixture))).astype(float)
+    base_totals = np.vstack(team_totals(codes, favor, contra, len(equipos)))
+    sim = utils.batched_team_totals(np.concatenate([home, away]), np.hstack([score_home, score_away]),
+                                    np.hstack([score_away, score_home]), len(equipos))
+    matches = (np.concatenate([home, away]), np.concatenate([away, home]),
+               np.hstack([score_home, score_away]), np.hstack([score_away, score_home]))
+    pairs = h2h_matrix(pair_results(base, *cols), equipos)
+    positions = rank_positions(ruleset, base_totals[:, None, :] + sim, equipos, pairs, matches)
+    for s in range(len(score_home)):
+        scenario = fixture.assign(**{cols[2]: score_home[s], cols[3]: score_away[s]})
+        table = STANDINGS_FUNCTIONS[ruleset](pd.concat([base, scenario], ignore_index=True)).set_index("Equipo")["Pos"]
+        assert (positions[s] + 1).tolist() == [table[e] for e in equipos]
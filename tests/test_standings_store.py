@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.standings import synthetic_matches
+from modules import storage
+from modules.datasets import create_dataset, dataset_data
+from modules.ingest import import_frame
+from modules.standings_store import apply_increment, check_consistency, load_standings
+from modules.utils import MATCH_COLUMNS, STANDINGS_FUNCTIONS
+
+
+def assert_same_tables(got, want):
+    """Mismas tablas (un DataFrame o una tupla), en el mismo orden"""
+    if isinstance(want, pd.DataFrame):
+        got, want = (got,), (want,)
+    for a, b in zip(got, want):
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False)
+
+
+def _f1_points(seed):
+    rng = np.random.default_rng(seed)
+    pilotos = np.array(["Alonso", "Hamilton", "Norris", "Piastri", "Russell", "Stroll"])
+    equipos = np.array(["Aston", "Mercedes", "McLaren", "McLaren", "Mercedes", "Aston"])
+    i = rng.integers(0, len(pilotos), 40)
+    return pd.DataFrame({"Piloto": pilotos[i], "Equipo": equipos[i], "Puntos": rng.integers(0, 26, 40)})
+
+
+FRAMES = {
+    "La Liga": lambda seed: synthetic_matches(120, 8, seed=seed, max_score=2),
+    "NFL": lambda seed: synthetic_matches(120, 8, seed=seed, cols=MATCH_COLUMNS["NFL"], max_score=30),
+    "MLB": lambda seed: synthetic_matches(120, 8, seed=seed, cols=MATCH_COLUMNS["MLB"], max_score=6),
+    "F1": _f1_points,
+}
+
+
+@pytest.mark.parametrize("sport", list(FRAMES))
+def test_materialized_standings_match_recompute(db_path, sport):
+    dataset_id = create_dataset("u", sport, "incremental", db_path=db_path)
+    # Dos importaciones: la segunda suma sus totales a los ya materializados
+    import_frame(FRAMES[sport](0), dataset_id, sport, db_path=db_path)
+    import_frame(FRAMES[sport](1), dataset_id, sport, db_path=db_path)
+    df = dataset_data(dataset_id, sport, db_path)
+    assert len(df) == len(FRAMES[sport](0)) + len(FRAMES[sport](1))
+    assert check_consistency(dataset_id, sport, df, db_path).empty
+    assert_same_tables(load_standings(dataset_id, sport, db_path), STANDINGS_FUNCTIONS[sport](df))
+
+
+def test_apply_increment_matches_recompute(db_path):
+    sport = "La Liga"
+    dataset_id = create_dataset("u", sport, "parcial", db_path=db_path)
+    first, second = synthetic_matches(80, 6, seed=3, max_score=1), synthetic_matches(40, 6, seed=4, max_score=1)
+    with storage.transaction(db_path) as con:
+        apply_increment(con, dataset_id, sport, first)
+        apply_increment(con, dataset_id, sport, second)
+    assert_same_tables(load_standings(dataset_id, sport, db_path),
+                       STANDINGS_FUNCTIONS[sport](pd.concat([first, second], ignore_index=True)))
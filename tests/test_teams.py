@@ -0,0 +1,19 @@
+import pandas as pd
+
+from benchmarks.standings import synthetic_matches
+from modules import storage
+from modules.datasets import create_dataset, dataset_data
+from modules.ingest import import_frame
+
+
+def test_names_are_stored_once_and_read_back(db_path):
+    first, second = synthetic_matches(50, 6, seed=0), synthetic_matches(50, 6, seed=1)
+    for i, df in enumerate([first, second]):
+        import_frame(df, create_dataset("u", "La Liga", f"liga {i}", db_path=db_path), "La Liga", db_path=db_path)
+    with storage.read(db_path) as con:
+        names = [row[0] for row in con.execute("SELECT nombre FROM teams WHERE sport='La Liga'")]
+    assert sorted(names) == sorted(set(first["Local"]) | set(first["Visitante"]) | set(second["Local"]) | set(second["Visitante"]))
+    data = dataset_data(2, "La Liga", db_path)
+    # Local y visitante comparten categorías (códigos comparables)
+    assert data["Local"].cat.categories.equals(data["Visitante"].cat.categories)
+    pd.testing.assert_frame_equal(data.astype({"Local": str, "Visitante": str}), second, check_dtype=False)